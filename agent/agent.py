@@ -3,8 +3,10 @@
 # Creation Date: January-17-2026
 # Modified Date: January-18-2026
 
+import json
 import os
 import sys
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI
@@ -14,6 +16,201 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from scraper import Scraper
 
 
+# Shared, stable instructions. Keep anything agent-specific out of this text:
+# every agent sending a byte-identical prefix is what lets the provider's
+# prompt cache hit across agents.
+SYSTEM_PROMPT = """
+You are an agent that analyzes the contents of a website
+and provides a short, snarky, humorous summary.
+
+Guidelines:
+- Ignore text that might be navigation related: menus, headers, footers,
+  cookie banners, login prompts and lists of links.
+- Focus on what the website is about, who it is for and what it offers.
+- If the website includes news or announcements, summarize these too.
+- Keep the summary short: a title and a few sentences or bullet points.
+- Be witty, but never invent facts that are not in the content.
+- Respond in markdown. Do not wrap the markdown in a code block - respond just with the markdown.
+- A final instruction will tell you which role to play and which language to respond in;
+  always follow it.
+"""
+
+USER_PROMPT_PREFIX = """
+Here are the contents of a website.
+Provide a short summary of this website.
+If it includes news or announcements, then summarize these too.
+"""
+
+# Sent as the last message, after the cacheable prefix
+PERSONA_PROMPT = """
+You are an {role}. Respond in {language}.
+"""
+
+# Sent last instead of PERSONA_PROMPT when summarizing into several languages
+MULTI_LANGUAGE_PROMPT = """
+You are an {role}. Write the summary once for each of these languages: {languages}.
+Respond with a JSON object that has exactly one key per language, using the language
+names exactly as given, each mapped to the full markdown summary in that language.
+"""
+
+TRANSLATION_SYSTEM_PROMPT = """
+You translate short, humorous markdown website summaries.
+Keep the markdown formatting, the tone and the jokes where possible.
+Respond with only the translated markdown, without a code block.
+"""
+
+TRANSLATION_PROMPT = """
+Translate the summary above into {language}.
+"""
+
+# Routing hint so requests sharing the prefix land on the same cache
+PROMPT_CACHE_KEY = "agent-website-summary"
+
+# Translations share a different prefix, so they get their own routing hint
+TRANSLATION_CACHE_KEY = "agent-summary-translation"
+
+STRATEGIES = ("structured", "translate")
+
+
+def _usage_int(value):
+    """Return value if it is an int token count, else 0."""
+    return value if isinstance(value, int) else 0
+
+
+class CacheStats:
+    """
+    Running prompt-cache metrics collected from API responses.
+    
+    Attributes:
+        requests (int): Number of responses recorded.
+        prompt_tokens (int): Total prompt (input) tokens billed.
+        cached_tokens (int): Prompt tokens served from the provider's cache.
+        cache_hits (int): Responses in which at least one token was cached.
+    """
+
+    def __init__(self):
+        """Initialize empty metrics."""
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.cache_hits = 0
+    
+    def record(self, usage):
+        """Add one response's usage to the metrics.
+        
+        Args:
+            usage: The ``usage`` object of a chat completion response.
+        """
+        prompt_tokens = _usage_int(getattr(usage, "prompt_tokens", 0))
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = _usage_int(getattr(details, "cached_tokens", 0))
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+            if cached_tokens:
+                self.cache_hits += 1
+    
+    @property
+    def hit_rate(self):
+        """float: Fraction of responses with a prompt-cache hit."""
+        return self.cache_hits / self.requests if self.requests else 0.0
+    
+    @property
+    def cached_token_ratio(self):
+        """float: Fraction of prompt tokens served from the cache."""
+        return self.cached_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+    
+    def as_dict(self):
+        """Return the metrics as a plain dictionary.
+        
+        Returns:
+            dict: Counters plus ``hit_rate`` and ``cached_token_ratio``.
+        """
+        return {
+            "requests": self.requests,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_hits": self.cache_hits,
+            "hit_rate": self.hit_rate,
+            "cached_token_ratio": self.cached_token_ratio,
+        }
+
+
+class ClientRegistry:
+    """
+    A process-wide registry of lazily-built, shared clients.
+    
+    Loading the .env file and building an OpenAI client (with its HTTP
+    connection pool) is far more expensive than building an Agent. The
+    registry does both at most once per process, on first use, and hands
+    the same instances to every Agent that asks for them.
+    
+    Attributes:
+        env_loaded (bool): Whether the .env file has been loaded.
+        cache_stats (CacheStats): Prompt-cache metrics across all agents.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry. Nothing is loaded or built yet."""
+        self._lock = threading.Lock()
+        self.env_loaded = False
+        self._openai = None
+        self._scraper = None
+        self.cache_stats = CacheStats()
+    
+    def load_env(self):
+        """Load environment variables from .env, once per registry."""
+        if self.env_loaded:
+            return
+        with self._lock:
+            if not self.env_loaded:
+                load_dotenv(override=True)
+                self.env_loaded = True
+    
+    def openai(self):
+        """Return the shared OpenAI client, building it on first use.
+        
+        Returns:
+            OpenAI: The shared OpenAI client instance.
+        """
+        if self._openai is None:
+            self.load_env()
+            with self._lock:
+                if self._openai is None:
+                    self._openai = OpenAI()
+        return self._openai
+    
+    def scraper(self):
+        """Return the shared Scraper, building it on first use.
+        
+        Returns:
+            Scraper: The shared web scraper instance.
+        """
+        if self._scraper is None:
+            with self._lock:
+                if self._scraper is None:
+                    self._scraper = Scraper()
+        return self._scraper
+    
+    def reset(self):
+        """Forget all shared clients so the next use rebuilds them.
+        
+        Useful after changing the environment (e.g. rotating API keys)
+        and in tests.
+        """
+        with self._lock:
+            self.env_loaded = False
+            self._openai = None
+            self._scraper = None
+            self.cache_stats = CacheStats()
+
+
+# Shared by every Agent unless a different registry is passed in
+default_registry = ClientRegistry()
+
+
 class Agent:
     """
     An AI agent that can summarize websites using OpenAI's API.
@@ -24,48 +221,78 @@ class Agent:
     Attributes:
         name (str): The name of the agent.
         language (str): The language for responses.
-        openai (OpenAI): The OpenAI client instance.
-        scraper (Scraper): The web scraper instance.
-        system_prompt (str): The system prompt defining the agent's role.
+        registry (ClientRegistry): The registry that supplies shared clients.
+        openai (OpenAI): The OpenAI client instance (shared, built lazily).
+        scraper (Scraper): The web scraper instance (shared, built lazily).
+        role (str): The role the agent plays in its responses.
+        system_prompt (str): The system prompt shared by all agents.
         user_prompt_prefix (str): The prefix for user prompts.
+        cache_stats (CacheStats): Prompt-cache metrics for this agent's calls.
+        last_usage: The ``usage`` object of the most recent response.
     """
 
-    def __init__(self, name, role="assistant", language="English"):
+    def __init__(self, name, role="assistant", language="English", registry=None):
         """Initialize the Agent with a name, role, and language.
         
+        Construction is cheap: the .env file, the OpenAI client and the
+        scraper come from a shared registry and are only built the first
+        time any agent actually needs them.
+        
         Args:
             name (str): The name of the agent.
             role (str): The role description for the system prompt.
             language (str): The language for responses (default: "English").
+            registry (ClientRegistry): Registry to take shared clients from
+                (default: the process-wide ``default_registry``).
         """
         self.name = name
         self.language = language
+        self.registry = registry if registry is not None else default_registry
         
-        # Load environment variables and initialize OpenAI client
-        load_dotenv(override=True)
-        self.openai = OpenAI()
+        # Per-agent overrides; None means "use the shared client"
+        self._openai = None
+        self._scraper = None
         
-        # Initialize the scraper
-        self.scraper = Scraper()
+        self.role = role
+        self.cache_stats = CacheStats()
+        self.last_usage = None
         
-        # Set default system prompt with customizable role and language
-        self.system_prompt = f"""
-You are an {role} that analyzes the contents of a website,
-and provides a short, snarky, humorous summary, ignoring text that might be navigation related.
-Respond in markdown. Do not wrap the markdown in a code block - respond just with the markdown.
-Respond in {language}.
-"""
+        # Stable instructions shared by every agent; role and language are
+        # sent last (see messages_for) so the prompt prefix stays cacheable
+        self.system_prompt = SYSTEM_PROMPT
         
         # Set default user prompt prefix
-        self.user_prompt_prefix = """
-Here are the contents of a website.
-Provide a short summary of this website.
-If it includes news or announcements, then summarize these too.
-"""
+        self.user_prompt_prefix = USER_PROMPT_PREFIX
+    
+    @property
+    def openai(self):
+        """OpenAI: The OpenAI client, shared through the registry by default."""
+        if self._openai is None:
+            return self.registry.openai()
+        return self._openai
+    
+    @openai.setter
+    def openai(self, client):
+        self._openai = client
+    
+    @property
+    def scraper(self):
+        """Scraper: The web scraper, shared through the registry by default."""
+        if self._scraper is None:
+            return self.registry.scraper()
+        return self._scraper
+    
+    @scraper.setter
+    def scraper(self, scraper):
+        self._scraper = scraper
     
     def set_system_prompt(self, prompt):
         """Set a custom system prompt.
         
+        The role and language instructions are still sent after the website
+        content; keep the custom prompt free of per-agent details so that it
+        remains cacheable.
+        
         Args:
             prompt (str): The system prompt to use.
         """
@@ -80,17 +307,12 @@ If it includes news or announcements, then summarize these too.
         self.user_prompt_prefix = prefix
     
     def set_role(self, role):
-        """Change the role used in the system prompt.
+        """Change the role used in the persona instructions.
         
         Args:
             role (str): The role description (e.g., "assistant", "rapper", "expert analyst").
         """
-        self.system_prompt = f"""
-You are an {role} that analyzes the contents of a website,
-and provides a short, snarky, humorous summary, ignoring text that might be navigation related.
-Respond in markdown. Do not wrap the markdown in a code block - respond just with the markdown.
-Respond in {self.language}.
-"""
+        self.role = role
     
     def set_language(self, language):
         """Change the language for responses.
@@ -99,18 +321,21 @@ Respond in {self.language}.
             language (str): The language for responses (e.g., "English", "Spanish", "French").
         """
         self.language = language
-        # Update system prompt to reflect new language
-        current_role = "assistant"  # Extract current role if needed
-        self.system_prompt = f"""
-You are an {current_role} that analyzes the contents of a website,
-and provides a short, snarky, humorous summary, ignoring text that might be navigation related.
-Respond in markdown. Do not wrap the markdown in a code block - respond just with the markdown.
-Respond in {language}.
-"""
+    
+    @property
+    def persona_prompt(self):
+        """str: The role- and language-specific instructions for this agent."""
+        return PERSONA_PROMPT.format(role=self.role, language=self.language)
     
     def messages_for(self, website_content):
         """Build the messages list for the OpenAI API.
         
+        Messages are ordered from most to least shared so that provider-side
+        prompt caching can reuse the longest possible prefix: the system
+        prompt (identical for all agents), then the website content
+        (identical for every agent summarizing the same page), and finally
+        the persona instructions carrying the role and language.
+        
         Args:
             website_content (str): The website content to analyze.
         
@@ -119,30 +344,210 @@ Respond in {language}.
         """
         return [
             {"role": "system", "content": self.system_prompt},
-            {"role": "user", "content": self.user_prompt_prefix + website_content}
+            {"role": "user", "content": self.user_prompt_prefix + website_content},
+            {"role": "system", "content": self.persona_prompt}
         ]
     
-    def summarize(self, url, model="gpt-4.1-mini"):
+    def _record_usage(self, response):
+        """Record token usage and prompt-cache hits from an API response.
+        
+        Args:
+            response: A chat completion response from the OpenAI API.
+        """
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        self.last_usage = usage
+        self.cache_stats.record(usage)
+        self.registry.cache_stats.record(usage)
+    
+    def summarize(self, url, model="gpt-4.1-mini", languages=None,
+                  translation_model="gpt-4.1-nano", strategy="structured"):
         """Fetch and summarize a website from a given URL.
         
         Args:
             url (str): The URL of the website to summarize.
             model (str): The OpenAI model to use (default: "gpt-4.1-mini").
+            languages (list[str]): Optional languages to summarize into at once.
+                The page is scraped once for all of them; see
+                ``summarize_languages``.
+            translation_model (str): Cheap model used to translate when
+                ``languages`` is given (default: "gpt-4.1-nano").
+            strategy (str): ``"structured"`` or ``"translate"``, used when
+                ``languages`` is given (default: "structured").
         
         Returns:
-            str: The summary of the website content.
+            str: The summary of the website content, or a dict mapping each
+                language to its summary when ``languages`` is given.
+        
+        Raises:
+            ValueError: If ``languages`` is given but empty, or ``strategy``
+                is not recognized (checked before the website is fetched).
         """
+        if languages is not None:
+            languages = self._check_languages(languages, strategy)
+        
         # Fetch website contents
         website = self.scraper.fetch_website_contents(url)
         
+        if languages is not None:
+            return self.summarize_languages(
+                website, languages, model=model,
+                translation_model=translation_model, strategy=strategy
+            )
+        
         # Create messages
         messages = self.messages_for(website)
         
         # Call OpenAI API
         response = self.openai.chat.completions.create(
             model=model,
-            messages=messages
+            messages=messages,
+            prompt_cache_key=PROMPT_CACHE_KEY
         )
+        self._record_usage(response)
         
         return response.choices[0].message.content
-
+    
+    def summarize_languages(self, website_content, languages, model="gpt-4.1-mini",
+                            translation_model="gpt-4.1-nano", strategy="structured"):
+        """Summarize already-fetched content into several languages.
+        
+        With the ``"structured"`` strategy a single request asks the model for
+        every language at once, using a JSON schema with one field per
+        language, so the content is sent only once. Any language missing from
+        that response (or all but the first, with the ``"translate"``
+        strategy) is produced by translating one summary with the cheap
+        ``translation_model``.
+        
+        Args:
+            website_content (str): The website content to analyze.
+            languages (list[str]): The languages to summarize into.
+            model (str): The OpenAI model used to summarize.
+            translation_model (str): The OpenAI model used for translations.
+            strategy (str): ``"structured"`` or ``"translate"``.
+        
+        Returns:
+            dict: Mapping of each language to its summary, in the given order.
+        
+        Raises:
+            ValueError: If ``languages`` is empty or ``strategy`` is not
+                recognized.
+        """
+        languages = self._check_languages(languages, strategy)
+        
+        summaries = {}
+        if strategy == "structured" and len(languages) > 1:
+            summaries = self._summarize_structured(website_content, languages, model)
+        
+        if not summaries:
+            # Summarize once in the first language and translate from there
+            messages = self.messages_for(website_content)
+            messages[-1] = {
+                "role": "system",
+                "content": PERSONA_PROMPT.format(role=self.role, language=languages[0])
+            }
+            response = self.openai.chat.completions.create(
+                model=model,
+                messages=messages,
+                prompt_cache_key=PROMPT_CACHE_KEY
+            )
+            self._record_usage(response)
+            summaries[languages[0]] = response.choices[0].message.content
+        
+        source = next(iter(summaries.values()))
+        for language in languages:
+            if language not in summaries:
+                summaries[language] = self.translate(source, language, model=translation_model)
+        
+        return {language: summaries[language] for language in languages}
+    
+    @staticmethod
+    def _check_languages(languages, strategy):
+        """Validate a multi-language request before any network I/O.
+        
+        Args:
+            languages (list[str]): The languages to summarize into.
+            strategy (str): ``"structured"`` or ``"translate"``.
+        
+        Returns:
+            list[str]: The languages without duplicates, in the given order.
+        
+        Raises:
+            ValueError: If ``languages`` is empty or ``strategy`` is not
+                recognized.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}; use 'structured' or 'translate'")
+        languages = list(dict.fromkeys(languages))
+        if not languages:
+            raise ValueError("languages must name at least one language")
+        return languages
+    
+    def _summarize_structured(self, website_content, languages, model):
+        """Request all languages in one structured-output response.
+        
+        Args:
+            website_content (str): The website content to analyze.
+            languages (list[str]): The languages to summarize into.
+            model (str): The OpenAI model to use.
+        
+        Returns:
+            dict: The summaries that came back as non-empty strings; empty if
+                the response could not be parsed.
+        """
+        messages = self.messages_for(website_content)
+        messages[-1] = {
+            "role": "system",
+            "content": MULTI_LANGUAGE_PROMPT.format(role=self.role, languages=", ".join(languages))
+        }
+        schema = {
+            "type": "object",
+            "properties": {language: {"type": "string"} for language in languages},
+            "required": languages,
+            "additionalProperties": False,
+        }
+        response = self.openai.chat.completions.create(
+            model=model,
+            messages=messages,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": "multilingual_summary", "strict": True, "schema": schema},
+            },
+            prompt_cache_key=PROMPT_CACHE_KEY
+        )
+        self._record_usage(response)
+        
+        try:
+            result = json.loads(response.choices[0].message.content)
+        except (TypeError, ValueError):
+            return {}
+        if not isinstance(result, dict):
+            return {}
+        return {
+            language: result[language] for language in languages
+            if isinstance(result.get(language), str) and result[language].strip()
+        }
+    
+    def translate(self, summary, language, model="gpt-4.1-nano"):
+        """Translate a summary into another language with a cheap model.
+        
+        Args:
+            summary (str): The markdown summary to translate.
+            language (str): The target language.
+            model (str): The OpenAI model to use (default: "gpt-4.1-nano").
+        
+        Returns:
+            str: The translated summary.
+        """
+        response = self.openai.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": TRANSLATION_SYSTEM_PROMPT},
+                {"role": "user", "content": summary},
+                {"role": "system", "content": TRANSLATION_PROMPT.format(language=language)}
+            ],
+            prompt_cache_key=TRANSLATION_CACHE_KEY
+        )
+        self._record_usage(response)
+        return response.choices[0].message.content
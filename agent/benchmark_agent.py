@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cost of constructing Agent instances.
+
+Compares the previous per-instance setup (reload .env, build a new OpenAI
+client and Scraper for every agent) with the shared ClientRegistry, where
+agents reuse one lazily-built set of clients.
+
+No API calls are made; a placeholder key is used if none is configured.
+
+Usage:
+    uv run python benchmark_agent.py [iterations]
+"""
+
+import os
+import sys
+import timeit
+
+from dotenv import load_dotenv
+from openai import OpenAI
+
+from agent import Agent, Scraper, default_registry
+
+
+def per_instance_setup():
+    """Reproduce what every Agent constructor used to do."""
+    load_dotenv(override=True)
+    OpenAI()
+    Scraper()
+
+
+def shared_agent():
+    """Construct an agent and touch its clients through the shared registry."""
+    agent = Agent("Benchmark", role="expert analyst", language="Spanish")
+    agent.openai
+    agent.scraper
+
+
+def report(label, seconds, iterations):
+    """Print the mean construction time and rate for one scenario."""
+    per_call_us = seconds / iterations * 1e6
+    print(f"{label:<38} {per_call_us:>10.1f} us/agent  {iterations / seconds:>12,.0f} agents/s")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    # OpenAI() refuses to build without a key; no request is ever sent
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark-placeholder")
+
+    print("=" * 78)
+    print(f"Agent construction benchmark ({iterations} iterations)")
+    print("=" * 78)
+
+    report("Per-instance .env + clients (before)",
+           timeit.timeit(per_instance_setup, number=iterations), iterations)
+
+    default_registry.reset()
+    default_registry.openai()  # warm the registry once, as a service would
+    report("Shared registry (after)",
+           timeit.timeit(shared_agent, number=iterations), iterations)
+
+
+if __name__ == "__main__":
+    main()
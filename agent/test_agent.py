@@ -6,12 +6,21 @@ Tests cover initialization, prompt customization, language support,
 and integration with the Scraper class.
 """
 
+import json
 import unittest
 from unittest.mock import Mock, patch, MagicMock
-from agent import Agent
+import agent as agent_module
+from agent import Agent, ClientRegistry
 
 
-class TestAgentInitialization(unittest.TestCase):
+class AgentTestCase(unittest.TestCase):
+    """Base test case that starts every test with an empty shared registry."""
+    
+    def setUp(self):
+        agent_module.default_registry.reset()
+
+
+class TestAgentInitialization(AgentTestCase):
     """Test Agent initialization and attribute setup."""
     
     @patch('agent.OpenAI')
@@ -22,8 +31,13 @@ class TestAgentInitialization(unittest.TestCase):
         
         self.assertEqual(agent.name, "TestAgent")
         self.assertEqual(agent.language, "English")
-        self.assertIn("assistant", agent.system_prompt)
-        self.assertIn("English", agent.system_prompt)
+        self.assertIn("assistant", agent.persona_prompt)
+        self.assertIn("English", agent.persona_prompt)
+        
+        # Nothing is loaded or built until a client is actually needed
+        mock_dotenv.assert_not_called()
+        mock_openai.assert_not_called()
+        agent.openai
         mock_dotenv.assert_called_once_with(override=True)
     
     @patch('agent.OpenAI')
@@ -32,8 +46,8 @@ class TestAgentInitialization(unittest.TestCase):
         """Test agent initializes with custom role."""
         agent = Agent("TestAgent", role="expert analyst")
         
-        self.assertIn("expert analyst", agent.system_prompt)
-        self.assertIn("English", agent.system_prompt)
+        self.assertIn("expert analyst", agent.persona_prompt)
+        self.assertIn("English", agent.persona_prompt)
     
     @patch('agent.OpenAI')
     @patch('agent.load_dotenv')
@@ -42,7 +56,7 @@ class TestAgentInitialization(unittest.TestCase):
         agent = Agent("TestAgent", language="Spanish")
         
         self.assertEqual(agent.language, "Spanish")
-        self.assertIn("Spanish", agent.system_prompt)
+        self.assertIn("Spanish", agent.persona_prompt)
     
     @patch('agent.OpenAI')
     @patch('agent.load_dotenv')
@@ -51,11 +65,55 @@ class TestAgentInitialization(unittest.TestCase):
         agent = Agent("TestAgent", role="rapper", language="French")
         
         self.assertEqual(agent.language, "French")
-        self.assertIn("rapper", agent.system_prompt)
-        self.assertIn("French", agent.system_prompt)
+        self.assertIn("rapper", agent.persona_prompt)
+        self.assertIn("French", agent.persona_prompt)
+
+
+class TestClientRegistry(AgentTestCase):
+    """Test sharing of lazily-built clients across agents."""
+    
+    @patch('agent.Scraper')
+    @patch('agent.OpenAI')
+    @patch('agent.load_dotenv')
+    def test_clients_shared_across_agents(self, mock_dotenv, mock_openai, mock_scraper):
+        """Test env is loaded once and clients are built once for many agents."""
+        agents = [Agent(f"Agent{i}", language=lang)
+                  for i, lang in enumerate(["English", "Spanish", "French"])]
+        
+        self.assertTrue(all(a.openai is agents[0].openai for a in agents))
+        self.assertTrue(all(a.scraper is agents[0].scraper for a in agents))
+        mock_dotenv.assert_called_once_with(override=True)
+        mock_openai.assert_called_once_with()
+        mock_scraper.assert_called_once_with()
+    
+    @patch('agent.OpenAI')
+    @patch('agent.load_dotenv')
+    def test_custom_registry_and_overrides(self, mock_dotenv, mock_openai):
+        """Test agents can use their own registry or override a client."""
+        mock_openai.side_effect = lambda: Mock()
+        registry = ClientRegistry()
+        agent = Agent("TestAgent", registry=registry)
+        self.assertIs(agent.openai, registry.openai())
+        self.assertIsNot(agent.openai, agent_module.default_registry.openai())
+        
+        custom_client = Mock()
+        agent.openai = custom_client
+        self.assertIs(agent.openai, custom_client)
+    
+    @patch('agent.OpenAI')
+    @patch('agent.load_dotenv')
+    def test_reset_rebuilds_clients(self, mock_dotenv, mock_openai):
+        """Test reset forces the env and clients to be rebuilt."""
+        registry = ClientRegistry()
+        registry.openai()
+        registry.reset()
+        registry.openai()
+        
+        self.assertEqual(mock_dotenv.call_count, 2)
+        self.assertEqual(mock_openai.call_count, 2)
 
 
-class TestAgentPromptCustomization(unittest.TestCase):
+class TestAgentPromptCustomization(AgentTestCase):
     """Test prompt customization methods."""
     
     @patch('agent.OpenAI')
@@ -65,8 +123,8 @@ class TestAgentPromptCustomization(unittest.TestCase):
         agent = Agent("TestAgent")
         agent.set_role("comedian")
         
-        self.assertIn("comedian", agent.system_prompt)
-        self.assertIn(agent.language, agent.system_prompt)
+        self.assertIn("comedian", agent.persona_prompt)
+        self.assertIn(agent.language, agent.persona_prompt)
     
     @patch('agent.OpenAI')
     @patch('agent.load_dotenv')
@@ -76,7 +134,7 @@ class TestAgentPromptCustomization(unittest.TestCase):
         agent.set_language("German")
         
         self.assertEqual(agent.language, "German")
-        self.assertIn("German", agent.system_prompt)
+        self.assertIn("German", agent.persona_prompt)
     
     @patch('agent.OpenAI')
     @patch('agent.load_dotenv')
@@ -99,7 +157,7 @@ class TestAgentPromptCustomization(unittest.TestCase):
         self.assertEqual(agent.user_prompt_prefix, custom_prefix)
 
 
-class TestAgentMessaging(unittest.TestCase):
+class TestAgentMessaging(AgentTestCase):
     """Test message building for OpenAI API."""
     
     @patch('agent.OpenAI')
@@ -111,14 +169,32 @@ class TestAgentMessaging(unittest.TestCase):
         
         messages = agent.messages_for(website_content)
         
-        self.assertEqual(len(messages), 2)
+        self.assertEqual(len(messages), 3)
         self.assertEqual(messages[0]["role"], "system")
         self.assertEqual(messages[0]["content"], agent.system_prompt)
         self.assertEqual(messages[1]["role"], "user")
         self.assertIn(website_content, messages[1]["content"])
+        self.assertEqual(messages[2]["role"], "system")
+        self.assertEqual(messages[2]["content"], agent.persona_prompt)
+    
+    @patch('agent.OpenAI')
+    @patch('agent.load_dotenv')
+    def test_messages_share_prefix_across_agents(self, mock_dotenv, mock_openai):
+        """Test role and language only appear after the shared prefix."""
+        english = Agent("A", role="assistant", language="English")
+        french = Agent("B", role="rapper", language="French")
+        
+        english_messages = english.messages_for("Same content")
+        french_messages = french.messages_for("Same content")
+        
+        self.assertEqual(english_messages[:2], french_messages[:2])
+        self.assertNotEqual(english_messages[2], french_messages[2])
+        self.assertNotIn("French", french_messages[0]["content"])
+        self.assertIn("French", french_messages[2]["content"])
+        self.assertIn("rapper", french_messages[2]["content"])
 
 
-class TestAgentSummarization(unittest.TestCase):
+class TestAgentSummarization(AgentTestCase):
     """Test website summarization functionality."""
     
     @patch('agent.OpenAI')
@@ -145,6 +221,38 @@ class TestAgentSummarization(unittest.TestCase):
         mock_client.chat.completions.create.assert_called_once()
         self.assertEqual(result, "Test summary")
     
+    @patch('agent.OpenAI')
+    @patch('agent.load_dotenv')
+    def test_summarize_records_cache_hits(self, mock_dotenv, mock_openai):
+        """Test cached prompt tokens are surfaced as cache-hit metrics."""
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        
+        cold = MagicMock()
+        cold.usage.prompt_tokens = 1200
+        cold.usage.prompt_tokens_details.cached_tokens = 0
+        warm = MagicMock()
+        warm.usage.prompt_tokens = 1200
+        warm.usage.prompt_tokens_details.cached_tokens = 1024
+        mock_client.chat.completions.create.side_effect = [cold, warm]
+        
+        agent = Agent("TestAgent")
+        agent.scraper.fetch_website_contents = Mock(return_value="Website content")
+        agent.summarize("https://example.com")
+        agent.summarize("https://example.com")
+        
+        stats = agent.cache_stats
+        self.assertEqual(stats.requests, 2)
+        self.assertEqual(stats.prompt_tokens, 2400)
+        self.assertEqual(stats.cached_tokens, 1024)
+        self.assertEqual(stats.cache_hits, 1)
+        self.assertAlmostEqual(stats.hit_rate, 0.5)
+        self.assertIs(agent.last_usage, warm.usage)
+        self.assertEqual(agent_module.default_registry.cache_stats.cached_tokens, 1024)
+        
+        call_args = mock_client.chat.completions.create.call_args
+        self.assertEqual(call_args.kwargs["prompt_cache_key"], agent_module.PROMPT_CACHE_KEY)
+    
     @patch('agent.OpenAI')
     @patch('agent.load_dotenv')
     def test_summarize_with_custom_model(self, mock_dotenv, mock_openai):
@@ -169,7 +277,131 @@ class TestAgentSummarization(unittest.TestCase):
         self.assertEqual(call_args.kwargs["model"], "gpt-4")
 
 
-class TestLanguageFeature(unittest.TestCase):
+class TestMultiLanguageSummarization(AgentTestCase):
+    """Test summarizing into several languages from a single scrape."""
+    
+    def _response(self, content):
+        response = MagicMock()
+        response.choices[0].message.content = content
+        return response
+    
+    @patch('agent.OpenAI')
+    @patch('agent.load_dotenv')
+    def test_structured_single_call(self, mock_dotenv, mock_openai):
+        """Test all languages come back from one structured-output call."""
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        mock_client.chat.completions.create.return_value = self._response(
+            json.dumps({"English": "Hello", "Spanish": "Hola", "French": "Bonjour"})
+        )
+        
+        agent = Agent("TestAgent")
+        agent.scraper.fetch_website_contents = Mock(return_value="Website content")
+        result = agent.summarize("https://example.com",
+                                 languages=["English", "Spanish", "French"])
+        
+        self.assertEqual(result, {"English": "Hello", "Spanish": "Hola", "French": "Bonjour"})
+        self.assertEqual(list(result), ["English", "Spanish", "French"])
+        agent.scraper.fetch_website_contents.assert_called_once_with("https://example.com")
+        mock_client.chat.completions.create.assert_called_once()
+        
+        call_args = mock_client.chat.completions.create.call_args
+        schema = call_args.kwargs["response_format"]["json_schema"]["schema"]
+        self.assertEqual(schema["required"], ["English", "Spanish", "French"])
+        messages = call_args.kwargs["messages"]
+        self.assertIn("Website content", messages[1]["content"])
+        self.assertIn("Spanish", messages[-1]["content"])
+    
+    @patch('agent.OpenAI')
+    @patch('agent.load_dotenv')
+    def test_structured_missing_language_is_translated(self, mock_dotenv, mock_openai):
+        """Test languages missing from the response fall back to translation."""
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = [
+            self._response(json.dumps({"English": "Hello", "German": ""})),
+            self._response("Hallo"),
+        ]
+        
+        agent = Agent("TestAgent")
+        agent.scraper.fetch_website_contents = Mock(return_value="Website content")
+        result = agent.summarize("https://example.com", languages=["English", "German"])
+        
+        self.assertEqual(result, {"English": "Hello", "German": "Hallo"})
+        translate_call = mock_client.chat.completions.create.call_args_list[1]
+        self.assertEqual(translate_call.kwargs["model"], "gpt-4.1-nano")
+        self.assertEqual(translate_call.kwargs["messages"][1]["content"], "Hello")
+        self.assertIn("German", translate_call.kwargs["messages"][-1]["content"])
+    
+    @patch('agent.OpenAI')
+    @patch('agent.load_dotenv')
+    def test_translate_strategy(self, mock_dotenv, mock_openai):
+        """Test the translate strategy summarizes once and translates the rest."""
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = [
+            self._response("Hola"),
+            self._response("Hello"),
+            self._response("Ciao"),
+        ]
+        
+        agent = Agent("TestAgent", language="Japanese")
+        agent.scraper.fetch_website_contents = Mock(return_value="Website content")
+        result = agent.summarize("https://example.com",
+                                 languages=["Spanish", "English", "Italian"],
+                                 strategy="translate")
+        
+        self.assertEqual(result, {"Spanish": "Hola", "English": "Hello", "Italian": "Ciao"})
+        first_call = mock_client.chat.completions.create.call_args_list[0]
+        self.assertIn("Spanish", first_call.kwargs["messages"][-1]["content"])
+        self.assertEqual(agent.language, "Japanese")
+        self.assertEqual(agent.cache_stats.requests, 3)
+    
+    @patch('agent.OpenAI')
+    @patch('agent.load_dotenv')
+    def test_unknown_strategy_raises(self, mock_dotenv, mock_openai):
+        """Test an unknown strategy is rejected."""
+        agent = Agent("TestAgent")
+        with self.assertRaises(ValueError):
+            agent.summarize_languages("content", ["English"], strategy="magic")
+    
+    @patch('agent.OpenAI')
+    @patch('agent.load_dotenv')
+    def test_invalid_request_fails_before_scraping(self, mock_dotenv, mock_openai):
+        """Test empty languages and unknown strategies raise before any network I/O."""
+        agent = Agent("TestAgent")
+        agent.scraper.fetch_website_contents = Mock(return_value="Website content")
+        with self.assertRaises(ValueError):
+            agent.summarize("https://example.com", languages=[])
+        with self.assertRaises(ValueError):
+            agent.summarize("https://example.com", languages=["English"], strategy="magic")
+        with self.assertRaises(ValueError):
+            agent.summarize_languages("content", [])
+        agent.scraper.fetch_website_contents.assert_not_called()
+        mock_openai.return_value.chat.completions.create.assert_not_called()
+    
+    @patch('agent.OpenAI')
+    @patch('agent.load_dotenv')
+    def test_translations_use_their_own_cache_key(self, mock_dotenv, mock_openai):
+        """Test translations are routed apart from website summaries."""
+        mock_client = MagicMock()
+        mock_openai.return_value = mock_client
+        mock_client.chat.completions.create.side_effect = [
+            self._response("Hello"),
+            self._response("Hola"),
+        ]
+        
+        agent = Agent("TestAgent")
+        agent.summarize_languages("content", ["English", "Spanish"], strategy="translate")
+        
+        summary_call, translate_call = mock_client.chat.completions.create.call_args_list
+        self.assertEqual(summary_call.kwargs["prompt_cache_key"], agent_module.PROMPT_CACHE_KEY)
+        self.assertEqual(translate_call.kwargs["prompt_cache_key"],
+                         agent_module.TRANSLATION_CACHE_KEY)
+        self.assertNotEqual(agent_module.TRANSLATION_CACHE_KEY, agent_module.PROMPT_CACHE_KEY)
+
+
+class TestLanguageFeature(AgentTestCase):
     """Test language-specific functionality."""
     
     @patch('agent.OpenAI')
@@ -180,8 +412,8 @@ class TestLanguageFeature(unittest.TestCase):
         agent.set_role("expert analyst")
         
         self.assertEqual(agent.language, "Spanish")
-        self.assertIn("Spanish", agent.system_prompt)
-        self.assertIn("expert analyst", agent.system_prompt)
+        self.assertIn("Spanish", agent.persona_prompt)
+        self.assertIn("expert analyst", agent.persona_prompt)
     
     @patch('agent.OpenAI')
     @patch('agent.load_dotenv')
@@ -193,7 +425,7 @@ class TestLanguageFeature(unittest.TestCase):
         for lang in languages:
             agent.set_language(lang)
             self.assertEqual(agent.language, lang)
-            self.assertIn(lang, agent.system_prompt)
+            self.assertIn(lang, agent.persona_prompt)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,309 @@
+"""backends.py
+
+Provider fallback and latency hedging for brochure generation.
+
+A ``HedgedClient`` looks like an OpenAI client (``client.chat.completions
+.create(...)``) but sends each request to an ordered list of
+OpenAI-compatible backends (OpenAI, OpenRouter, Gemini's OpenAI endpoint,
+a local Ollama, ...):
+1. Backends are tried in order of their rolling (EWMA) time to first
+   token; backends not measured yet keep their configured order, after
+   the measured ones
+2. If the first backend produces no token within ``hedge_after``
+   seconds, the request is also sent to the next backend, and so on;
+   the first to produce a token wins and the others are cancelled
+3. A backend that fails is skipped immediately, and failures count as
+   slow samples so it drops down the order until it recovers
+
+Author: scotton
+Created: 2026-01-22
+"""
+
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+from openai import OpenAI
+
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+OLLAMA_BASE_URL = "http://localhost:11434/v1"
+
+
+@dataclass
+class Backend:
+    """An OpenAI-compatible endpoint and the model to use on it.
+
+    Attributes:
+        name: Label used in latency stats and traces (e.g. "openrouter")
+        client: OpenAI-compatible client
+        model: Model name on this backend
+    """
+    name: str
+    client: object
+    model: str
+
+    @classmethod
+    def openai(cls, model: str = "gpt-4.1-mini", api_key: str | None = None) -> "Backend":
+        """OpenAI, keyed by OPENAI_API_KEY unless api_key is given."""
+        return cls("openai", OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY")), model)
+
+    @classmethod
+    def openrouter(cls, model: str = "openai/gpt-4.1-mini", api_key: str | None = None) -> "Backend":
+        """OpenRouter, keyed by OPENROUTER_API_KEY unless api_key is given."""
+        client = OpenAI(base_url=OPENROUTER_BASE_URL,
+                        api_key=api_key or os.getenv("OPENROUTER_API_KEY"))
+        return cls("openrouter", client, model)
+
+    @classmethod
+    def gemini(cls, model: str = "gemini-2.5-flash-lite", api_key: str | None = None) -> "Backend":
+        """Gemini's OpenAI-compatible endpoint, keyed by GOOGLE_API_KEY unless api_key is given."""
+        client = OpenAI(base_url=GEMINI_BASE_URL, api_key=api_key or os.getenv("GOOGLE_API_KEY"))
+        return cls("gemini", client, model)
+
+    @classmethod
+    def ollama(cls, model: str = "llama3.2", base_url: str = OLLAMA_BASE_URL) -> "Backend":
+        """A local Ollama server."""
+        return cls("ollama", OpenAI(base_url=base_url, api_key="ollama"), model)
+
+
+class LatencyTracker:
+    """Rolling time to first token per backend, as an exponentially weighted average.
+
+    Attributes:
+        alpha (float): Weight of the newest sample
+        failure_latency (float): Seconds recorded as a sample when a backend fails
+    """
+
+    def __init__(self, alpha: float = 0.3, failure_latency: float = 30.0):
+        self.alpha = alpha
+        self.failure_latency = failure_latency
+        self._lock = threading.Lock()
+        self._latency: dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add a time-to-first-token sample for a backend."""
+        with self._lock:
+            previous = self._latency.get(name)
+            self._latency[name] = seconds if previous is None else (
+                self.alpha * seconds + (1 - self.alpha) * previous
+            )
+
+    def record_failure(self, name: str) -> None:
+        """Count a failed request as a very slow sample."""
+        self.record(name, self.failure_latency)
+
+    def latency(self, name: str) -> float | None:
+        """Return the rolling latency of a backend, or None if never measured."""
+        with self._lock:
+            return self._latency.get(name)
+
+    def order(self, backends: list[Backend]) -> list[Backend]:
+        """Return backends fastest first; unmeasured ones follow in configured order."""
+        with self._lock:
+            latency = dict(self._latency)
+        return sorted(backends, key=lambda backend: (backend.name not in latency,
+                                                     latency.get(backend.name, 0.0)))
+
+    def as_dict(self) -> dict[str, float]:
+        with self._lock:
+            return {name: round(seconds, 4) for name, seconds in self._latency.items()}
+
+
+_END = object()
+
+
+class _Attempt:
+    """One backend working on a request in its own thread."""
+
+    def __init__(self, backend: Backend, kwargs: dict, events: queue.Queue):
+        self.backend = backend
+        self.kwargs = kwargs
+        self.events = events
+        self.cancelled = threading.Event()
+        self.chunks: queue.Queue = queue.Queue()
+        self.started = time.monotonic()
+        self.failed = False
+        threading.Thread(target=self._run, name=f"hedge-{backend.name}", daemon=True).start()
+
+    def _run(self) -> None:
+        response = None
+        try:
+            response = self.backend.client.chat.completions.create(
+                model=self.backend.model, **self.kwargs
+            )
+            if not self.kwargs.get("stream"):
+                self.events.put(("done", self, response))
+                return
+            signalled = False
+            for chunk in response:
+                if self.cancelled.is_set():
+                    break
+                self.chunks.put(chunk)
+                if not signalled and _has_content(chunk):
+                    signalled = True
+                    self.events.put(("first", self, None))
+            if not signalled:
+                self.events.put(("first", self, None))  # an empty answer is still an answer
+            self.chunks.put(_END)
+        except Exception as e:
+            self.failed = True
+            self.chunks.put(e)
+            self.events.put(("error", self, e))
+        finally:
+            close = getattr(response, "close", None)
+            if self.cancelled.is_set() and callable(close):
+                close()
+
+
+def _has_content(chunk) -> bool:
+    choices = getattr(chunk, "choices", None)
+    if not choices:
+        return False
+    return bool(getattr(choices[0].delta, "content", None))
+
+
+class HedgedCompletions:
+    """``chat.completions`` of a HedgedClient."""
+
+    def __init__(self, owner: "HedgedClient"):
+        self._owner = owner
+
+    def create(self, **kwargs):
+        """Create a chat completion on the best backend, hedging when it is slow.
+
+        The ``model`` argument is ignored; each backend uses its own.
+
+        Returns:
+            The winning backend's response, or for ``stream=True`` an
+            iterator over the winning backend's chunks
+        """
+        kwargs.pop("model", None)
+        if kwargs.get("stream"):
+            return self._owner._stream(kwargs)
+        winner, response = self._owner._race(kwargs)
+        return response
+
+
+class HedgedClient:
+    """OpenAI-compatible client that hedges requests across backends.
+
+    Attributes:
+        backends (list[Backend]): Backends in configured (fallback) order
+        hedge_after (float): Seconds without a first token before the next
+            backend is also tried
+        tracker (LatencyTracker): Rolling latency per backend
+        stats (dict): Counters: requests, hedges, failures, wins per backend
+        chat: Namespace exposing ``chat.completions.create``
+    """
+
+    def __init__(self, backends: list[Backend], hedge_after: float = 2.0,
+                 tracker: LatencyTracker | None = None):
+        """Initialize the client.
+
+        Args:
+            backends: Backends in fallback order
+            hedge_after: Seconds without a first token before hedging (default: 2.0)
+            tracker: Latency tracker to share between clients (default: a new one)
+
+        Raises:
+            ValueError: If no backend is given
+        """
+        if not backends:
+            raise ValueError("At least one backend is required")
+        self.backends = list(backends)
+        self.hedge_after = hedge_after
+        self.tracker = tracker or LatencyTracker()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {"requests": 0, "hedges": 0, "failures": 0,
+                      "wins": {backend.name: 0 for backend in self.backends}}
+        self.chat = SimpleNamespace(completions=HedgedCompletions(self))
+
+    @property
+    def last_backend(self) -> str | None:
+        """Name of the backend that won this thread's latest request."""
+        return getattr(self._local, "backend", None)
+
+    @property
+    def last_model(self) -> str | None:
+        """Model of the backend that won this thread's latest request."""
+        return getattr(self._local, "model", None)
+
+    def _count(self, key: str, backend: Backend | None = None) -> None:
+        with self._lock:
+            if backend is None:
+                self.stats[key] += 1
+            else:
+                self.stats[key][backend.name] = self.stats[key].get(backend.name, 0) + 1
+
+    def _race(self, kwargs: dict) -> tuple[_Attempt, object]:
+        """Run the request until one backend produces a first token (or a response).
+
+        Returns:
+            The winning attempt and, for non-streamed requests, its response
+
+        Raises:
+            Exception: The last backend error, if every backend failed
+        """
+        self._count("requests")
+        order = self.tracker.order(self.backends)
+        events: queue.Queue = queue.Queue()
+        attempts: list[_Attempt] = []
+        last_error = None
+
+        def launch():
+            attempts.append(_Attempt(order[len(attempts)], kwargs, events))
+
+        launch()
+        while True:
+            can_hedge = len(attempts) < len(order)
+            running = sum(not attempt.failed for attempt in attempts)
+            try:
+                kind, attempt, payload = events.get(
+                    timeout=self.hedge_after if can_hedge and running else None
+                )
+            except queue.Empty:
+                self._count("hedges")
+                launch()
+                continue
+            if kind == "error":
+                self._count("failures")
+                self.tracker.record_failure(attempt.backend.name)
+                last_error = payload
+                if can_hedge and not any(not other.failed for other in attempts):
+                    launch()
+                elif not can_hedge and all(other.failed for other in attempts):
+                    raise last_error
+                continue
+            break
+
+        now = time.monotonic()
+        self.tracker.record(attempt.backend.name, now - attempt.started)
+        for other in attempts:
+            if other is not attempt and not other.failed:
+                other.cancelled.set()
+                # Still waiting at least this long: a lower bound on its latency
+                self.tracker.record(other.backend.name, now - other.started)
+        self._count("wins", attempt.backend)
+        self._local.backend = attempt.backend.name
+        self._local.model = attempt.backend.model
+        return attempt, payload
+
+    def _stream(self, kwargs: dict):
+        """Yield the chunks of the backend that produced the first token."""
+        winner, _ = self._race(kwargs)
+        try:
+            while True:
+                item = winner.chunks.get()
+                if item is _END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            winner.cancelled.set()
@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""batch.py
+
+Non-interactive bulk brochure generation from a CSV file.
+
+Reads companies from a CSV with ``company`` (or ``name``) and ``url``
+columns and generates a brochure for each one with:
+- A bounded pool of workers, each with its own BrochureGenerator
+- Global limits on concurrent LLM calls and HTTP requests, shared by all
+  workers
+- Results appended to a JSONL file as each company finishes
+- A checkpoint file, so an interrupted run resumes where it stopped
+- A final throughput, token and cost report
+
+Usage:
+    uv run python batch.py companies.csv -o brochures.jsonl --workers 8
+
+Author: scotton
+Created: 2026-01-22
+"""
+
+import argparse
+import csv
+import json
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent))
+from backends import HedgedClient
+from brochure import BrochureGenerator
+
+
+# USD per million (input, output) tokens
+MODEL_PRICES = {
+    "gpt-5-nano": (0.05, 0.40),
+    "gpt-5-mini": (0.25, 2.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+
+@dataclass
+class Company:
+    """One row of the input CSV.
+
+    Attributes:
+        name: Company name
+        url: Company website URL
+    """
+    name: str
+    url: str
+
+    @property
+    def key(self) -> str:
+        """Identifier used in the checkpoint file."""
+        return f"{self.name}\t{self.url}"
+
+
+def read_companies(path: str | Path) -> list[Company]:
+    """Read companies from a CSV file.
+
+    Args:
+        path: CSV file with a ``company`` or ``name`` column and a ``url`` column
+
+    Returns:
+        Companies in file order, skipping rows without a name or URL
+
+    Raises:
+        ValueError: If the required columns are missing
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        columns = {column.strip().lower(): column for column in reader.fieldnames or []}
+        name_column = columns.get("company") or columns.get("name")
+        url_column = columns.get("url")
+        if not name_column or not url_column:
+            raise ValueError("CSV must have a 'company' (or 'name') column and a 'url' column")
+        companies = []
+        for row in reader:
+            name = (row.get(name_column) or "").strip()
+            url = (row.get(url_column) or "").strip()
+            if name and url:
+                companies.append(Company(name, url))
+        return companies
+
+
+class UsageMeter:
+    """Thread-safe token counts per model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tokens: dict[str, list[int]] = {}
+
+    def record(self, model: str, usage) -> None:
+        """Add a response's usage (prompt and completion tokens) for a model."""
+        if usage is None:
+            return
+        prompt = getattr(usage, "prompt_tokens", 0)
+        completion = getattr(usage, "completion_tokens", 0)
+        with self._lock:
+            counts = self.tokens.setdefault(model, [0, 0])
+            counts[0] += prompt if isinstance(prompt, int) else 0
+            counts[1] += completion if isinstance(completion, int) else 0
+
+    def cost(self) -> float | None:
+        """Estimated cost in USD, or None if a model has no known price."""
+        total = 0.0
+        with self._lock:
+            for model, (prompt, completion) in self.tokens.items():
+                if model not in MODEL_PRICES:
+                    return None
+                input_price, output_price = MODEL_PRICES[model]
+                total += (prompt * input_price + completion * output_price) / 1_000_000
+        return total
+
+
+def _answered_model(client, requested: str) -> str:
+    """Return the model that answered: the winning backend's for hedged clients."""
+    return getattr(client, "last_model", None) or requested
+
+
+class LimitedStream:
+    """A streamed response that holds a semaphore slot until it is done.
+
+    The slot is released exactly once: when the stream is exhausted or
+    raises, when it is closed (directly or by leaving a ``with`` block), or
+    when it is garbage collected without ever being iterated.
+    """
+
+    def __init__(self, stream, semaphore: threading.Semaphore, meter: UsageMeter, model: str,
+                 client=None):
+        self._stream = stream
+        self._iterator = None
+        self._semaphore = semaphore
+        self._meter = meter
+        self._model = model
+        self._client = client
+        self._released = False
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._released:
+            raise StopIteration
+        try:
+            if self._iterator is None:
+                self._iterator = iter(self._stream)
+            chunk = next(self._iterator)
+        except BaseException:
+            self.close()
+            raise
+        usage = getattr(chunk, "usage", None)
+        if usage is not None:
+            self._meter.record(_answered_model(self._client, self._model), usage)
+        return chunk
+
+    def close(self) -> None:
+        """Close the underlying stream and give the slot back."""
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        try:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._semaphore.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        self.close()
+
+
+class LimitedCompletions:
+    """Chat completions that hold a shared semaphore for the whole call.
+
+    Streamed responses come back as a LimitedStream, which keeps the slot
+    until the stream is consumed or closed, and ask for usage in the final
+    chunk so their tokens are metered too. Usage is metered under the
+    model that answered, which for a hedged client is the winning
+    backend's rather than the requested one.
+    """
+
+    def __init__(self, completions, semaphore: threading.Semaphore, meter: UsageMeter,
+                 client=None):
+        self._completions = completions
+        self._semaphore = semaphore
+        self._meter = meter
+        self._client = client
+
+    def create(self, **kwargs):
+        """Call the wrapped ``create`` once a slot is free."""
+        if kwargs.get("stream"):
+            kwargs.setdefault("stream_options", {"include_usage": True})
+        self._semaphore.acquire()
+        try:
+            response = self._completions.create(**kwargs)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        if kwargs.get("stream"):
+            return LimitedStream(response, self._semaphore, self._meter, kwargs.get("model"),
+                                 self._client)
+        self._semaphore.release()
+        self._meter.record(_answered_model(self._client, kwargs.get("model")),
+                           getattr(response, "usage", None))
+        return response
+
+
+class LimitedClient:
+    """Client whose chat completions hold a shared semaphore.
+
+    Wrapping a HedgedClient keeps its ``last_backend`` and ``last_model``
+    visible, so traces still name the backend that answered.
+    """
+
+    def __init__(self, client, semaphore: threading.Semaphore, meter: UsageMeter):
+        self._client = client
+        self.chat = SimpleNamespace(completions=LimitedCompletions(
+            client.chat.completions, semaphore, meter, self
+        ))
+
+    @property
+    def last_backend(self) -> str | None:
+        """Name of the backend that won this thread's latest hedged request."""
+        return self._client.last_backend if isinstance(self._client, HedgedClient) else None
+
+    @property
+    def last_model(self) -> str | None:
+        """Model of the backend that won this thread's latest hedged request."""
+        return self._client.last_model if isinstance(self._client, HedgedClient) else None
+
+
+class LimitedScraper:
+    """Scraper whose requests hold a shared semaphore."""
+
+    def __init__(self, scraper, semaphore: threading.Semaphore):
+        self._scraper = scraper
+        self._semaphore = semaphore
+
+    def fetch_website_contents(self, url, timeout=None):
+        with self._semaphore:
+            return self._scraper.fetch_website_contents(url, timeout=timeout)
+
+    def fetch_website_links(self, url, timeout=None):
+        with self._semaphore:
+            return self._scraper.fetch_website_links(url, timeout=timeout)
+
+
+@dataclass
+class BatchReport:
+    """Outcome of a batch run.
+
+    Attributes:
+        total: Companies in the input
+        skipped: Companies already done according to the checkpoint
+        succeeded: Brochures generated in this run
+        failed: Companies that raised an error in this run
+        elapsed: Wall-clock seconds of this run
+        tokens: Model mapped to [prompt tokens, completion tokens]
+        cost: Estimated cost in USD, or None if a model has no known price
+    """
+    total: int = 0
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    tokens: dict = field(default_factory=dict)
+    cost: float | None = 0.0
+
+    @property
+    def processed(self) -> int:
+        return self.succeeded + self.failed
+
+    @property
+    def throughput(self) -> float:
+        """Companies processed per minute."""
+        return self.processed / self.elapsed * 60 if self.elapsed else 0.0
+
+    def format_report(self) -> str:
+        """Format the report for the terminal."""
+        lines = [
+            f"Companies: {self.total} ({self.skipped} already done, {self.succeeded} succeeded, "
+            f"{self.failed} failed)",
+            f"Elapsed:   {self.elapsed:.1f}s ({self.throughput:.1f} companies/min)",
+        ]
+        for model, (prompt, completion) in sorted(self.tokens.items()):
+            lines.append(f"Tokens:    {model}: {prompt:,} prompt, {completion:,} completion")
+        if self.cost is None:
+            lines.append("Cost:      unknown (no price for some models)")
+        else:
+            per_company = self.cost / self.succeeded if self.succeeded else 0.0
+            lines.append(f"Cost:      ${self.cost:.4f} (${per_company:.5f} per brochure)")
+        return "\n".join(lines)
+
+
+class BatchRunner:
+    """Generates brochures for many companies with bounded concurrency.
+
+    Each worker thread lazily builds its own BrochureGenerator, since a
+    generator keeps per-run state; all of them share one OpenAI client,
+    one Scraper and the global LLM and HTTP limits.
+
+    Attributes:
+        workers (int): Companies processed at once
+        output_path (Path): JSONL file results are appended to
+        checkpoint_path (Path): File listing the companies already done
+        retry_failed (bool): Whether companies that failed before are retried
+        trace_path (Path | None): JSONL file each company's pipeline spans are
+            appended to, if any
+    """
+
+    def __init__(
+        self,
+        output_path: str | Path,
+        checkpoint_path: str | Path | None = None,
+        workers: int = 4,
+        llm_concurrency: int = 4,
+        http_concurrency: int = 16,
+        retry_failed: bool = True,
+        trace_path: str | Path | None = None,
+        generator_factory=None,
+        **generator_kwargs
+    ):
+        """Initialize the runner.
+
+        Args:
+            output_path: JSONL file results are appended to
+            checkpoint_path: Checkpoint file (default: output path + ".checkpoint")
+            workers: Companies processed at once (default: 4)
+            llm_concurrency: Most LLM calls in flight across workers (default: 4)
+            http_concurrency: Most HTTP requests in flight across workers (default: 16)
+            retry_failed: Retry companies that failed in an earlier run (default: True)
+            trace_path: JSONL file each company's pipeline spans are appended
+                to, tagged with the company name (default: None, not traced)
+            generator_factory: Function returning a new BrochureGenerator; when
+                given, the LLM and HTTP limits are applied to its client and scraper
+            **generator_kwargs: Passed to BrochureGenerator by the default factory
+        """
+        self.output_path = Path(output_path)
+        self.checkpoint_path = Path(checkpoint_path or f"{output_path}.checkpoint")
+        self.workers = max(1, workers)
+        self.retry_failed = retry_failed
+        self.trace_path = Path(trace_path) if trace_path else None
+        self.meter = UsageMeter()
+        self._llm_slots = threading.Semaphore(max(1, llm_concurrency))
+        self._http_slots = threading.Semaphore(max(1, http_concurrency))
+        self._generator_factory = generator_factory or (lambda: BrochureGenerator(**generator_kwargs))
+        self._shared = None
+        self._shared_lock = threading.Lock()
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+    def load_checkpoint(self) -> dict[str, str]:
+        """Return company key mapped to its last recorded status."""
+        done = {}
+        if self.checkpoint_path.exists():
+            for line in self.checkpoint_path.read_text(encoding="utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by an interrupted write
+                done[entry["key"]] = entry["status"]
+        return done
+
+    def _limited(self, client):
+        """Wrap a client's completions in the shared LLM limit; None stays None."""
+        if client is None:
+            return None
+        return LimitedClient(client, self._llm_slots, self.meter)
+
+    def _generator(self) -> BrochureGenerator:
+        """Return this worker's generator, building it on first use."""
+        generator = getattr(self._local, "generator", None)
+        if generator is None:
+            generator = self._generator_factory()
+            with self._shared_lock:
+                if self._shared is None:
+                    self._shared = (
+                        self._limited(generator.client),
+                        LimitedScraper(generator.scraper, self._http_slots),
+                        self._limited(getattr(generator, "_brochure_client", None)),
+                    )
+            generator.client, generator.scraper, hedged = self._shared
+            if hedged is not None:
+                generator.brochure_client = hedged
+            self._local.generator = generator
+        return generator
+
+    def _process(self, company: Company) -> dict:
+        """Generate one brochure, returning its result record."""
+        start = time.perf_counter()
+        record = {"company": company.name, "url": company.url}
+        generator = None
+        try:
+            generator = self._generator()
+            record["brochure"] = generator.create_brochure(company.name, company.url)
+            record["status"] = "ok"
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"
+        record["seconds"] = round(time.perf_counter() - start, 3)
+        if self.trace_path is not None and generator is not None:
+            with self._write_lock:
+                generator.timings.write_jsonl(self.trace_path, company=company.name,
+                                              status=record["status"])
+        return record
+
+    def _write(self, company: Company, record: dict) -> None:
+        """Append a result, then mark the company done in the checkpoint.
+
+        The result is flushed first, so an interruption between the two
+        writes repeats a company rather than losing it.
+        """
+        with self._write_lock:
+            with open(self.output_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            with open(self.checkpoint_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": company.key, "status": record["status"]}) + "\n")
+
+    def run(self, companies: list[Company], on_result=None) -> BatchReport:
+        """Generate brochures for every company not yet done.
+
+        Only ``2 * workers`` companies are queued at a time, so memory use
+        doesn't grow with the size of the input.
+
+        Args:
+            companies: Companies to process
+            on_result: Optional callback given each result record as it is written
+
+        Returns:
+            Report for this run
+        """
+        done = self.load_checkpoint()
+        skip = {"ok"} if self.retry_failed else {"ok", "error"}
+        pending = [company for company in companies if done.get(company.key) not in skip]
+        report = BatchReport(total=len(companies), skipped=len(companies) - len(pending))
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        start = time.perf_counter()
+        queue = iter(pending)
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                while True:
+                    while len(in_flight) < 2 * self.workers:
+                        company = next(queue, None)
+                        if company is None:
+                            break
+                        in_flight[pool.submit(self._process, company)] = company
+                    if not in_flight:
+                        break
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        company = in_flight.pop(future)
+                        record = future.result()
+                        self._write(company, record)
+                        if record["status"] == "ok":
+                            report.succeeded += 1
+                        else:
+                            report.failed += 1
+                        if on_result is not None:
+                            on_result(record)
+            except KeyboardInterrupt:
+                for future in in_flight:
+                    future.cancel()
+                raise
+            finally:
+                report.elapsed = time.perf_counter() - start
+                report.tokens = {model: list(counts) for model, counts in self.meter.tokens.items()}
+                report.cost = self.meter.cost()
+        return report
+
+
+def main(argv: list[str] | None = None):
+    """Command line entry point for batch brochure generation."""
+    parser = argparse.ArgumentParser(description="Generate brochures for every company in a CSV file.")
+    parser.add_argument("csv", help="CSV file with 'company' (or 'name') and 'url' columns")
+    parser.add_argument("-o", "--output", default="brochures.jsonl", help="JSONL results file")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--workers", type=int, default=4, help="Companies processed at once")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Most LLM calls in flight")
+    parser.add_argument("--http-concurrency", type=int, default=16, help="Most HTTP requests in flight")
+    parser.add_argument("--no-retry-failed", action="store_true",
+                        help="Skip companies that failed in an earlier run")
+    parser.add_argument("--trace", help="Append each company's pipeline spans to this JSONL file")
+    parser.add_argument("--brochure-model", default="gpt-4.1-mini")
+    parser.add_argument("--link-selection-model", default="gpt-5-nano")
+    args = parser.parse_args(argv)
+
+    companies = read_companies(args.csv)
+    runner = BatchRunner(
+        args.output,
+        checkpoint_path=args.checkpoint,
+        workers=args.workers,
+        llm_concurrency=args.llm_concurrency,
+        http_concurrency=args.http_concurrency,
+        retry_failed=not args.no_retry_failed,
+        trace_path=args.trace,
+        brochure_model=args.brochure_model,
+        link_selection_model=args.link_selection_model,
+    )
+
+    def progress(record):
+        status = "ok" if record["status"] == "ok" else f"error: {record['error']}"
+        print(f"[{record['seconds']:>6.1f}s] {record['company']}: {status}", flush=True)
+
+    try:
+        report = runner.run(companies, on_result=progress)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; rerun the same command to resume from {runner.checkpoint_path}")
+        sys.exit(130)
+    print()
+    print(report.format_report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""boilerplate.py
+
+Cross-page boilerplate removal for brochure inputs.
+
+Pages fetched from one company site repeat the same header, navigation
+and footer lines ("Products", "Sign in", "© 2026 Example Inc."), and the
+brochure model would pay for them once per page. Lines that occur on
+most of a site's pages are treated as boilerplate: the first occurrence
+is kept and every later one is removed, so no information is lost and
+more real content fits within the context budget.
+
+Author: scotton
+Created: 2026-01-22
+"""
+
+from collections import Counter
+
+
+def line_key(line: str) -> str:
+    """Return the form of a line used to compare it across pages.
+
+    Whitespace is collapsed and case is ignored.
+    """
+    return " ".join(line.split()).lower()
+
+
+def find_boilerplate(pages: list[str], min_fraction: float = 0.5, min_pages: int = 2) -> set[str]:
+    """Find the lines that occur on most pages of a site.
+
+    Args:
+        pages: Text of each page of the site
+        min_fraction: A line is boilerplate when it occurs on more than
+            this fraction of the pages (default: 0.5)
+        min_pages: Fewest pages needed to tell boilerplate from content
+            (default: 2)
+
+    Returns:
+        Boilerplate lines, as line keys
+    """
+    if len(pages) < min_pages:
+        return set()
+    counts = Counter()
+    for page in pages:
+        counts.update({key for key in map(line_key, page.splitlines()) if key})
+    threshold = len(pages) * min_fraction
+    return {key for key, count in counts.items() if count > threshold and count > 1}
+
+
+def remove_boilerplate(pages: list[str], min_fraction: float = 0.5, min_pages: int = 2) -> list[str]:
+    """Remove repeated boilerplate lines from a site's pages.
+
+    Pages are scanned in order and each boilerplate line is kept only
+    where it first occurs. Other lines, including repeated ones that are
+    not boilerplate, are left untouched.
+
+    Args:
+        pages: Text of each page of the site, most important first
+        min_fraction: A line is boilerplate when it occurs on more than
+            this fraction of the pages (default: 0.5)
+        min_pages: Fewest pages needed to tell boilerplate from content
+            (default: 2)
+
+    Returns:
+        The pages, in the same order, without repeated boilerplate lines
+    """
+    boilerplate = find_boilerplate(pages, min_fraction, min_pages)
+    if not boilerplate:
+        return list(pages)
+    seen = set()
+    cleaned = []
+    for page in pages:
+        kept = []
+        for line in page.splitlines():
+            key = line_key(line)
+            if key in boilerplate:
+                if key in seen:
+                    continue
+                seen.add(key)
+            kept.append(line)
+        cleaned.append("\n".join(kept))
+    return cleaned
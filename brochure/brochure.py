@@ -16,6 +16,8 @@ Created: 2026-01-21
 import os
 import json
 import sys
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
 from pathlib import Path
 from dotenv import load_dotenv
 from openai import OpenAI
@@ -24,6 +26,18 @@ from openai import OpenAI
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 from scraper import Scraper
 
+# Add this directory to path so sibling modules import the same way
+sys.path.insert(0, str(Path(__file__).parent))
+from backends import Backend, HedgedClient
+from boilerplate import remove_boilerplate
+from context_builder import PageSection, TokenCounter, assemble_context, link_type_rank
+from link_ranker import (
+    ScoredLink, confident_links, conventional_links, normalize_url, rank_links, site_host
+)
+from relevance import select_paragraphs
+from stage_cache import StageCache, TTLCache, brochure_key
+from tracing import Tracer, text_attributes, usage_attributes
+
 
 LINK_SYSTEM_PROMPT = """
 You are provided with a list of links found on a webpage.
@@ -47,6 +61,133 @@ Include details of company culture, customers and careers/jobs if you have the i
 """
 
 
+class LinkStreamParser:
+    """Incrementally parses a streamed link-selection JSON response.
+    
+    Feed the response text as it arrives; every ``{"type": ..., "url": ...}``
+    object inside the top-level ``links`` array is returned as soon as its
+    closing brace is seen, without waiting for the rest of the document.
+    
+    Attributes:
+        text (str): All text fed so far
+    """
+    
+    def __init__(self):
+        """Initialize the parser with an empty buffer."""
+        self.text = ""
+        self._pos = 0
+        self._stack: list[str] = []     # open containers: "{", "[" or "links"
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_key = None           # last string seen directly in the root object
+        self._object_start = None       # buffer index of the link object being read
+    
+    def feed(self, chunk: str) -> list[dict]:
+        """Consume more response text.
+        
+        Args:
+            chunk: The next piece of the streamed response
+            
+        Returns:
+            Link objects completed by this chunk, in document order
+        """
+        self.text += chunk
+        completed = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._stack == ["{"]:
+                        self._last_key = text[self._string_start + 1:i]
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char == "{":
+                if self._stack and self._stack[-1] == "links" and self._object_start is None:
+                    self._object_start = i
+                self._stack.append("{")
+            elif char == "[":
+                is_links = self._stack == ["{"] and self._last_key == "links"
+                self._stack.append("links" if is_links else "[")
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if (char == "}" and self._object_start is not None
+                        and self._stack and self._stack[-1] == "links"):
+                    link = self._decode(text[self._object_start:i + 1])
+                    if link is not None:
+                        completed.append(link)
+                    self._object_start = None
+        self._pos = len(text)
+        return completed
+    
+    @staticmethod
+    def _decode(fragment: str) -> dict | None:
+        """Decode one link object, ignoring anything malformed."""
+        try:
+            link = json.loads(fragment)
+        except json.JSONDecodeError:
+            return None
+        if isinstance(link, dict) and link.get("url"):
+            link.setdefault("type", "relevant page")
+            return link
+        return None
+
+
+class PrefetchStats:
+    """Counters describing how useful speculative prefetching has been.
+    
+    Attributes:
+        prefetched (int): Pages fetched speculatively
+        selected (int): Pages picked by link selection
+        hits (int): Picked pages served from the prefetch cache
+        wasted (int): Prefetched pages that link selection did not pick
+    """
+    
+    def __init__(self):
+        """Initialize all counters to zero."""
+        self._lock = threading.Lock()
+        self.prefetched = 0
+        self.selected = 0
+        self.hits = 0
+        self.wasted = 0
+    
+    def add(self, **counts: int) -> None:
+        """Add to one or more counters, e.g. ``add(hits=1)``."""
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+    
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of picked pages that were already prefetched."""
+        return self.hits / self.selected if self.selected else 0.0
+    
+    @property
+    def waste_rate(self) -> float:
+        """Fraction of prefetched pages that were never picked."""
+        return self.wasted / self.prefetched if self.prefetched else 0.0
+    
+    def as_dict(self) -> dict:
+        """Return the counters and rates as a dictionary."""
+        return {
+            "prefetched": self.prefetched,
+            "selected": self.selected,
+            "hits": self.hits,
+            "wasted": self.wasted,
+            "hit_rate": self.hit_rate,
+            "waste_rate": self.waste_rate,
+        }
+
+
 class BrochureGenerator:
     """Generates company brochures using LLM analysis of website content.
     
@@ -58,13 +199,50 @@ class BrochureGenerator:
         scraper (Scraper): Web scraping utility for content extraction
         link_selection_model (str): Model for link relevance analysis
         brochure_model (str): Model for brochure generation
+        brochure_client (OpenAI | HedgedClient): Client for brochure generation;
+            a HedgedClient over brochure_backends when they are given
+        fetch_concurrency (int): Maximum number of linked pages fetched at once
+        fetch_timeout (float): Per-link HTTP timeout in seconds
+        max_candidate_links (int): Most pre-ranked links sent to the link selection model
+        confident_link_score (float | None): Score at which a pre-ranked link counts as
+            a confident match; None always asks the link selection model
+        min_confident_links (int): Confident page types needed to skip the model
+        speculative_prefetch (bool): Whether conventional pages are prefetched
+            while the link selection model runs
+        prefetch_limit (int): Most pages prefetched per brochure
+        prefetch_cache (TTLCache): Prefetched pages by URL, kept for prefetch_ttl seconds
+        prefetch_stats (PrefetchStats): Prefetch hits and wasted fetches so far
+        stage_cache (StageCache | None): Per-stage memoization cache, if any
+        brochure_system_prompt (str): System prompt (tone) for brochure generation
+        context_token_budget (int): Tokens of website content sent to the brochure model
+        strip_boilerplate (bool): Whether lines repeated across most pages are removed
+        relevance_ranking (bool): Whether only the paragraphs most relevant to the
+            brochure facets are kept
+        timings (Tracer): Spans (timings, sizes, token counts) of the most recent
+            brochure run
     """
     
     def __init__(
         self,
         api_key: str | None = None,
         link_selection_model: str = "gpt-5-nano",
-        brochure_model: str = "gpt-4.1-mini"
+        brochure_model: str = "gpt-4.1-mini",
+        fetch_concurrency: int = 6,
+        fetch_timeout: float = 10.0,
+        max_candidate_links: int = 40,
+        confident_link_score: float | None = 2.5,
+        min_confident_links: int = 3,
+        speculative_prefetch: bool = False,
+        prefetch_limit: int = 5,
+        prefetch_ttl: float = 300.0,
+        stage_cache: StageCache | None = None,
+        brochure_system_prompt: str = BROCHURE_SYSTEM_PROMPT,
+        context_token_budget: int = 2_000,
+        token_counter: TokenCounter | None = None,
+        strip_boilerplate: bool = True,
+        relevance_ranking: bool = False,
+        brochure_backends: list[Backend] | None = None,
+        hedge_after: float = 2.0
     ):
         """Initialize the BrochureGenerator.
         
@@ -72,6 +250,43 @@ class BrochureGenerator:
             api_key: OpenAI API key. If None, loads from environment
             link_selection_model: Model to use for link selection (default: gpt-5-nano)
             brochure_model: Model to use for brochure generation (default: gpt-4.1-mini)
+            fetch_concurrency: Maximum number of linked pages fetched at once (default: 6)
+            fetch_timeout: Per-link HTTP timeout in seconds (default: 10.0)
+            max_candidate_links: Most pre-ranked links sent to the link selection
+                model (default: 40)
+            confident_link_score: Pre-ranker score at which a link is a confident
+                match; None disables skipping the model (default: 2.5)
+            min_confident_links: Distinct confident page types (about, careers,
+                team, ...) needed to skip the link selection model (default: 3)
+            speculative_prefetch: Fetch conventional pages (/about, /careers,
+                /team, ...) found among the links while the link selection
+                model runs (default: False)
+            prefetch_limit: Most pages prefetched per brochure (default: 5)
+            prefetch_ttl: Seconds a prefetched page stays cached (default: 300.0)
+            stage_cache: Per-stage cache for the landing page, selected links,
+                page contents and brochures, e.g. ``StageCache.in_memory()``
+                (default: None, nothing is memoized)
+            brochure_system_prompt: System prompt for brochure generation; change
+                it to regenerate in another tone (default: BROCHURE_SYSTEM_PROMPT)
+            context_token_budget: Tokens of prompt (instructions and website
+                content) sent to the brochure model, shared between the
+                landing page and relevant pages (default: 2,000)
+            token_counter: Token counter for the brochure prompt; built for
+                brochure_model when None
+            strip_boilerplate: Remove header, navigation and footer lines that
+                repeat across most of the site's pages, keeping their first
+                occurrence (default: True)
+            relevance_ranking: Rank the paragraphs of all pages with BM25 against
+                the brochure facets (culture, customers, careers, product) and
+                keep only the best ones within context_token_budget
+                (default: False)
+            brochure_backends: OpenAI-compatible backends (OpenAI, OpenRouter,
+                Gemini, Ollama, ...) for brochure generation, in fallback order;
+                each uses its own model, and requests hedge to the next backend
+                when the fastest is slow (default: None, brochure_model on the
+                OpenAI client)
+            hedge_after: Seconds without a first brochure token before the next
+                backend is also asked (default: 2.0)
             
         Raises:
             ValueError: If API key is not provided and not in environment
@@ -87,32 +302,168 @@ class BrochureGenerator:
             )
         
         self.client = OpenAI(api_key=api_key)
+        self._brochure_client = HedgedClient(brochure_backends, hedge_after) if brochure_backends else None
         self.scraper = Scraper()
         self.link_selection_model = link_selection_model
         self.brochure_model = brochure_model
+        self.fetch_concurrency = fetch_concurrency
+        self.fetch_timeout = fetch_timeout
+        self.max_candidate_links = max_candidate_links
+        self.confident_link_score = confident_link_score
+        self.min_confident_links = min_confident_links
+        self.speculative_prefetch = speculative_prefetch
+        self.prefetch_limit = prefetch_limit
+        self.prefetch_cache = TTLCache(prefetch_ttl)
+        self.prefetch_stats = PrefetchStats()
+        self.stage_cache = stage_cache
+        self.brochure_system_prompt = brochure_system_prompt
+        self.context_token_budget = context_token_budget
+        self._token_counter = token_counter
+        self.strip_boilerplate = strip_boilerplate
+        self.relevance_ranking = relevance_ranking
+        self.timings = Tracer()
+        self._prefetch_pool = None
+        self._prefetched_urls: set[str] = set()
     
-    def _get_links_user_prompt(self, url: str) -> str:
+    @property
+    def brochure_client(self):
+        """Client for brochure generation: the hedged backends, or the OpenAI client.
+        
+        A replacement client may expose ``last_backend`` (as HedgedClient
+        does) to name the backend in traces.
+        """
+        return self._brochure_client or self.client
+    
+    @brochure_client.setter
+    def brochure_client(self, client) -> None:
+        self._brochure_client = client
+    
+    def _brochure_backend(self) -> str | None:
+        """Name of the backend that answered this thread's latest brochure request."""
+        return getattr(self._brochure_client, "last_backend", None)
+    
+    def _cache_get(self, stage: str, key):
+        """Return a value from the stage cache, or None if absent or uncached."""
+        if self.stage_cache is None:
+            return None
+        return self.stage_cache.get(stage, key)
+    
+    def _cache_set(self, stage: str, key, value) -> None:
+        """Store a value in the stage cache, if there is one."""
+        if self.stage_cache is not None:
+            self.stage_cache.set(stage, key, value)
+    
+    def _get_candidate_links(self, url: str) -> list[ScoredLink]:
+        """Scrape the landing page links and pre-rank them locally.
+        
+        Links are normalized, de-duplicated, stripped of privacy/terms/login/
+        mailto:-style links and scored by keywords; only the best
+        ``max_candidate_links`` are kept.
+        
+        Args:
+            url: The company website URL
+            
+        Returns:
+            Candidate links, best first
+        """
+        links = self._cache_get("landing_page", f"links {url}")
+        if links is None:
+            with self.timings.span("link_scrape", url=url) as span:
+                links = self.scraper.fetch_website_links(url, timeout=self.fetch_timeout)
+                span.set(links=len(links))
+            self._cache_set("landing_page", f"links {url}", links)
+        return rank_links(url, links, top_k=self.max_candidate_links)
+    
+    def _get_links_user_prompt(self, url: str, candidates: list[ScoredLink] | None = None) -> str:
         """Build user prompt for link selection.
         
         Args:
             url: The company website URL
+            candidates: Pre-ranked candidate links; scraped from url if None
             
         Returns:
             User prompt containing the list of links from the website
         """
+        if candidates is None:
+            candidates = self._get_candidate_links(url)
         user_prompt = f"""
 Here is the list of links on the website {url} -
 Please decide which of these are relevant web links for a brochure about the company, 
 respond with the full https URL in JSON format.
 Do not include Terms of Service, Privacy, email links.
 
-Links (some might be relative links):
+Links:
 
 """
-        links = self.scraper.fetch_website_links(url)
-        user_prompt += "\n".join(links)
+        user_prompt += "\n".join(link.url for link in candidates)
         return user_prompt
     
+    def iter_relevant_links(self, url: str):
+        """Stream the link selection response and yield links as they complete.
+        
+        The model's JSON is parsed incrementally, so each link object can be
+        acted on (e.g. fetched) while the model is still generating the rest.
+        When the local pre-ranker alone is conclusive (see
+        ``confident_link_score``), its links are used and the model is not
+        called at all. With a stage cache, a previous selection for the same
+        domain and model is reused.
+        
+        Args:
+            url: The company website URL
+            
+        Yields:
+            dict: Relevant link objects with 'type' and 'url' keys
+        """
+        cache_key = f"{site_host(url)} {self.link_selection_model}"
+        cached = self._cache_get("selected_links", cache_key)
+        if cached is not None:
+            print(f"Reusing {len(cached)} cached relevant links for {url}")
+            yield from cached
+            return
+        
+        candidates = self._get_candidate_links(url)
+        if self.confident_link_score is not None:
+            selected = confident_links(
+                candidates, self.confident_link_score, self.min_confident_links
+            )
+            if selected:
+                print(f"Selected {len(selected)} relevant links for {url} without calling "
+                      f"{self.link_selection_model}")
+                self._cache_set("selected_links", cache_key, selected)
+                yield from selected
+                return
+        
+        self._start_prefetch(candidates)
+        print(f"Selecting relevant links for {url} by calling {self.link_selection_model}")
+        user_prompt = self._get_links_user_prompt(url, candidates)
+        parser = LinkStreamParser()
+        with self.timings.span("link_selection", model=self.link_selection_model,
+                               candidates=len(candidates),
+                               prompt_bytes=len(user_prompt.encode("utf-8"))) as span:
+            stream = self.client.chat.completions.create(
+                model=self.link_selection_model,
+                messages=[
+                    {"role": "system", "content": LINK_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt}
+                ],
+                response_format={"type": "json_object"},
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            selected = []
+            for chunk in stream:
+                span.set(**usage_attributes(getattr(chunk, "usage", None)))
+                if not chunk.choices:
+                    continue
+                for link in parser.feed(chunk.choices[0].delta.content or ""):
+                    if not selected:
+                        self.timings.mark("link_selection first_link")
+                    selected.append(link)
+                    yield link
+            span.set(selected=len(selected))
+        self._cache_set("selected_links", cache_key, selected)
+        print(f"Found {len(selected)} relevant links")
+    
     def select_relevant_links(self, url: str) -> dict:
         """Select relevant links from a company website using LLM.
         
@@ -123,19 +474,175 @@ Links (some might be relative links):
             Dictionary with 'links' key containing list of relevant link objects
             Each link object has 'type' and 'url' keys
         """
-        print(f"Selecting relevant links for {url} by calling {self.link_selection_model}")
-        response = self.client.chat.completions.create(
-            model=self.link_selection_model,
-            messages=[
-                {"role": "system", "content": LINK_SYSTEM_PROMPT},
-                {"role": "user", "content": self._get_links_user_prompt(url)}
-            ],
-            response_format={"type": "json_object"}
-        )
-        result = response.choices[0].message.content
-        links = json.loads(result)
-        print(f"Found {len(links.get('links', []))} relevant links")
-        return links
+        return {"links": list(self.iter_relevant_links(url))}
+    
+    def _start_prefetch(self, candidates: list[ScoredLink]) -> None:
+        """Speculatively fetch conventional company pages into the prefetch cache.
+        
+        Only runs inside a brochure run with ``speculative_prefetch`` enabled.
+        Pages already in the cache are not fetched again.
+        
+        Args:
+            candidates: Pre-ranked candidate links from the landing page
+        """
+        if not self.speculative_prefetch or self._prefetch_pool is None:
+            return
+        for link in conventional_links(candidates, self.prefetch_limit):
+            if self._cached_page(link.url) is not None:
+                continue
+            future = self._prefetch_pool.submit(self._prefetch_page, link.url)
+            self.prefetch_cache.set(link.url, future)
+            self._prefetched_urls.add(link.url)
+            self.prefetch_stats.add(prefetched=1)
+    
+    def _prefetch_page(self, url: str) -> str:
+        """Fetch a page speculatively as a timed "prefetch" stage."""
+        with self.timings.span(f"prefetch {url}", url=url) as span:
+            contents = self.scraper.fetch_website_contents(url, timeout=self.fetch_timeout)
+            span.set(**text_attributes(contents))
+            return contents
+    
+    def _cached_page(self, url: str):
+        """Return the usable prefetch future for a URL, or None.
+        
+        Cancelled and failed prefetches do not count; the page is fetched
+        normally instead.
+        """
+        future = self.prefetch_cache.get(url)
+        if future is None or future.cancelled():
+            return None
+        if future.done() and future.exception() is not None:
+            return None
+        return future
+    
+    def _fetch_link_contents(self, link: dict) -> str:
+        """Fetch one relevant page, returning the error text on failure.
+        
+        Pages are taken from the stage cache or the prefetch cache when
+        possible; a prefetch counts as a hit only once its contents are
+        used. Failed fetches are not cached.
+        
+        Args:
+            link: Link object with 'type' and 'url' keys
+            
+        Returns:
+            Page contents, or an inline error message if the fetch failed
+        """
+        key = normalize_url(link["url"], link["url"]) or link["url"]
+        cached = self._cache_get("page_contents", key)
+        if cached is not None:
+            return cached
+        contents = None
+        if self.speculative_prefetch:
+            self.prefetch_stats.add(selected=1)
+            future = self._cached_page(key)
+            if future is not None:
+                try:
+                    contents = future.result()
+                except (Exception, CancelledError):
+                    pass  # A failed prefetch is a miss; fetch the page normally
+                else:
+                    self.prefetch_stats.add(hits=1)
+        if contents is None:
+            try:
+                with self.timings.span(f"page_fetch {link['url']}", url=link["url"],
+                                       type=link["type"]) as span:
+                    contents = self.scraper.fetch_website_contents(
+                        link["url"], timeout=self.fetch_timeout
+                    )
+                    span.set(**text_attributes(contents))
+            except Exception as e:
+                return f"Error fetching content: {str(e)}"
+        self._cache_set("page_contents", key, contents)
+        return contents
+    
+    def _fetch_landing_contents(self, url: str) -> str:
+        """Fetch the landing page text as the timed "landing_page" stage.
+        
+        Args:
+            url: The company website URL
+            
+        Returns:
+            Landing page contents
+        """
+        contents = self._cache_get("landing_page", f"text {url}")
+        if contents is None:
+            with self.timings.span("landing_page", url=url) as span:
+                contents = self.scraper.fetch_website_contents(url, timeout=self.fetch_timeout)
+                span.set(**text_attributes(contents))
+            self._cache_set("landing_page", f"text {url}", contents)
+        return contents
+    
+    def fetch_site_pages(self, url: str) -> tuple[str, list[tuple[dict, str]]]:
+        """Fetch landing page content and all relevant linked pages.
+        
+        The stages run as a dependency graph rather than in sequence: the
+        landing page text is fetched while the links are scraped and the
+        link selection model runs, and each selected page is submitted for
+        fetching as soon as it is streamed out of the model's response, while
+        the rest of the selection is still being generated. With
+        ``speculative_prefetch``, conventional pages are fetched before the
+        model even answers. Stage timings are recorded in ``self.timings``.
+        
+        Args:
+            url: The company website URL
+            
+        Returns:
+            Tuple of the landing page contents and a list of (link, page
+            contents) pairs in selection order
+        """
+        self.timings = Tracer()
+        self._prefetched_urls = set()
+        if self.speculative_prefetch:
+            self._prefetch_pool = ThreadPoolExecutor(max_workers=max(1, self.prefetch_limit))
+        links = []
+        page_futures = []
+        try:
+            with ThreadPoolExecutor(max_workers=1) as landing_pool, \
+                    ThreadPoolExecutor(max_workers=max(1, self.fetch_concurrency)) as page_pool:
+                landing_future = landing_pool.submit(self._fetch_landing_contents, url)
+                for link in self.iter_relevant_links(url):
+                    links.append(link)
+                    page_futures.append(page_pool.submit(self._fetch_link_contents, link))
+                contents = landing_future.result()
+                pages = [future.result() for future in page_futures]
+        finally:
+            if self._prefetch_pool is not None:
+                # Don't wait for speculative fetches nobody asked for
+                self._prefetch_pool.shutdown(wait=False, cancel_futures=True)
+                self._prefetch_pool = None
+        
+        if self._prefetched_urls:
+            picked = {normalize_url(link["url"], link["url"]) or link["url"] for link in links}
+            self.prefetch_stats.add(wasted=len(self._prefetched_urls - picked))
+        return contents, list(zip(links, pages))
+    
+    def _page_sections(self, url: str) -> list[PageSection]:
+        """Fetch the site and return its pages as context sections.
+        
+        With ``strip_boilerplate``, lines repeated across most pages are
+        kept only where they first occur (usually the landing page).
+        
+        Args:
+            url: The company website URL
+            
+        Returns:
+            The landing page section followed by one section per relevant
+            page, in link type priority order
+        """
+        contents, pages = self.fetch_site_pages(url)
+        # Sort before the first page takes the group heading, so it stays on top
+        pages = sorted(pages, key=lambda page: link_type_rank(page[0]["type"]))
+        texts = [contents] + [page for _, page in pages]
+        if self.strip_boilerplate:
+            texts = remove_boilerplate(texts)
+        sections = [PageSection("## Landing Page:\n\n", texts[0], "landing page")]
+        for i, ((link, _), page) in enumerate(zip(pages, texts[1:])):
+            heading = f"\n\n### Link: {link['type']}\n"
+            if i == 0:
+                heading = "\n## Relevant Links:\n" + heading
+            sections.append(PageSection(heading, page, link["type"]))
+        return sections
     
     def fetch_page_and_all_relevant_links(self, url: str) -> str:
         """Fetch landing page content and all relevant linked pages.
@@ -146,39 +653,89 @@ Links (some might be relative links):
         Returns:
             Formatted string containing landing page and all relevant pages content
         """
-        contents = self.scraper.fetch_website_contents(url)
-        relevant_links = self.select_relevant_links(url)
-        result = f"## Landing Page:\n\n{contents}\n## Relevant Links:\n"
-        for link in relevant_links.get("links", []):
-            result += f"\n\n### Link: {link['type']}\n"
-            try:
-                result += self.scraper.fetch_website_contents(link["url"])
-            except Exception as e:
-                result += f"Error fetching content: {str(e)}"
-        return result
+        return "".join(section.heading + section.text for section in self._page_sections(url))
+    
+    @property
+    def token_counter(self) -> TokenCounter:
+        """Token counter for the current brochure model."""
+        if self._token_counter is None or self._token_counter.model != self.brochure_model:
+            self._token_counter = TokenCounter(self.brochure_model)
+        return self._token_counter
     
     def _get_brochure_user_prompt(self, company_name: str, url: str) -> str:
         """Build user prompt for brochure generation.
-        
+
+        The landing page and relevant pages share ``context_token_budget``
+        tokens: pages are ordered by link type, short pages are kept whole
+        and longer ones are trimmed to their share, so every page is
+        represented. With ``relevance_ranking``, pages are first reduced to
+        their paragraphs most relevant to the brochure.
+
         Args:
             company_name: Name of the company
             url: The company website URL
-            
+
         Returns:
             User prompt containing company info and website content
         """
-        user_prompt = f"""
+        header = f"""
 You are looking at a company called: {company_name}
 Here are the contents of its landing page and other relevant pages;
 use this information to build a short brochure of the company in markdown without code blocks.\n\n
 """
-        user_prompt += self.fetch_page_and_all_relevant_links(url)
-        user_prompt = user_prompt[:5_000]  # Truncate if more than 5,000 characters
-        return user_prompt
+        sections = self._page_sections(url)
+        if self.relevance_ranking:
+            sections = self._rank_sections(header, sections)
+        with self.timings.span("prompt_assembly", pages=len(sections),
+                               budget=self.context_token_budget) as span:
+            prompt = assemble_context(
+                header, sections, self.token_counter, self.context_token_budget
+            )
+            span.set(tokens=self.token_counter.count(prompt), **text_attributes(prompt))
+        return prompt
+    
+    def _rank_sections(self, header: str, sections: list[PageSection]) -> list[PageSection]:
+        """Reduce each section to its most relevant paragraphs within the budget.
+        
+        Args:
+            header: Prompt text preceding the sections
+            sections: Page sections, landing page first
+            
+        Returns:
+            The sections with their text reduced to the kept paragraphs
+        """
+        counter = self.token_counter
+        available = self.context_token_budget - counter.count(header) - sum(
+            counter.count(section.heading) for section in sections
+        )
+        with self.timings.span("relevance_ranking", pages=len(sections)) as span:
+            texts = select_paragraphs([section.text for section in sections], counter, available)
+            span.set(input_chars=sum(len(section.text) for section in sections),
+                     kept_chars=sum(len(text) for text in texts))
+        return [PageSection(section.heading, text, section.link_type)
+                for section, text in zip(sections, texts)]
+    
+    def _get_brochure_messages(self, company_name: str, url: str) -> list[dict]:
+        """Build the chat messages for brochure generation.
+        
+        Args:
+            company_name: Name of the company
+            url: The company website URL
+            
+        Returns:
+            System and user messages for the brochure model
+        """
+        return [
+            {"role": "system", "content": self.brochure_system_prompt},
+            {"role": "user", "content": self._get_brochure_user_prompt(company_name, url)}
+        ]
     
     def create_brochure(self, company_name: str, url: str) -> str:
         """Generate a company brochure.
         
+        With a stage cache, a brochure already generated from the same model
+        and prompt is returned without calling the model.
+        
         Args:
             company_name: Name of the company
             url: The company website URL
@@ -186,38 +743,74 @@ use this information to build a short brochure of the company in markdown withou
         Returns:
             Markdown-formatted brochure content
         """
-        response = self.client.chat.completions.create(
-            model=self.brochure_model,
-            messages=[
-                {"role": "system", "content": BROCHURE_SYSTEM_PROMPT},
-                {"role": "user", "content": self._get_brochure_user_prompt(company_name, url)}
-            ],
-        )
-        return response.choices[0].message.content
+        messages = self._get_brochure_messages(company_name, url)
+        cache_key = brochure_key(self.brochure_model, messages)
+        cached = self._cache_get("brochure", cache_key)
+        if cached is not None:
+            return cached
+        with self.timings.span("brochure_generation", model=self.brochure_model) as span:
+            response = self.brochure_client.chat.completions.create(
+                model=self.brochure_model,
+                messages=messages,
+            )
+            brochure = response.choices[0].message.content
+            span.set(backend=self._brochure_backend())
+            span.set(**usage_attributes(getattr(response, "usage", None)))
+            if isinstance(brochure, str):
+                span.set(**text_attributes(brochure))
+        self._cache_set("brochure", cache_key, brochure)
+        return brochure
     
-    def stream_brochure(self, company_name: str, url: str):
+    def stream_brochure(self, company_name: str, url: str,
+                        cancelled: threading.Event | None = None):
         """Generate and stream a company brochure with real-time output.
         
+        With a stage cache, a brochure already generated from the same model
+        and prompt is yielded as a single chunk.
+        
         Args:
             company_name: Name of the company
             url: The company website URL
+            cancelled: Event that, once set, ends the stream early; checked
+                before the site is crawled and before the brochure model is
+                called, so an abandoned run skips the expensive stages
             
         Yields:
             str: Chunks of the generated brochure as they arrive
         """
-        stream = self.client.chat.completions.create(
-            model=self.brochure_model,
-            messages=[
-                {"role": "system", "content": BROCHURE_SYSTEM_PROMPT},
-                {"role": "user", "content": self._get_brochure_user_prompt(company_name, url)}
-            ],
-            stream=True
-        )
-        
-        for chunk in stream:
-            content = chunk.choices[0].delta.content or ""
-            if content:
-                yield content
+        if cancelled is not None and cancelled.is_set():
+            return
+        messages = self._get_brochure_messages(company_name, url)
+        cache_key = brochure_key(self.brochure_model, messages)
+        cached = self._cache_get("brochure", cache_key)
+        if cached is not None:
+            yield cached
+            return
+        if cancelled is not None and cancelled.is_set():
+            return
+        chunks = []
+        with self.timings.span("brochure_generation", model=self.brochure_model) as span:
+            stream = self.brochure_client.chat.completions.create(
+                model=self.brochure_model,
+                messages=messages,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            
+            for chunk in stream:
+                span.set(**usage_attributes(getattr(chunk, "usage", None)))
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content or ""
+                if content:
+                    if not chunks:
+                        first = self.timings.mark("brochure_generation first_token")
+                        span.set(time_to_first_token=round(first.start - span.start, 6),
+                                 backend=self._brochure_backend())
+                    chunks.append(content)
+                    yield content
+            span.set(**text_attributes("".join(chunks)))
+        self._cache_set("brochure", cache_key, "".join(chunks))
 
 
 def main():
@@ -259,6 +852,9 @@ def main():
             brochure = generator.create_brochure(company_name, url)
             print(f"# Brochure for {company_name}\n")
             print(brochure)
+        
+        print()
+        print(generator.timings.format_report())
     except KeyboardInterrupt:
         print("\n\nBrochure generation cancelled.")
         sys.exit(0)
@@ -0,0 +1,191 @@
+"""context_builder.py
+
+Token-budgeted assembly of the brochure model's input.
+
+Rather than concatenating every page and cutting the result at a fixed
+number of characters (which silently drops whole pages once the landing
+page is long), the assembler:
+1. Counts the tokens of each page with the brochure model's tokenizer
+2. Splits a token budget between pages, in priority order by link type;
+   short pages keep all their text and leave the rest to longer ones
+3. Trims each page to its share, marking pages that were cut
+4. Joins all sections once
+
+Author: scotton
+Created: 2026-01-22
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import tiktoken
+
+
+# Link types in the order they are given budget and appear in the prompt;
+# the landing page always comes first and unknown types come last
+LINK_TYPE_PRIORITY = (
+    "about page",
+    "careers page",
+    "team page",
+    "customers page",
+    "product page",
+    "news page",
+)
+
+TRUNCATION_MARKER = "\n[... truncated]"
+
+
+@lru_cache(maxsize=None)
+def _encoding_for_model(model: str):
+    """Return the tiktoken encoding for a model, or None if it can't be loaded.
+
+    Encodings are downloaded on first use, so this can fail offline.
+    """
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+class TokenCounter:
+    """Counts and trims text in tokens of a given model.
+
+    Falls back to an estimate of ``chars_per_token`` characters per token
+    when the model's encoding is unavailable.
+
+    Attributes:
+        model (str): Model whose tokenizer is used
+        encoding (tiktoken.Encoding | None): The tokenizer, or None when estimating
+    """
+
+    def __init__(self, model: str = "gpt-4.1-mini", encoding=None, chars_per_token: float = 4.0):
+        """Initialize the counter.
+
+        Args:
+            model: Model whose tokenizer is used (default: "gpt-4.1-mini")
+            encoding: Explicit tiktoken encoding; looked up from model if None
+            chars_per_token: Characters per token used when estimating
+        """
+        self.model = model
+        self.encoding = encoding if encoding is not None else _encoding_for_model(model)
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        """Return the number of tokens in text."""
+        if self.encoding is None:
+            return -(-len(text) // int(self.chars_per_token)) if text else 0
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Return the longest prefix of text that fits in max_tokens tokens."""
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is None:
+            return text[:int(max_tokens * self.chars_per_token)]
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self.encoding.decode(tokens[:max_tokens])
+
+
+@dataclass
+class PageSection:
+    """One page of the brochure context.
+
+    Attributes:
+        heading: Markdown heading introducing the page
+        text: Page contents
+        link_type: Link type used for ordering and budget priority
+    """
+    heading: str
+    text: str
+    link_type: str = "other page"
+
+
+def link_type_rank(link_type: str) -> int:
+    """Return the priority of a link type; lower comes first."""
+    try:
+        return LINK_TYPE_PRIORITY.index(link_type)
+    except ValueError:
+        return len(LINK_TYPE_PRIORITY)
+
+
+def allocate_budget(sizes: list[int], budget: int, min_share: int = 0) -> list[int]:
+    """Split a token budget between pages.
+
+    Every page first gets up to ``min_share`` tokens, so none is dropped
+    while budget remains. The rest is shared equally, and whatever a
+    page doesn't need is passed on to the others. Budget left over from
+    rounding goes to the earliest pages.
+
+    Args:
+        sizes: Token count of each page, in priority order
+        budget: Total tokens available
+        min_share: Tokens guaranteed to each page before sharing
+
+    Returns:
+        Tokens allotted to each page, never more than its size
+    """
+    shares = [0] * len(sizes)
+    remaining = max(0, budget)
+    for i, size in enumerate(sizes):
+        shares[i] = min(size, min_share, remaining)
+        remaining -= shares[i]
+
+    open_pages = [i for i, size in enumerate(sizes) if shares[i] < size]
+    while remaining > 0 and open_pages:
+        per_page = remaining // len(open_pages)
+        if per_page == 0:
+            for i in open_pages[:remaining]:
+                shares[i] += 1
+            break
+        for i in open_pages:
+            extra = min(per_page, sizes[i] - shares[i])
+            shares[i] += extra
+            remaining -= extra
+        open_pages = [i for i in open_pages if shares[i] < sizes[i]]
+    return shares
+
+
+def assemble_context(
+    header: str,
+    sections: list[PageSection],
+    counter: TokenCounter,
+    budget: int,
+    min_share: int = 64,
+) -> str:
+    """Join the header and page sections within a token budget.
+
+    Sections are ordered by link type priority (stable within a type),
+    and each section's text is trimmed to its share of the budget left
+    after the header and headings. Trimmed sections end with a
+    truncation marker.
+
+    Args:
+        header: Text preceding the pages; always kept whole
+        sections: Pages to include; the first is kept first (landing page)
+        counter: Token counter for the target model
+        budget: Total tokens for the header and all sections
+        min_share: Tokens guaranteed to each page before sharing
+
+    Returns:
+        The assembled context
+    """
+    if sections:
+        sections = [sections[0]] + sorted(sections[1:], key=lambda s: link_type_rank(s.link_type))
+    marker_tokens = counter.count(TRUNCATION_MARKER)
+    fixed = counter.count(header) + sum(counter.count(s.heading) for s in sections)
+    sizes = [counter.count(s.text) for s in sections]
+    shares = allocate_budget(sizes, budget - fixed, min_share)
+
+    parts = [header]
+    for section, size, share in zip(sections, sizes, shares):
+        text = section.text
+        if share < size:
+            text = counter.truncate(text, share - marker_tokens) + TRUNCATION_MARKER
+        parts.append(section.heading)
+        parts.append(text)
+    return "".join(parts)
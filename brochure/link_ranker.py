@@ -0,0 +1,266 @@
+"""link_ranker.py
+
+Deterministic pre-filtering and ranking of landing page links.
+
+Before asking the link selection model which links belong in a brochure,
+the raw hrefs from the landing page are:
+1. Normalized (resolved against the page URL, fragments and tracking
+   parameters removed) and de-duplicated
+2. Filtered against deny patterns (privacy, terms, login, mailto:, files, ...)
+   and restricted to the site itself, plus known job boards hosting its
+   careers pages
+3. Scored by keywords for brochure-worthy pages (about, careers, team, ...)
+
+Only the top candidates are sent to the model, and when the scores alone
+are conclusive the model call can be skipped entirely.
+
+Author: scotton
+Created: 2026-01-21
+"""
+
+import re
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+
+# Schemes of hrefs that are not web pages
+DENY_SCHEMES = re.compile(r"^(mailto|tel|sms|javascript|data|ftp):", re.IGNORECASE)
+
+# Paths (plus query) of links that never belong in a brochure. Matched
+# against the path and query only, so a host such as legalzoom.com or
+# cookieconsent.io doesn't deny every link on the site.
+DENY_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"privacy|terms|\btos\b|legal|cookie|gdpr|imprint|impressum|disclaimer|accessibility",
+        r"\blog-?(in|out)\b|\bsign-?(in|up|out)\b|/register(?:/|$|\b)|password"
+        r"|/account(?:/|$|\b)|/auth\b|\bsso\b",
+        r"/(cart|checkout|basket|wishlist)(?:/|$|\b)",
+        r"/search(?:/|$|\b)|/tags?/|/category/|/author/|/feed\b|/rss\b|[?&]replytocom=",
+        r"\.(pdf|jpe?g|png|gif|svg|webp|zip|gz|dmg|exe|mp4|mp3|xml|json|css|js)$",
+    )
+]
+
+# Page type mapped to (keywords, weight). Keywords match whole path
+# segments or hyphen/underscore separated words within them.
+PAGE_KEYWORDS = {
+    "about page": (("about", "about-us", "company", "who-we-are", "our-story",
+                    "story", "mission", "values", "culture"), 3.0),
+    "careers page": (("careers", "career", "jobs", "join", "join-us", "hiring",
+                      "work-with-us", "opportunities", "openings", "life"), 3.0),
+    "team page": (("team", "people", "leadership", "founders", "management",
+                   "our-team"), 2.5),
+    "customers page": (("customers", "customer-stories", "case-studies", "clients",
+                        "success-stories", "testimonials", "stories"), 2.5),
+    "product page": (("product", "products", "platform", "solutions", "features",
+                      "services", "pricing"), 1.5),
+    "news page": (("news", "press", "newsroom", "media", "blog", "investors"), 1.0),
+}
+
+# Hosted job boards; off-site links to these are kept as careers pages
+JOB_BOARD_HOSTS = (
+    "lever.co", "greenhouse.io", "workable.com", "ashbyhq.com", "smartrecruiters.com",
+    "recruitee.com", "teamtailor.com", "personio.de", "bamboohr.com", "breezy.hr",
+    "myworkdayjobs.com",
+)
+
+# First path segments of the pages most company sites have; these are
+# worth fetching speculatively before the link selection model answers
+CONVENTIONAL_SEGMENTS = ("about", "about-us", "company", "careers", "jobs",
+                         "team", "our-team", "people", "customers")
+
+# Query parameters that only track the visitor
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|mc_cid|mc_eid|ref|source)$", re.IGNORECASE)
+
+
+@dataclass
+class ScoredLink:
+    """A candidate link with its guessed page type and relevance score.
+
+    Attributes:
+        url: Normalized absolute URL
+        type: Guessed page type (e.g. "about page"), or "other page"
+        score: Relevance score; higher is more brochure-worthy
+    """
+    url: str
+    type: str
+    score: float
+
+    def as_link(self) -> dict:
+        """Return the link in the link selection format."""
+        return {"type": self.type, "url": self.url}
+
+
+def site_host(url: str) -> str:
+    """Return the host of a URL without a leading 'www.'."""
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _dedup_key(url: str) -> tuple[str, str, str]:
+    """Return the parts of a normalized URL that identify a page."""
+    parts = urlsplit(url)
+    return site_host(url), parts.path.lower(), parts.query
+
+
+def normalize_url(base_url: str, href: str) -> str | None:
+    """Resolve an href against the page URL and normalize it.
+
+    Args:
+        base_url: URL of the page the href was found on
+        href: Raw href attribute value (may be relative)
+
+    Returns:
+        Normalized absolute http(s) URL, or None if the href is not a web
+        link (mailto:, javascript:, bare anchors, ...)
+    """
+    href = href.strip()
+    if not href or href.startswith("#"):
+        return None
+    if DENY_SCHEMES.match(href):
+        return None
+    parts = urlsplit(urljoin(base_url, href))
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAMS.match(key)
+    ])
+    return urlunsplit(("https" if parts.scheme == "https" else "http", host, path, query, ""))
+
+
+def is_denied(url: str) -> bool:
+    """Return True if the URL has a denied scheme or its path matches a deny pattern."""
+    if DENY_SCHEMES.match(url):
+        return True
+    parts = urlsplit(url)
+    target = f"{parts.path}?{parts.query}" if parts.query else parts.path
+    return any(pattern.search(target) for pattern in DENY_PATTERNS)
+
+
+def score_url(url: str) -> tuple[str, float]:
+    """Guess a page type for a URL and score its brochure relevance.
+
+    Exact path segment matches outweigh partial (word) matches, and
+    shallow pages outweigh deep ones such as individual blog posts.
+
+    Args:
+        url: Normalized absolute URL
+
+    Returns:
+        (page type, score); ("other page", 0.0) when no keyword matches
+    """
+    parts = urlsplit(url)
+    segments = [segment for segment in parts.path.lower().split("/") if segment]
+    host_label = (parts.hostname or "").split(".")[0]
+    best_type, best_score = "other page", 0.0
+    for page_type, (keywords, weight) in PAGE_KEYWORDS.items():
+        score = 0.0
+        for depth, segment in enumerate(segments):
+            words = set(re.split(r"[-_.]", segment))
+            if segment in keywords:
+                score = max(score, weight / (1 + 0.5 * depth))
+            elif words & set(keywords):
+                score = max(score, 0.6 * weight / (1 + 0.5 * depth))
+        if host_label in keywords:  # e.g. careers.example.com
+            score = max(score, weight)
+        score -= 0.25 * max(0, len(segments) - 2)
+        if score > best_score:
+            best_type, best_score = page_type, score
+    return best_type, round(best_score, 3)
+
+
+def is_job_board(url: str) -> bool:
+    """Return True if a URL is on a hosted job board (see JOB_BOARD_HOSTS)."""
+    host = site_host(url)
+    return any(host == board or host.endswith("." + board) for board in JOB_BOARD_HOSTS)
+
+
+def rank_links(base_url: str, hrefs: list[str], top_k: int | None = None) -> list[ScoredLink]:
+    """Normalize, de-duplicate, filter and rank the links of a page.
+
+    Links to other sites are dropped (subdomains of the site are kept),
+    except links to job boards, which rank as careers pages. The page
+    itself is dropped too. URLs differing only in scheme, a leading 'www.'
+    or path case count as duplicates; the first one seen is kept.
+
+    Args:
+        base_url: URL of the page the links were found on
+        hrefs: Raw href values from the page
+        top_k: Keep only the best top_k candidates (default: all)
+
+    Returns:
+        Candidates sorted by descending score; ties keep page order
+    """
+    site = site_host(base_url)
+    seen = {_dedup_key(normalize_url(base_url, base_url) or base_url)}
+    candidates = []
+    for href in hrefs:
+        url = normalize_url(base_url, href)
+        if url is None or _dedup_key(url) in seen:
+            continue
+        seen.add(_dedup_key(url))
+        host = site_host(url)
+        on_site = host == site or host.endswith("." + site)
+        if not on_site and not is_job_board(url):
+            continue
+        if is_denied(url):
+            continue
+        if on_site:
+            page_type, score = score_url(url)
+        else:
+            page_type, score = "careers page", PAGE_KEYWORDS["careers page"][1]
+        candidates.append(ScoredLink(url, page_type, score))
+    candidates.sort(key=lambda link: -link.score)
+    return candidates if top_k is None else candidates[:top_k]
+
+
+def confident_links(candidates: list[ScoredLink], min_score: float, min_links: int) -> list[dict]:
+    """Return the scorer's own selection if it is conclusive enough.
+
+    The selection is the best-scoring link of each page type. It is
+    conclusive when at least ``min_links`` page types have a link scoring
+    ``min_score`` or more.
+
+    Args:
+        candidates: Ranked candidates from rank_links
+        min_score: Score a link needs to count as a confident match
+        min_links: Number of distinct confident page types required
+
+    Returns:
+        Link objects with 'type' and 'url' keys, or an empty list when the
+        link selection model should decide instead
+    """
+    best = {}
+    for link in candidates:
+        if link.score >= min_score and link.type not in best:
+            best[link.type] = link
+    if len(best) < min_links:
+        return []
+    return [link.as_link() for link in best.values()]
+
+
+def conventional_links(candidates: list[ScoredLink], limit: int) -> list[ScoredLink]:
+    """Return candidates at conventional company paths (/about, /careers, ...).
+
+    Args:
+        candidates: Ranked candidates from rank_links
+        limit: Most links to return
+
+    Returns:
+        Up to ``limit`` candidates whose first path segment is conventional,
+        best first
+    """
+    found = []
+    for link in candidates:
+        segments = [segment for segment in urlsplit(link.url).path.lower().split("/") if segment]
+        if segments and segments[0] in CONVENTIONAL_SEGMENTS:
+            found.append(link)
+            if len(found) >= limit:
+                break
+    return found
@@ -0,0 +1,212 @@
+"""relevance.py
+
+Local, embedding-free relevance ranking of brochure inputs.
+
+Fetched pages are split into paragraphs and indexed with BM25. Each
+paragraph is scored against brochure facets (culture, customers,
+careers, product), and only the best paragraphs are kept within the
+token budget, so the brochure model receives dense, relevant context
+instead of every page with equal weight.
+
+Scoring is vectorized with numpy: one paragraph-by-term count matrix,
+one facet-by-term query matrix, and a single matrix product.
+
+Author: scotton
+Created: 2026-01-22
+"""
+
+import re
+
+import numpy as np
+
+
+# Facet mapped to the words that signal it
+FACETS = {
+    "culture": ("culture", "values", "mission", "vision", "team", "people", "diversity",
+                "inclusion", "remote", "community", "believe", "story", "founded", "founder"),
+    "customers": ("customer", "client", "trusted", "case", "partner", "industry",
+                  "enterprise", "testimonial", "success", "companies", "organization", "user"),
+    "careers": ("career", "job", "hiring", "join", "role", "position", "opening", "benefit",
+                "salary", "internship", "apply", "talent", "grow"),
+    "product": ("product", "platform", "feature", "solution", "service", "pricing", "api",
+                "tool", "model", "build", "deploy", "integration", "open", "source"),
+}
+
+WORD = re.compile(r"[a-z0-9]+")
+
+
+def stem(word: str) -> str:
+    """Reduce a word to a crude stem (plural 's' only), e.g. careers -> career."""
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> list[str]:
+    """Return the lower-cased, stemmed words of a text."""
+    return [stem(word) for word in WORD.findall(text.lower())]
+
+
+def split_paragraphs(text: str, max_chars: int = 500) -> list[str]:
+    """Split page text into paragraphs of at most about max_chars characters.
+
+    Blank lines always end a paragraph. Pages extracted one line per
+    element (as the Scraper does) are grouped into runs of lines up to
+    max_chars; a single longer line is split on word boundaries.
+
+    Args:
+        text: Page text
+        max_chars: Target paragraph length (default: 500)
+
+    Returns:
+        Non-empty paragraphs, in page order
+    """
+    paragraphs = []
+    for block in re.split(r"\n\s*\n", text):
+        current = []
+        length = 0
+        for line in (line.strip() for line in block.splitlines()):
+            if not line:
+                continue
+            while len(line) > max_chars:
+                cut = line.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                if current:
+                    paragraphs.append("\n".join(current))
+                    current, length = [], 0
+                paragraphs.append(line[:cut].rstrip())
+                line = line[cut:].lstrip()
+            if current and length + len(line) > max_chars:
+                paragraphs.append("\n".join(current))
+                current, length = [], 0
+            if line:
+                current.append(line)
+                length += len(line) + 1
+        if current:
+            paragraphs.append("\n".join(current))
+    return paragraphs
+
+
+class BM25Index:
+    """BM25 index over a list of documents.
+
+    Attributes:
+        vocabulary (dict): Term mapped to its column in the count matrix
+        counts (np.ndarray): Documents x terms matrix of term frequencies
+        idf (np.ndarray): Inverse document frequency of each term
+    """
+
+    def __init__(self, documents: list[str], k1: float = 1.5, b: float = 0.75):
+        """Build the index.
+
+        Args:
+            documents: Texts to index
+            k1: Term frequency saturation (default: 1.5)
+            b: Document length normalization (default: 0.75)
+        """
+        tokenized = [tokenize(document) for document in documents]
+        self.vocabulary = {}
+        term_ids, doc_ids = [], []
+        for doc_id, tokens in enumerate(tokenized):
+            for token in tokens:
+                term_ids.append(self.vocabulary.setdefault(token, len(self.vocabulary)))
+                doc_ids.append(doc_id)
+        self.counts = np.zeros((len(documents), len(self.vocabulary)), dtype=np.float32)
+        np.add.at(self.counts, (np.array(doc_ids, dtype=np.intp),
+                                np.array(term_ids, dtype=np.intp)), 1)
+
+        n = len(documents)
+        df = np.count_nonzero(self.counts, axis=0)
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        lengths = self.counts.sum(axis=1, keepdims=True)
+        average = lengths.mean() if n and lengths.mean() > 0 else 1.0
+        # Saturated, length-normalized term frequencies, computed once
+        self._weights = self.counts * (k1 + 1) / (self.counts + k1 * (1 - b + b * lengths / average))
+
+    def query_matrix(self, queries: list[list[str]]) -> np.ndarray:
+        """Return a queries x terms matrix of IDF-weighted query terms."""
+        matrix = np.zeros((len(queries), len(self.vocabulary)), dtype=np.float32)
+        for row, terms in enumerate(queries):
+            for term in terms:
+                column = self.vocabulary.get(stem(term.lower()))
+                if column is not None:
+                    matrix[row, column] = self.idf[column]
+        return matrix
+
+    def score(self, queries: list[list[str]]) -> np.ndarray:
+        """Score every document against every query.
+
+        Args:
+            queries: Each query as a list of terms
+
+        Returns:
+            Documents x queries matrix of BM25 scores
+        """
+        if not self.vocabulary:
+            return np.zeros((self.counts.shape[0], len(queries)), dtype=np.float32)
+        return self._weights @ self.query_matrix(queries).T
+
+
+def facet_scores(paragraphs: list[str], facets: dict = FACETS) -> np.ndarray:
+    """Score paragraphs against facets, each facet scaled to a best score of 1.
+
+    Args:
+        paragraphs: Paragraphs to score
+        facets: Facet mapped to its signal words (default: FACETS)
+
+    Returns:
+        Paragraphs x facets matrix of scores in [0, 1]
+    """
+    scores = BM25Index(paragraphs).score([list(words) for words in facets.values()])
+    best = scores.max(axis=0, initial=0.0)
+    return scores / np.where(best > 0, best, 1.0)
+
+
+def select_paragraphs(pages: list[str], counter, budget: int, facets: dict = FACETS) -> list[str]:
+    """Keep the most relevant paragraphs of each page within a token budget.
+
+    A paragraph's relevance is its best facet score. The best paragraph
+    of every page is taken first, in page order, and kept even if it
+    doesn't fit, so no page is dropped (the context assembler trims it);
+    then the remaining paragraphs with any relevance, best first, while
+    they fit. Kept paragraphs stay in their original order.
+
+    Args:
+        pages: Text of each page, most important first
+        counter: Token counter with a ``count(text)`` method
+        budget: Tokens available for all kept paragraphs
+        facets: Facet mapped to its signal words (default: FACETS)
+
+    Returns:
+        The pages, in the same order, reduced to their kept paragraphs
+    """
+    split = [split_paragraphs(page) for page in pages]
+    paragraphs = [paragraph for page in split for paragraph in page]
+    if not paragraphs:
+        return list(pages)
+    page_of = np.repeat(np.arange(len(split)), [len(page) for page in split])
+    relevance = facet_scores(paragraphs, facets).max(axis=1)
+    tokens = np.array([counter.count(paragraph) + 1 for paragraph in paragraphs])
+
+    # Best paragraph per page (first paragraph on ties), then the rest by relevance
+    order = np.lexsort((np.arange(len(paragraphs)), -relevance))
+    first_per_page = {}
+    for index in order:
+        first_per_page.setdefault(int(page_of[index]), int(index))
+    candidates = [first_per_page[page] for page in sorted(first_per_page)]
+    taken = set(candidates)
+    candidates += [int(index) for index in order
+                   if relevance[index] > 0 and int(index) not in taken]
+
+    kept = np.zeros(len(paragraphs), dtype=bool)
+    remaining = budget
+    for rank, index in enumerate(candidates):
+        if tokens[index] <= remaining or rank < len(first_per_page):
+            kept[index] = True
+            remaining -= tokens[index]
+
+    reduced = []
+    for page in range(len(split)):
+        indices = np.flatnonzero((page_of == page) & kept)
+        reduced.append("\n".join(paragraphs[index] for index in indices))
+    return reduced
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""server.py
+
+Asynchronous HTTP service streaming brochures as Server-Sent Events.
+
+``GET /brochure?company=<name>&url=<website>`` streams the brochure as it
+is generated:
+
+    event: chunk
+    data: {"text": "# HuggingFace\\n..."}
+
+    event: done
+    data: {}
+
+Failures end the stream with an ``error`` event. ``GET /health`` returns
+the service counters as JSON.
+
+Concurrent requests for the same company and URL are coalesced: one
+generation (crawl, link selection and brochure model) runs, and its
+chunks are fanned out to every subscriber. Each subscriber follows the
+shared output at its own pace, so a slow client never stalls the others;
+when it falls behind, the chunks it missed are sent as one larger event,
+and a client that stops reading for ``write_timeout`` seconds is
+disconnected. A generation whose subscribers have all left is cancelled.
+
+Usage:
+    uv run python server.py --host 127.0.0.1 --port 8000
+
+Author: scotton
+Created: 2026-01-22
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+sys.path.insert(0, str(Path(__file__).parent))
+from brochure import BrochureGenerator
+from link_ranker import normalize_url, site_host
+
+
+class BrochureStreamError(Exception):
+    """Raised to subscribers when the shared generation fails."""
+
+
+class _Generation:
+    """Output of one brochure generation, shared by its subscribers.
+
+    Lives on the event loop; the producer thread hands it chunks with
+    ``loop.call_soon_threadsafe``.
+    """
+
+    def __init__(self, key: tuple[str, str]):
+        self.key = key
+        self.chunks: list[str] = []
+        self.done = False
+        self.error: str | None = None
+        self.subscribers = 0
+        self.cancelled = threading.Event()
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def publish(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: str | None = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def follow(self):
+        """Yield the output from the start, joining chunks a reader fell behind on."""
+        cursor = 0
+        while True:
+            if cursor < len(self.chunks):
+                text = "".join(self.chunks[cursor:])
+                cursor = len(self.chunks)
+                yield text
+            elif self.done:
+                if self.error is not None:
+                    raise BrochureStreamError(self.error)
+                return
+            else:
+                await self._changed.wait()
+
+
+class BrochureService:
+    """Runs brochure generations and fans their output out to subscribers.
+
+    Generations run on a thread pool, each worker thread with its own
+    BrochureGenerator (a generator keeps per-run state).
+
+    Attributes:
+        stats (dict): Counters: generations, coalesced, cancelled, failed,
+            dropped_clients
+    """
+
+    def __init__(self, max_generations: int = 4, generator_factory=None, **generator_kwargs):
+        """Initialize the service.
+
+        Args:
+            max_generations: Most brochures generated at once (default: 4)
+            generator_factory: Function returning a new BrochureGenerator
+            **generator_kwargs: Passed to BrochureGenerator by the default factory
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_generations))
+        self._generator_factory = generator_factory or (lambda: BrochureGenerator(**generator_kwargs))
+        self._local = threading.local()
+        self._generations: dict[tuple[str, str], _Generation] = {}
+        self.stats = {"generations": 0, "coalesced": 0, "cancelled": 0, "failed": 0,
+                      "dropped_clients": 0}
+
+    @staticmethod
+    def key(company: str, url: str) -> tuple[str, str]:
+        """Return the coalescing key for a request.
+
+        Company names ignore case and extra whitespace; URLs are normalized
+        and a leading 'www.' is ignored.
+        """
+        normalized = normalize_url(url, url) or url.strip()
+        parts = urlsplit(normalized)
+        site = f"{site_host(normalized)}{parts.path.rstrip('/')}"
+        if parts.query:
+            site += f"?{parts.query}"
+        return " ".join(company.split()).lower(), site
+
+    @property
+    def in_flight(self) -> int:
+        """Generations currently running."""
+        return len(self._generations)
+
+    def _generator(self) -> BrochureGenerator:
+        generator = getattr(self._local, "generator", None)
+        if generator is None:
+            generator = self._local.generator = self._generator_factory()
+        return generator
+
+    def _produce(self, generation: _Generation, company: str, url: str, loop) -> None:
+        """Run one generation on a worker thread, publishing to the loop."""
+        error = None
+        stream = None
+        try:
+            if generation.cancelled.is_set():
+                return  # Everyone left while this waited for a worker
+            stream = self._generator().stream_brochure(company, url,
+                                                       cancelled=generation.cancelled)
+            for chunk in stream:
+                if generation.cancelled.is_set():
+                    break
+                loop.call_soon_threadsafe(generation.publish, chunk)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        finally:
+            if stream is not None:
+                stream.close()
+            loop.call_soon_threadsafe(self._finish, generation, error)
+
+    def _finish(self, generation: _Generation, error: str | None) -> None:
+        if error is not None:
+            self.stats["failed"] += 1
+        if self._generations.get(generation.key) is generation:
+            del self._generations[generation.key]
+        generation.finish(error)
+
+    async def stream(self, company: str, url: str):
+        """Stream a brochure, joining a running generation for the same site.
+
+        Args:
+            company: Company name
+            url: Company website URL
+
+        Yields:
+            str: Brochure text, in order; one item may hold several chunks
+
+        Raises:
+            BrochureStreamError: If the generation fails
+        """
+        key = self.key(company, url)
+        generation = self._generations.get(key)
+        if generation is None:
+            generation = self._generations[key] = _Generation(key)
+            self.stats["generations"] += 1
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(self._executor, self._produce, generation, company, url, loop)
+        else:
+            self.stats["coalesced"] += 1
+        generation.subscribers += 1
+        try:
+            async for text in generation.follow():
+                yield text
+        finally:
+            generation.subscribers -= 1
+            if generation.subscribers == 0 and not generation.done:
+                generation.cancelled.set()
+                self.stats["cancelled"] += 1
+                if self._generations.get(key) is generation:
+                    del self._generations[key]
+
+    def shutdown(self) -> None:
+        """Cancel running generations and stop the worker threads."""
+        for generation in self._generations.values():
+            generation.cancelled.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def sse_event(event: str, data: dict) -> bytes:
+    """Encode one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+class BrochureServer:
+    """Minimal HTTP/1.1 server exposing a BrochureService over SSE.
+
+    Attributes:
+        service (BrochureService): The service streams are taken from
+        write_timeout (float): Seconds a client may take to accept data
+            before it is disconnected
+    """
+
+    def __init__(
+        self,
+        service: BrochureService,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        write_timeout: float = 30.0,
+        write_buffer: int = 16 * 1024
+    ):
+        """Initialize the server.
+
+        Args:
+            service: Service streams are taken from
+            host: Interface to listen on (default: "127.0.0.1")
+            port: Port to listen on; 0 picks a free one (default: 8000)
+            write_timeout: Seconds a client may take to accept data (default: 30.0)
+            write_buffer: Bytes buffered per client before writes wait for it
+                (default: 16 KiB)
+        """
+        self.service = service
+        self.host = host
+        self.port = port
+        self.write_timeout = write_timeout
+        self.write_buffer = write_buffer
+        self._server = None
+
+    async def start(self) -> None:
+        """Start listening; ``port`` is updated if it was 0."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.service.shutdown()
+
+    async def _respond(self, writer, status: str, body: dict) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+            + payload
+        )
+        await writer.drain()
+
+    async def _send(self, writer, event: str, data: dict) -> None:
+        writer.write(sse_event(event, data))
+        await asyncio.wait_for(writer.drain(), self.write_timeout)
+
+    async def _handle(self, reader, writer) -> None:
+        """Serve one connection (one request)."""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), self.write_timeout)
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # headers are not needed
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2 or parts[0] != "GET":
+                await self._respond(writer, "405 Method Not Allowed", {"error": "only GET is supported"})
+                return
+            target = urlsplit(parts[1])
+            if target.path == "/health":
+                await self._respond(writer, "200 OK", {"in_flight": self.service.in_flight,
+                                                       **self.service.stats})
+                return
+            if target.path != "/brochure":
+                await self._respond(writer, "404 Not Found", {"error": "not found"})
+                return
+            params = parse_qs(target.query)
+            company = params.get("company", [""])[0].strip()
+            url = params.get("url", [""])[0].strip()
+            if not company or not url:
+                await self._respond(writer, "400 Bad Request",
+                                    {"error": "company and url are required"})
+                return
+            await self._stream(writer, company, url)
+        except (ConnectionError, asyncio.TimeoutError):
+            pass
+        finally:
+            writer.close()
+
+    async def _stream(self, writer, company: str, url: str) -> None:
+        writer.transport.set_write_buffer_limits(high=self.write_buffer)
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+            b"Connection: close\r\nX-Accel-Buffering: no\r\n\r\n"
+        )
+        try:
+            async with aclosing(self.service.stream(company, url)) as stream:
+                async for text in stream:
+                    await self._send(writer, "chunk", {"text": text})
+            await self._send(writer, "done", {})
+        except BrochureStreamError as e:
+            await self._send(writer, "error", {"error": str(e)})
+        except (ConnectionError, asyncio.TimeoutError):
+            self.service.stats["dropped_clients"] += 1
+            raise
+
+
+def main(argv: list[str] | None = None):
+    """Command line entry point for the brochure service."""
+    parser = argparse.ArgumentParser(description="Stream brochures over Server-Sent Events.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-generations", type=int, default=4,
+                        help="Most brochures generated at once")
+    parser.add_argument("--write-timeout", type=float, default=30.0,
+                        help="Seconds before a client that stopped reading is dropped")
+    args = parser.parse_args(argv)
+
+    service = BrochureService(max_generations=args.max_generations)
+    server = BrochureServer(service, args.host, args.port, write_timeout=args.write_timeout)
+    print(f"Serving brochures on http://{args.host}:{args.port}/brochure?company=...&url=...")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""stage_cache.py
+
+Caches for brochure pipeline results.
+
+Each pipeline stage gets its own cache, with its own time-to-live and
+storage backend, so regenerating a brochure only redoes the stages
+downstream of what actually changed:
+
+- landing_page: landing page text and links, by URL
+- selected_links: relevant links chosen for a site, by domain and model
+- page_contents: fetched relevant pages, by URL
+- brochure: generated brochures, by model and a hash of the prompt
+
+Two backends share the same get/set interface: ``TTLCache`` (in memory)
+and ``DiskCache`` (JSON files, shared between runs and processes).
+
+Author: scotton
+Created: 2026-01-21
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+class TTLCache:
+    """A thread-safe in-memory cache whose entries expire after a fixed time.
+
+    When full, the least recently used entry is evicted first.
+
+    Attributes:
+        ttl (float): Seconds an entry stays valid after it is set
+        max_entries (int | None): Most entries kept, or None for no limit
+    """
+
+    _MISSING = object()
+
+    def __init__(self, ttl: float, max_entries: int | None = 1024, clock=time.monotonic):
+        """Initialize an empty cache.
+
+        Args:
+            ttl: Seconds an entry stays valid after it is set
+            max_entries: Most entries kept, or None for no limit (default: 1024)
+            clock: Function returning the current time in seconds
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key, default=None):
+        """Return the value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key, self._MISSING)
+            if entry is self._MISSING:
+                return default
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        """Store value under key for the next ``ttl`` seconds."""
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Remove key and return its value, or default if missing or expired."""
+        value = self.get(key, self._MISSING)
+        if value is self._MISSING:
+            return default
+        with self._lock:
+            self._entries.pop(key, None)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, self._MISSING) is not self._MISSING
+
+    def __len__(self) -> int:
+        self.purge()
+        return len(self._entries)
+
+    def purge(self) -> None:
+        """Drop all expired entries."""
+        now = self._clock()
+        with self._lock:
+            for key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCache:
+    """A cache of JSON-serializable values stored as files in a directory.
+
+    Entries survive restarts and can be shared by several processes.
+    Expiry uses wall-clock time.
+
+    Attributes:
+        directory (Path): Where entries are stored
+        ttl (float): Seconds an entry stays valid after it is set
+    """
+
+    _MISSING = object()
+
+    def __init__(self, directory: str | Path, ttl: float, clock=time.time):
+        """Initialize the cache, creating the directory if needed.
+
+        Args:
+            directory: Where entries are stored
+            ttl: Seconds an entry stays valid after it is set
+            clock: Function returning the current time in seconds
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._clock = clock
+
+    def _path(self, key) -> Path:
+        digest = hashlib.sha256(str(key).encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get(self, key, default=None):
+        """Return the value for key, or default if missing or expired."""
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return default
+        if entry.get("expires_at", 0) <= self._clock():
+            path.unlink(missing_ok=True)
+            return default
+        return entry.get("value", default)
+
+    def set(self, key, value) -> None:
+        """Store value under key for the next ``ttl`` seconds.
+
+        The file is written atomically so concurrent readers never see a
+        partial entry.
+        """
+        entry = {"key": str(key), "expires_at": self._clock() + self.ttl, "value": value}
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    def pop(self, key, default=None):
+        """Remove key and return its value, or default if missing or expired."""
+        value = self.get(key, self._MISSING)
+        self._path(key).unlink(missing_ok=True)
+        return default if value is self._MISSING else value
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, self._MISSING) is not self._MISSING
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+
+# Default time-to-live per stage, in seconds
+DEFAULT_STAGE_TTLS = {
+    "landing_page": 60 * 60,
+    "selected_links": 24 * 60 * 60,
+    "page_contents": 60 * 60,
+    "brochure": 7 * 24 * 60 * 60,
+}
+
+
+class StageCache:
+    """Per-stage caches for the brochure pipeline, with hit/miss counters.
+
+    Stages without a backend are simply not cached.
+
+    Attributes:
+        backends (dict): Stage name mapped to its cache backend
+        hits (dict): Stage name mapped to its number of cache hits
+        misses (dict): Stage name mapped to its number of cache misses
+    """
+
+    _MISSING = object()
+
+    def __init__(self, backends: dict):
+        """Initialize with explicit backends.
+
+        Args:
+            backends: Stage name mapped to a backend with get/set methods
+                (``TTLCache``, ``DiskCache`` or anything alike)
+        """
+        self.backends = dict(backends)
+        self._lock = threading.Lock()
+        self.hits = {stage: 0 for stage in self.backends}
+        self.misses = {stage: 0 for stage in self.backends}
+
+    @classmethod
+    def in_memory(cls, ttls: dict | None = None) -> "StageCache":
+        """Build a cache keeping every stage in memory.
+
+        Args:
+            ttls: Stage name mapped to its TTL in seconds; overrides
+                DEFAULT_STAGE_TTLS
+        """
+        ttls = {**DEFAULT_STAGE_TTLS, **(ttls or {})}
+        return cls({stage: TTLCache(ttl) for stage, ttl in ttls.items()})
+
+    @classmethod
+    def on_disk(cls, directory: str | Path, ttls: dict | None = None) -> "StageCache":
+        """Build a cache keeping every stage on disk, one subdirectory per stage.
+
+        Args:
+            directory: Root directory for the cache
+            ttls: Stage name mapped to its TTL in seconds; overrides
+                DEFAULT_STAGE_TTLS
+        """
+        ttls = {**DEFAULT_STAGE_TTLS, **(ttls or {})}
+        return cls({stage: DiskCache(Path(directory) / stage, ttl) for stage, ttl in ttls.items()})
+
+    def get(self, stage: str, key, default=None):
+        """Return the cached value for key in a stage, or default."""
+        backend = self.backends.get(stage)
+        if backend is None:
+            return default
+        value = backend.get(key, self._MISSING)
+        with self._lock:
+            if value is self._MISSING:
+                self.misses[stage] += 1
+                return default
+            self.hits[stage] += 1
+        return value
+
+    def set(self, stage: str, key, value) -> None:
+        """Store a value for key in a stage (ignored for uncached stages)."""
+        backend = self.backends.get(stage)
+        if backend is not None:
+            backend.set(key, value)
+
+    def invalidate(self, stage: str, key) -> None:
+        """Drop one cached value from a stage."""
+        backend = self.backends.get(stage)
+        if backend is not None:
+            backend.pop(key, None)
+
+    def stats(self) -> dict:
+        """Return hits and misses per stage."""
+        with self._lock:
+            return {stage: {"hits": self.hits[stage], "misses": self.misses[stage]}
+                    for stage in self.backends}
+
+
+def brochure_key(model: str, messages: list[dict]) -> str:
+    """Build the brochure stage key from the model and a hash of the prompt.
+
+    Args:
+        model: The brochure model
+        messages: The chat messages sent to the model
+
+    Returns:
+        Key of the form "<model>:<sha256 of the messages>"
+    """
+    digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"{model}:{digest}"
@@ -0,0 +1,196 @@
+"""test_backends.py
+
+Unit tests for the backends module.
+
+Tests cover:
+- Rolling latency and backend order
+- Streams hedged to the next backend when the first is slow
+- Fallback on backend errors
+- Non-streamed completions and backend presets
+
+Author: scotton
+Created: 2026-01-22
+"""
+
+import os
+import threading
+import time
+import unittest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+from backends import (
+    GEMINI_BASE_URL, OLLAMA_BASE_URL, OPENROUTER_BASE_URL, Backend, HedgedClient, LatencyTracker
+)
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def fake_backend(name, text="", delay=0.0, error=None, calls=None):
+    """Backend whose stream waits ``delay`` seconds before its first chunk."""
+    def create(model, messages, stream=False, **kwargs):
+        if calls is not None:
+            calls.append((name, model))
+        if error is not None:
+            time.sleep(delay)
+            raise error
+        if not stream:
+            time.sleep(delay)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+        def chunks():
+            time.sleep(delay)
+            yield chunk("")  # role chunk, no content
+            for word in text.split(" "):
+                yield chunk(word + " ")
+        return chunks()
+
+    client = Mock()
+    client.chat.completions.create.side_effect = create
+    return Backend(name, client, f"{name}-model")
+
+
+def read(client, **kwargs):
+    stream = client.chat.completions.create(model="ignored", messages=[], stream=True, **kwargs)
+    return "".join(part.choices[0].delta.content for part in stream).strip()
+
+
+class TestLatencyTracker(unittest.TestCase):
+    """Tests for rolling latency."""
+
+    def test_exponential_average(self):
+        tracker = LatencyTracker(alpha=0.5)
+        tracker.record("a", 1.0)
+        tracker.record("a", 3.0)
+        self.assertAlmostEqual(tracker.latency("a"), 2.0)
+        self.assertIsNone(tracker.latency("b"))
+
+    def test_order_prefers_measured_fastest_then_configured_order(self):
+        tracker = LatencyTracker()
+        a, b, c, d = (Backend(name, None, "m") for name in "abcd")
+        tracker.record("c", 0.5)
+        tracker.record("b", 2.0)
+        self.assertEqual([backend.name for backend in tracker.order([a, b, c, d])],
+                         ["c", "b", "a", "d"])
+
+    def test_failure_counts_as_slow_sample(self):
+        tracker = LatencyTracker(failure_latency=30.0)
+        tracker.record_failure("a")
+        self.assertEqual(tracker.latency("a"), 30.0)
+
+
+class TestHedgedClient(unittest.TestCase):
+    """Tests for hedged, falling-back completions."""
+
+    def test_requires_a_backend(self):
+        with self.assertRaises(ValueError):
+            HedgedClient([])
+
+    def test_fast_primary_is_not_hedged(self):
+        calls = []
+        client = HedgedClient([fake_backend("primary", "hello world", calls=calls),
+                               fake_backend("secondary", "other", calls=calls)], hedge_after=1.0)
+
+        self.assertEqual(read(client), "hello world")
+        self.assertEqual(calls, [("primary", "primary-model")])
+        self.assertEqual(client.stats["hedges"], 0)
+        self.assertEqual(client.last_backend, "primary")
+        self.assertEqual(client.last_model, "primary-model")
+
+    def test_slow_primary_is_hedged_and_loses(self):
+        calls = []
+        client = HedgedClient([fake_backend("primary", "slow answer", delay=1.0, calls=calls),
+                               fake_backend("secondary", "fast answer", calls=calls)],
+                              hedge_after=0.05)
+
+        start = time.monotonic()
+        self.assertEqual(read(client), "fast answer")
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertEqual([name for name, _ in calls], ["primary", "secondary"])
+        self.assertEqual(client.stats["hedges"], 1)
+        self.assertEqual(client.stats["wins"], {"primary": 0, "secondary": 1})
+
+        # The rolling latency now puts the secondary first
+        self.assertEqual(client.tracker.order(client.backends)[0].name, "secondary")
+        calls.clear()
+        self.assertEqual(read(client), "fast answer")
+        self.assertEqual([name for name, _ in calls], ["secondary"])
+
+    def test_error_falls_back_without_waiting(self):
+        client = HedgedClient([fake_backend("primary", error=RuntimeError("rate limited")),
+                               fake_backend("secondary", "fallback")], hedge_after=10.0)
+
+        start = time.monotonic()
+        self.assertEqual(read(client), "fallback")
+        self.assertLess(time.monotonic() - start, 5.0)
+        self.assertEqual(client.stats["failures"], 1)
+        self.assertEqual(client.stats["hedges"], 0)
+        self.assertEqual(client.tracker.latency("primary"), client.tracker.failure_latency)
+
+    def test_all_backends_failing_raises_last_error(self):
+        client = HedgedClient([fake_backend("a", error=RuntimeError("a down")),
+                               fake_backend("b", error=RuntimeError("b down"))], hedge_after=0.01)
+
+        with self.assertRaises(RuntimeError):
+            read(client)
+        self.assertEqual(client.stats["failures"], 2)
+
+    def test_non_streamed_completion_is_hedged(self):
+        client = HedgedClient([fake_backend("primary", "slow", delay=1.0),
+                               fake_backend("secondary", "fast")], hedge_after=0.05)
+
+        response = client.chat.completions.create(model="ignored", messages=[])
+
+        self.assertEqual(response.choices[0].message.content, "fast")
+        self.assertEqual(client.last_backend, "secondary")
+
+    def test_closing_the_stream_closes_the_backend_stream(self):
+        closed = threading.Event()
+
+        def create(model, messages, stream=False, **kwargs):
+            def chunks():
+                try:
+                    for index in range(1000):
+                        yield chunk(f"{index} ")
+                        time.sleep(0.001)
+                finally:
+                    closed.set()
+            return chunks()
+
+        backend = Backend("only", Mock(), "m")
+        backend.client.chat.completions.create.side_effect = create
+        client = HedgedClient([backend])
+
+        stream = client.chat.completions.create(model="m", messages=[], stream=True)
+        self.assertEqual(next(stream).choices[0].delta.content, "0 ")
+        stream.close()
+        self.assertTrue(closed.wait(2.0))
+
+
+class TestBackendPresets(unittest.TestCase):
+    """Tests for the provider presets."""
+
+    @patch("backends.OpenAI")
+    def test_presets_point_at_provider_endpoints(self, mock_openai):
+        self.assertEqual(Backend.openrouter(api_key="k").name, "openrouter")
+        mock_openai.assert_called_with(base_url=OPENROUTER_BASE_URL, api_key="k")
+        Backend.gemini(api_key="k")
+        mock_openai.assert_called_with(base_url=GEMINI_BASE_URL, api_key="k")
+        backend = Backend.ollama("llama3.2")
+        mock_openai.assert_called_with(base_url=OLLAMA_BASE_URL, api_key="ollama")
+        self.assertEqual(backend.model, "llama3.2")
+
+    @patch.dict(os.environ, {"OPENROUTER_API_KEY": "sk-or-test"})
+    @patch("backends.OpenAI")
+    def test_presets_read_keys_from_environment(self, mock_openai):
+        Backend.openrouter()
+        mock_openai.assert_called_with(base_url=OPENROUTER_BASE_URL, api_key="sk-or-test")
+
+
+if __name__ == "__main__":
+    unittest.main()
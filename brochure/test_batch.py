@@ -0,0 +1,272 @@
+"""test_batch.py
+
+Unit tests for the batch module.
+
+Tests cover:
+- Reading companies from CSV files
+- Streaming results and checkpoints to disk, and resuming
+- Global LLM and HTTP concurrency limits shared by workers
+- Token metering and the cost report
+
+Author: scotton
+Created: 2026-01-22
+"""
+
+import json
+import tempfile
+import threading
+import time
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+from backends import Backend, HedgedClient
+from batch import BatchReport, BatchRunner, Company, UsageMeter, read_companies
+
+
+class FakeGenerator:
+    """Stands in for BrochureGenerator: one page fetch and one LLM call per brochure."""
+
+    def __init__(self, client, scraper, fail=()):
+        self.client = client
+        self.scraper = scraper
+        self.fail = fail
+
+    def create_brochure(self, company_name, url):
+        if company_name in self.fail:
+            raise RuntimeError("site unreachable")
+        contents = self.scraper.fetch_website_contents(url, timeout=None)
+        response = self.client.chat.completions.create(model="gpt-4.1-mini", messages=[contents])
+        return response.choices[0].message.content
+
+
+class ConcurrencyProbe:
+    """Records the most calls running at the same time."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, result):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return result
+
+
+def make_client(probe=None):
+    """Return a mock OpenAI client answering with a brochure and usage."""
+    client = Mock()
+
+    def create(model, messages, **kwargs):
+        response = Mock()
+        response.choices = [Mock()]
+        response.choices[0].message.content = f"Brochure from {messages[0]}"
+        response.usage = Mock(prompt_tokens=1_000, completion_tokens=200)
+        return probe(response) if probe else response
+    client.chat.completions.create.side_effect = create
+    return client
+
+
+def make_scraper(probe=None):
+    scraper = Mock()
+    scraper.fetch_website_contents.side_effect = (
+        lambda url, timeout=None: probe(f"content of {url}") if probe else f"content of {url}"
+    )
+    return scraper
+
+
+class TestReadCompanies(unittest.TestCase):
+    """Tests for reading the input CSV."""
+
+    def test_reads_company_and_url_columns(self):
+        """Test rows are read in order and incomplete rows skipped."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "companies.csv"
+            path.write_text("Name,URL,Sector\nAcme, https://acme.com ,Tools\n,https://x.com,\n"
+                            "Globex,https://globex.com,Energy\n", encoding="utf-8")
+            companies = read_companies(path)
+        self.assertEqual(companies, [Company("Acme", "https://acme.com"),
+                                     Company("Globex", "https://globex.com")])
+
+    def test_missing_columns(self):
+        """Test a CSV without a URL column is rejected."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "companies.csv"
+            path.write_text("company,website\nAcme,https://acme.com\n", encoding="utf-8")
+            with self.assertRaises(ValueError):
+                read_companies(path)
+
+
+class TestBatchRunner(unittest.TestCase):
+    """Tests for running, checkpointing and resuming a batch."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = Path(self.tmp.name) / "out" / "brochures.jsonl"
+        self.companies = [Company(f"Co{i}", f"https://co{i}.com") for i in range(6)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def runner(self, fail=(), **kwargs):
+        return BatchRunner(
+            self.output,
+            generator_factory=lambda: FakeGenerator(make_client(), make_scraper(), fail),
+            **kwargs
+        )
+
+    def read_output(self):
+        return [json.loads(line) for line in self.output.read_text(encoding="utf-8").splitlines()]
+
+    def test_writes_results_and_checkpoint(self):
+        """Test every company gets a result line and a checkpoint entry."""
+        report = self.runner(fail={"Co2"}, workers=3).run(self.companies)
+
+        records = {record["company"]: record for record in self.read_output()}
+        self.assertEqual(set(records), {company.name for company in self.companies})
+        self.assertEqual(records["Co0"]["brochure"], "Brochure from content of https://co0.com")
+        self.assertEqual(records["Co2"]["status"], "error")
+        self.assertEqual(records["Co2"]["error"], "RuntimeError: site unreachable")
+        self.assertEqual((report.total, report.succeeded, report.failed, report.skipped),
+                         (6, 5, 1, 0))
+        checkpoint = self.runner().load_checkpoint()
+        self.assertEqual(checkpoint[Company("Co2", "https://co2.com").key], "error")
+        self.assertEqual(checkpoint[Company("Co0", "https://co0.com").key], "ok")
+
+    def test_resume_skips_done_companies(self):
+        """Test a rerun only processes companies not done, retrying failures."""
+        self.runner(fail={"Co2"}).run(self.companies[:4])
+        with open(f"{self.output}.checkpoint", "a", encoding="utf-8") as f:
+            f.write('{"key": "Co4\\thttps://co')  # write cut short by an interruption
+
+        report = self.runner().run(self.companies)
+
+        self.assertEqual((report.skipped, report.succeeded, report.failed), (3, 3, 0))
+        names = [record["company"] for record in self.read_output()]
+        self.assertEqual(sorted(names[4:]), ["Co2", "Co4", "Co5"])
+
+    def test_resume_without_retrying_failures(self):
+        """Test failed companies can be left alone on resume."""
+        self.runner(fail={"Co1"}).run(self.companies[:2])
+        report = self.runner(retry_failed=False).run(self.companies[:2])
+        self.assertEqual((report.skipped, report.succeeded, report.failed), (2, 0, 0))
+
+
+class TestConcurrencyLimits(unittest.TestCase):
+    """Tests for the global LLM and HTTP limits."""
+
+    def test_limits_are_shared_by_workers(self):
+        """Test no more LLM or HTTP calls run at once than the limits allow."""
+        llm_probe, http_probe = ConcurrencyProbe(), ConcurrencyProbe()
+        with tempfile.TemporaryDirectory() as tmp:
+            runner = BatchRunner(
+                Path(tmp) / "brochures.jsonl",
+                workers=8,
+                llm_concurrency=2,
+                http_concurrency=3,
+                generator_factory=lambda: FakeGenerator(make_client(llm_probe),
+                                                        make_scraper(http_probe)),
+            )
+            report = runner.run([Company(f"Co{i}", f"https://co{i}.com") for i in range(16)])
+
+        self.assertEqual(report.succeeded, 16)
+        self.assertLessEqual(llm_probe.peak, 2)
+        self.assertLessEqual(http_probe.peak, 3)
+        self.assertGreater(http_probe.peak, 1)
+
+    def test_streamed_calls_hold_slot_and_meter_usage(self):
+        """Test a stream keeps its LLM slot until consumed and reports usage."""
+        with tempfile.TemporaryDirectory() as tmp:
+            runner = BatchRunner(Path(tmp) / "b.jsonl", llm_concurrency=1,
+                                 generator_factory=lambda: FakeGenerator(Mock(), Mock()))
+            generator = runner._generator()
+            inner = runner._shared[0].chat.completions._completions
+            final = Mock(choices=[], usage=Mock(prompt_tokens=50, completion_tokens=5))
+            inner.create.return_value = iter([Mock(usage=None), final])
+
+            stream = generator.client.chat.completions.create(model="gpt-5-nano", messages=[],
+                                                              stream=True)
+            list(stream)
+            self.assertTrue(runner._llm_slots.acquire(blocking=False))
+            self.assertEqual(inner.create.call_args.kwargs["stream_options"],
+                             {"include_usage": True})
+        self.assertEqual(runner.meter.tokens, {"gpt-5-nano": [50, 5]})
+
+    def test_hedged_client_keeps_backend_and_bills_its_model(self):
+        """Test the limited brochure client names the winning backend and meters its model."""
+        def factory():
+            generator = FakeGenerator(make_client(), make_scraper())
+            generator._brochure_client = HedgedClient([Backend("openrouter", make_client(),
+                                                               "gpt-4o-mini")])
+            return generator
+
+        with tempfile.TemporaryDirectory() as tmp:
+            runner = BatchRunner(Path(tmp) / "b.jsonl", generator_factory=factory)
+            client = runner._generator().brochure_client
+            client.chat.completions.create(model="gpt-4.1-mini", messages=["content"])
+
+        self.assertEqual(client.last_backend, "openrouter")
+        self.assertEqual(client.last_model, "gpt-4o-mini")
+        self.assertEqual(runner.meter.tokens, {"gpt-4o-mini": [1_000, 200]})
+        self.assertIsNone(runner._generator().client.last_backend)
+
+    def test_unconsumed_streams_release_their_slot(self):
+        """Test a stream that is closed early, abandoned or never iterated gives its slot back."""
+        with tempfile.TemporaryDirectory() as tmp:
+            runner = BatchRunner(Path(tmp) / "b.jsonl", llm_concurrency=1,
+                                 generator_factory=lambda: FakeGenerator(Mock(), Mock()))
+            completions = runner._generator().client.chat.completions
+            inner = completions._completions
+
+            def create():
+                inner.create.return_value = Mock(__iter__=lambda self: iter([Mock(usage=None)]))
+                return completions.create(model="gpt-5-nano", messages=[], stream=True)
+
+            with create() as stream:
+                next(stream)
+            stream.close()  # closing twice releases once
+            inner.create.return_value.close.assert_called_once()
+
+            stream = create()
+            del stream  # never iterated
+
+            create().close()
+            self.assertTrue(runner._llm_slots.acquire(blocking=False))
+            self.assertFalse(runner._llm_slots.acquire(blocking=False))
+
+
+class TestReport(unittest.TestCase):
+    """Tests for token metering and the final report."""
+
+    def test_cost(self):
+        """Test cost is computed from per-model prices."""
+        meter = UsageMeter()
+        meter.record("gpt-4.1-mini", Mock(prompt_tokens=1_000_000, completion_tokens=500_000))
+        meter.record("gpt-5-nano", Mock(prompt_tokens=2_000_000, completion_tokens=0))
+        meter.record("gpt-5-nano", None)
+        self.assertAlmostEqual(meter.cost(), 0.40 + 0.80 + 0.10)
+        meter.record("custom-model", Mock(prompt_tokens=1, completion_tokens=1))
+        self.assertIsNone(meter.cost())
+
+    def test_format_report(self):
+        """Test the report shows counts, throughput, tokens and cost."""
+        report = BatchReport(total=10, skipped=2, succeeded=7, failed=1, elapsed=30.0,
+                             tokens={"gpt-4.1-mini": [7_000, 1_400]}, cost=0.0042)
+        text = report.format_report()
+        self.assertEqual(report.throughput, 16.0)
+        self.assertIn("2 already done, 7 succeeded, 1 failed", text)
+        self.assertIn("16.0 companies/min", text)
+        self.assertIn("gpt-4.1-mini: 7,000 prompt, 1,400 completion", text)
+        self.assertIn("$0.0042", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
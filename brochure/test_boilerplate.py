@@ -0,0 +1,80 @@
+"""test_boilerplate.py
+
+Unit tests for the boilerplate module.
+
+Tests cover:
+- Detecting lines repeated across most of a site's pages
+- Keeping the first occurrence and removing later ones
+- Leaving content lines and small sites untouched
+
+Author: scotton
+Created: 2026-01-22
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from boilerplate import find_boilerplate, line_key, remove_boilerplate
+
+
+NAV = "Home\nProducts\nCareers\nSign in"
+FOOTER = "© 2026 Example Inc.\nPrivacy · Terms"
+
+
+def page(body: str) -> str:
+    return f"{NAV}\n{body}\n{FOOTER}"
+
+
+class TestFindBoilerplate(unittest.TestCase):
+    """Tests for detecting boilerplate lines."""
+
+    def test_lines_on_most_pages(self):
+        """Test lines on more than half the pages are boilerplate."""
+        pages = [page("Welcome to Example"), page("About Example"),
+                 "Careers\nWe are hiring", page("Our customers")]
+        found = find_boilerplate(pages)
+        self.assertEqual(found, {"home", "products", "careers", "sign in",
+                                 "© 2026 example inc.", "privacy · terms"})
+
+    def test_compares_normalized_lines(self):
+        """Test whitespace and case differences don't hide a repeated line."""
+        self.assertEqual(line_key("  Sign   IN "), "sign in")
+        self.assertEqual(find_boilerplate(["Sign in\nA", "  sign  in\nB"]), {"sign in"})
+
+    def test_needs_enough_pages(self):
+        """Test nothing is boilerplate on a single page or a rare line."""
+        self.assertEqual(find_boilerplate([page("Only page")]), set())
+        self.assertEqual(find_boilerplate(["Shared\nA", "Shared\nB", "C", "D"]), set())
+
+
+class TestRemoveBoilerplate(unittest.TestCase):
+    """Tests for removing boilerplate lines."""
+
+    def test_keeps_first_occurrence(self):
+        """Test the first page keeps the boilerplate and later pages lose it."""
+        pages = [page("Welcome to Example"), page("About Example"), page("Join the team")]
+        cleaned = remove_boilerplate(pages)
+
+        self.assertEqual(cleaned[0], pages[0])
+        self.assertEqual(cleaned[1:], ["About Example", "Join the team"])
+
+    def test_content_lines_untouched(self):
+        """Test repeated lines within a page survive unless they are boilerplate."""
+        pages = [page("Fast\nFast\nReliable"), page("Simple")]
+        cleaned = remove_boilerplate(pages)
+
+        self.assertEqual(cleaned[0], f"{NAV}\nFast\nFast\nReliable\n{FOOTER}")
+        self.assertEqual(cleaned[1], "Simple")
+
+    def test_no_boilerplate_returns_copy(self):
+        """Test pages without shared lines are returned unchanged."""
+        pages = ["A\nB", "C\nD"]
+        cleaned = remove_boilerplate(pages)
+        self.assertEqual(cleaned, pages)
+        self.assertIsNot(cleaned, pages)
+
+
+if __name__ == "__main__":
+    unittest.main()
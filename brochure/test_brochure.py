@@ -19,6 +19,8 @@ from unittest.mock import Mock, patch, MagicMock
 import json
 import os
 import sys
+import threading
+import time
 from pathlib import Path
 
 # Mock dependencies before importing brochure module
@@ -28,7 +30,37 @@ sys.modules['scraper'] = MagicMock()
 
 # Add parent directory to path to import brochure module
 sys.path.insert(0, str(Path(__file__).parent))
+from backends import Backend
 from brochure import BrochureGenerator, LINK_SYSTEM_PROMPT, BROCHURE_SYSTEM_PROMPT
+from brochure import LinkStreamParser
+from context_builder import TokenCounter
+from stage_cache import StageCache
+
+
+class CharEncoding:
+    """Stand-in tokenizer with one token per character."""
+    
+    def encode(self, text, disallowed_special=()):
+        return list(text)
+    
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+def char_counter(model="gpt-4.1-mini"):
+    """Return a TokenCounter that counts characters, for exact budgets."""
+    return TokenCounter(model, encoding=CharEncoding())
+
+
+def make_stream(text, chunk_size=7):
+    """Split text into mocked streaming chunks like the OpenAI client yields."""
+    chunks = []
+    for i in range(0, len(text), chunk_size):
+        chunk = Mock()
+        chunk.choices = [Mock()]
+        chunk.choices[0].delta.content = text[i:i + chunk_size]
+        chunks.append(chunk)
+    return chunks
 
 
 class TestBrochureGeneratorInit(unittest.TestCase):
@@ -109,19 +141,13 @@ class TestLinkSelection(unittest.TestCase):
             "https://example.com/privacy"
         ]
         
-        # Mock OpenAI response
-        mock_response = Mock()
-        mock_choice = Mock()
-        mock_message = Mock()
-        mock_message.content = json.dumps({
+        # Mock streamed OpenAI response
+        self.mock_client.chat.completions.create.return_value = make_stream(json.dumps({
             "links": [
                 {"type": "about page", "url": "https://example.com/about"},
                 {"type": "careers page", "url": "https://example.com/careers"}
             ]
-        })
-        mock_choice.message = mock_message
-        mock_response.choices = [mock_choice]
-        self.mock_client.chat.completions.create.return_value = mock_response
+        }))
         
         # Call the method
         with patch("builtins.print"):  # Suppress print output
@@ -138,6 +164,315 @@ class TestLinkSelection(unittest.TestCase):
         call_args = self.mock_client.chat.completions.create.call_args
         self.assertEqual(call_args[1]["model"], "gpt-5-nano")
         self.assertEqual(call_args[1]["response_format"], {"type": "json_object"})
+        self.assertTrue(call_args[1]["stream"])
+    
+    def test_iter_relevant_links_yields_before_stream_ends(self):
+        """Test each link is yielded as soon as its JSON object completes."""
+        self.mock_scraper.fetch_website_links.return_value = ["/about", "/careers"]
+        text = json.dumps({
+            "links": [
+                {"type": "about page", "url": "https://example.com/about"},
+                {"type": "careers page", "url": "https://example.com/careers"}
+            ]
+        })
+        consumed = []
+        
+        def stream():
+            for chunk in make_stream(text):
+                consumed.append(chunk.choices[0].delta.content)
+                yield chunk
+        self.mock_client.chat.completions.create.return_value = stream()
+        
+        with patch("builtins.print"):
+            links = self.generator.iter_relevant_links("https://example.com")
+            first = next(links)
+            consumed_at_first = "".join(consumed)
+            rest = list(links)
+        
+        self.assertEqual(first["url"], "https://example.com/about")
+        self.assertNotIn("careers", consumed_at_first)
+        self.assertEqual([link["url"] for link in rest], ["https://example.com/careers"])
+
+
+class TestLinkPreFilter(unittest.TestCase):
+    """Tests for the local link pre-filter in front of the selection model."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.mock_client = Mock()
+        self.mock_scraper = Mock()
+        
+        with patch("brochure.OpenAI", return_value=self.mock_client):
+            with patch("brochure.Scraper", return_value=self.mock_scraper):
+                self.generator = BrochureGenerator(api_key="sk-test-key", max_candidate_links=3)
+    
+    def test_prompt_only_contains_top_candidates(self):
+        """Test boilerplate links are dropped and only top-K reach the prompt."""
+        self.mock_scraper.fetch_website_links.return_value = [
+            "/privacy", "/terms-of-service", "mailto:hi@example.com", "#top",
+            "/misc-1", "/misc-2", "/about", "/about/", "/careers", "/pricing"
+        ]
+        
+        prompt = self.generator._get_links_user_prompt("https://example.com")
+        
+        self.assertIn("https://example.com/about", prompt)
+        self.assertIn("https://example.com/careers", prompt)
+        self.assertIn("https://example.com/pricing", prompt)
+        for excluded in ["privacy", "terms", "mailto", "#top", "misc"]:
+            self.assertNotIn(excluded, prompt)
+        self.assertEqual(prompt.count("https://example.com/about"), 1)
+    
+    def test_confident_scorer_skips_model(self):
+        """Test the model is not called when the scorer is conclusive."""
+        self.mock_scraper.fetch_website_links.return_value = [
+            "/about", "/careers", "/team", "/privacy"
+        ]
+        
+        with patch("builtins.print"):
+            result = self.generator.select_relevant_links("https://example.com")
+        
+        self.mock_client.chat.completions.create.assert_not_called()
+        self.assertEqual([link["type"] for link in result["links"]],
+                         ["about page", "careers page", "team page"])
+    
+    def test_skipping_can_be_disabled(self):
+        """Test confident_link_score=None always asks the model."""
+        self.generator.confident_link_score = None
+        self.mock_scraper.fetch_website_links.return_value = ["/about", "/careers", "/team"]
+        self.mock_client.chat.completions.create.return_value = make_stream(
+            json.dumps({"links": [{"type": "about page", "url": "https://example.com/about"}]})
+        )
+        
+        with patch("builtins.print"):
+            result = self.generator.select_relevant_links("https://example.com")
+        
+        self.mock_client.chat.completions.create.assert_called_once()
+        self.assertEqual(len(result["links"]), 1)
+
+
+class TestSpeculativePrefetch(unittest.TestCase):
+    """Tests for prefetching conventional pages during link selection."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.mock_client = Mock()
+        self.mock_scraper = Mock()
+        
+        with patch("brochure.OpenAI", return_value=self.mock_client):
+            with patch("brochure.Scraper", return_value=self.mock_scraper):
+                self.generator = BrochureGenerator(
+                    api_key="sk-test-key", speculative_prefetch=True, confident_link_score=None
+                )
+        
+        self.fetched = []
+        lock = threading.Lock()
+        
+        def fetch(url, timeout=None):
+            with lock:
+                self.fetched.append(url)
+            return f"content of {url}"
+        self.mock_scraper.fetch_website_contents.side_effect = fetch
+        self.mock_scraper.fetch_website_links.return_value = [
+            "/about", "/careers", "/team", "/pricing", "/privacy"
+        ]
+        text = json.dumps({
+            "links": [
+                {"type": "about page", "url": "https://example.com/about/"},
+                {"type": "pricing page", "url": "https://example.com/pricing"}
+            ]
+        })
+        
+        def slow_stream(*args, **kwargs):
+            time.sleep(0.05)  # let the prefetches land first
+            return iter(make_stream(text))
+        self.mock_client.chat.completions.create.side_effect = slow_stream
+    
+    def test_prefetch_hits_and_waste(self):
+        """Test picked pages come from the prefetch cache and waste is counted."""
+        with patch("builtins.print"):
+            result = self.generator.fetch_page_and_all_relevant_links("https://example.com")
+        
+        self.assertIn("### Link: about page\ncontent of https://example.com/about", result)
+        self.assertIn("### Link: pricing page\ncontent of https://example.com/pricing", result)
+        self.assertEqual(self.fetched.count("https://example.com/about"), 1)
+        self.assertNotIn("https://example.com/about/", self.fetched)
+        self.assertIn("https://example.com/team", self.fetched)
+        
+        stats = self.generator.prefetch_stats
+        self.assertEqual(stats.prefetched, 3)   # about, careers, team
+        self.assertEqual(stats.selected, 2)
+        self.assertEqual(stats.hits, 1)
+        self.assertEqual(stats.wasted, 2)
+        self.assertAlmostEqual(stats.hit_rate, 0.5)
+    
+    def test_failed_prefetch_is_not_a_hit(self):
+        """Test a prefetch that raises falls back to a normal fetch and counts as a miss."""
+        fetch = self.mock_scraper.fetch_website_contents.side_effect
+        failed = set()
+        
+        def flaky(url, timeout=None):
+            if url == "https://example.com/about" and url not in failed:
+                failed.add(url)
+                raise Exception("Connection reset")
+            return fetch(url, timeout)
+        self.mock_scraper.fetch_website_contents.side_effect = flaky
+        
+        with patch("builtins.print"):
+            result = self.generator.fetch_page_and_all_relevant_links("https://example.com")
+        
+        self.assertIn("### Link: about page\ncontent of https://example.com/about", result)
+        self.assertIn("https://example.com/about/", self.fetched)  # fetched normally
+        self.assertEqual(self.generator.prefetch_stats.selected, 2)
+        self.assertEqual(self.generator.prefetch_stats.hits, 0)
+    
+    def test_cache_reused_within_ttl(self):
+        """Test a second run within the TTL does not prefetch again."""
+        with patch("builtins.print"):
+            self.generator.fetch_page_and_all_relevant_links("https://example.com")
+            self.fetched.clear()
+            self.generator.fetch_page_and_all_relevant_links("https://example.com")
+        
+        self.assertNotIn("https://example.com/about", self.fetched)
+        self.assertNotIn("https://example.com/careers", self.fetched)
+        self.assertEqual(self.generator.prefetch_stats.prefetched, 3)
+        self.assertEqual(self.generator.prefetch_stats.hits, 2)
+    
+    def test_disabled_by_default(self):
+        """Test nothing is prefetched unless enabled."""
+        self.generator.speculative_prefetch = False
+        with patch("builtins.print"):
+            self.generator.fetch_page_and_all_relevant_links("https://example.com")
+        
+        self.assertNotIn("https://example.com/careers", self.fetched)
+        self.assertEqual(self.generator.prefetch_stats.prefetched, 0)
+
+
+class TestStageMemoization(unittest.TestCase):
+    """Tests for reusing cached pipeline stages across regenerations."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.mock_client = Mock()
+        self.mock_scraper = Mock()
+        
+        with patch("brochure.OpenAI", return_value=self.mock_client):
+            with patch("brochure.Scraper", return_value=self.mock_scraper):
+                self.generator = BrochureGenerator(
+                    api_key="sk-test-key", stage_cache=StageCache.in_memory()
+                )
+        
+        self.mock_scraper.fetch_website_contents.side_effect = (
+            lambda url, timeout=None: f"content of {url}"
+        )
+        self.mock_scraper.fetch_website_links.return_value = ["/about", "/careers"]
+        selection = json.dumps({
+            "links": [{"type": "about page", "url": "https://example.com/about"}]
+        })
+        
+        def create(model, messages, **kwargs):
+            if kwargs.get("response_format"):
+                return iter(make_stream(selection))
+            response = Mock()
+            response.choices = [Mock()]
+            response.choices[0].message.content = f"Brochure by {model}"
+            return response
+        self.mock_client.chat.completions.create.side_effect = create
+    
+    def model_calls(self):
+        return [call.kwargs["model"] for call in self.mock_client.chat.completions.create.call_args_list]
+    
+    def test_regenerating_reuses_upstream_stages(self):
+        """Test a new tone or model only reruns brochure generation."""
+        with patch("builtins.print"):
+            first = self.generator.create_brochure("TestCo", "https://example.com")
+            self.generator.brochure_system_prompt = "Write a playful brochure."
+            self.generator.brochure_model = "gpt-5-nano"
+            second = self.generator.create_brochure("TestCo", "https://example.com")
+        
+        self.assertEqual(first, "Brochure by gpt-4.1-mini")
+        self.assertEqual(second, "Brochure by gpt-5-nano")
+        self.assertEqual(self.model_calls(), ["gpt-5-nano", "gpt-4.1-mini", "gpt-5-nano"])
+        self.assertEqual(self.mock_scraper.fetch_website_links.call_count, 1)
+        self.assertEqual(self.mock_scraper.fetch_website_contents.call_count, 2)
+        last_messages = self.mock_client.chat.completions.create.call_args.kwargs["messages"]
+        self.assertEqual(last_messages[0]["content"], "Write a playful brochure.")
+    
+    def test_identical_request_served_from_cache(self):
+        """Test an unchanged brochure is returned or streamed without any calls."""
+        with patch("builtins.print"):
+            first = self.generator.create_brochure("TestCo", "https://example.com")
+            calls = self.mock_client.chat.completions.create.call_count
+            again = self.generator.create_brochure("TestCo", "https://example.com")
+            streamed = list(self.generator.stream_brochure("TestCo", "https://example.com"))
+        
+        self.assertEqual(again, first)
+        self.assertEqual(streamed, [first])
+        self.assertEqual(self.mock_client.chat.completions.create.call_count, calls)
+        self.assertEqual(self.generator.stage_cache.stats()["brochure"], {"hits": 2, "misses": 1})
+    
+    def test_failed_pages_are_not_cached(self):
+        """Test an error fetching a page is retried on the next run."""
+        attempts = []
+        
+        def flaky(url, timeout=None):
+            attempts.append(url)
+            if url.endswith("/about") and attempts.count(url) == 1:
+                raise Exception("Network error")
+            return f"content of {url}"
+        self.mock_scraper.fetch_website_contents.side_effect = flaky
+        
+        with patch("builtins.print"):
+            first = self.generator.fetch_page_and_all_relevant_links("https://example.com")
+            second = self.generator.fetch_page_and_all_relevant_links("https://example.com")
+        
+        self.assertIn("Error fetching content: Network error", first)
+        self.assertIn("content of https://example.com/about", second)
+        self.assertEqual(attempts.count("https://example.com/about"), 2)
+        self.assertEqual(attempts.count("https://example.com"), 1)
+
+
+class TestLinkStreamParser(unittest.TestCase):
+    """Tests for incremental parsing of the link selection JSON."""
+    
+    def feed_all(self, text, chunk_size):
+        parser = LinkStreamParser()
+        links = []
+        for i in range(0, len(text), chunk_size):
+            links.extend(parser.feed(text[i:i + chunk_size]))
+        return links
+    
+    def test_any_chunking_gives_same_links(self):
+        """Test links are found regardless of how the text is split."""
+        text = json.dumps({
+            "links": [
+                {"type": "about page", "url": "https://example.com/about"},
+                {"type": "careers page", "url": "https://example.com/careers"}
+            ]
+        }, indent=2)
+        for chunk_size in (1, 2, 5, 64, len(text)):
+            links = self.feed_all(text, chunk_size)
+            self.assertEqual([link["url"] for link in links],
+                             ["https://example.com/about", "https://example.com/careers"])
+    
+    def test_ignores_braces_in_strings_and_other_keys(self):
+        """Test braces inside strings and objects outside 'links' are ignored."""
+        text = json.dumps({
+            "note": "see {these} [links]",
+            "other": [{"type": "x", "url": "https://example.com/not-a-link"}],
+            "links": [
+                {"type": "team \"page\" }", "url": "https://example.com/team",
+                 "meta": {"score": [1, 2]}}
+            ]
+        })
+        links = self.feed_all(text, 3)
+        self.assertEqual(len(links), 1)
+        self.assertEqual(links[0]["type"], 'team "page" }')
+        self.assertEqual(links[0]["meta"], {"score": [1, 2]})
+    
+    def test_skips_objects_without_url(self):
+        """Test malformed link objects are skipped."""
+        links = self.feed_all('{"links": [{"type": "about"}, {"url": "https://e.com/a"}]}', 4)
+        self.assertEqual(links, [{"url": "https://e.com/a", "type": "relevant page"}])
 
 
 class TestPageContentAggregation(unittest.TestCase):
@@ -154,21 +489,22 @@ class TestPageContentAggregation(unittest.TestCase):
     
     def test_fetch_page_and_all_relevant_links(self):
         """Test fetching and aggregating content from multiple pages."""
-        # Mock landing page content
-        self.mock_scraper.fetch_website_contents.side_effect = [
-            "Landing page content",
-            "About page content",
-            "Careers page content"
-        ]
+        # Mock page contents by URL; pages are fetched concurrently
+        contents = {
+            "https://example.com": "Landing page content",
+            "https://example.com/about": "About page content",
+            "https://example.com/careers": "Careers page content"
+        }
+        self.mock_scraper.fetch_website_contents.side_effect = (
+            lambda url, timeout=None: contents[url]
+        )
         
         # Mock link selection
-        with patch.object(self.generator, "select_relevant_links") as mock_select:
-            mock_select.return_value = {
-                "links": [
-                    {"type": "about page", "url": "https://example.com/about"},
-                    {"type": "careers page", "url": "https://example.com/careers"}
-                ]
-            }
+        with patch.object(self.generator, "iter_relevant_links") as mock_select:
+            mock_select.return_value = iter([
+                {"type": "about page", "url": "https://example.com/about"},
+                {"type": "careers page", "url": "https://example.com/careers"}
+            ])
             
             result = self.generator.fetch_page_and_all_relevant_links("https://example.com")
         
@@ -180,27 +516,241 @@ class TestPageContentAggregation(unittest.TestCase):
         self.assertIn("About page content", result)
         self.assertIn("### Link: careers page", result)
         self.assertIn("Careers page content", result)
+        self.assertIn("## Landing Page:\n\nLanding page content", result)
+        self.assertIn("### Link: about page\nAbout page content", result)
+        self.assertIn("### Link: careers page\nCareers page content", result)
     
     def test_fetch_page_handles_errors(self):
         """Test that errors fetching linked pages are handled gracefully."""
         # Mock landing page success, but error on linked page
-        self.mock_scraper.fetch_website_contents.side_effect = [
-            "Landing page content",
-            Exception("Network error")
-        ]
+        def fetch(url, timeout=None):
+            if url == "https://example.com":
+                return "Landing page content"
+            raise Exception("Network error")
+        self.mock_scraper.fetch_website_contents.side_effect = fetch
         
-        with patch.object(self.generator, "select_relevant_links") as mock_select:
-            mock_select.return_value = {
-                "links": [
-                    {"type": "about page", "url": "https://example.com/about"}
-                ]
-            }
+        with patch.object(self.generator, "iter_relevant_links") as mock_select:
+            mock_select.return_value = iter([
+                {"type": "about page", "url": "https://example.com/about"}
+            ])
             
             result = self.generator.fetch_page_and_all_relevant_links("https://example.com")
         
         self.assertIn("Error fetching content: Network error", result)
 
 
+class TestParallelPageFetching(unittest.TestCase):
+    """Tests for concurrent fetching of relevant pages."""
+    
+    LANDING = "https://example.com"
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.mock_client = Mock()
+        self.mock_scraper = Mock()
+        
+        with patch("brochure.OpenAI", return_value=self.mock_client):
+            with patch("brochure.Scraper", return_value=self.mock_scraper):
+                self.generator = BrochureGenerator(
+                    api_key="sk-test-key", fetch_concurrency=2, fetch_timeout=3.0
+                )
+        
+        self.links = [
+            {"type": f"page {i}", "url": f"https://example.com/{i}"} for i in range(6)
+        ]
+    
+    def fetch_pages(self, links):
+        """Run fetch_site_pages with the given selected links; return the page contents."""
+        with patch.object(self.generator, "iter_relevant_links", return_value=iter(links)):
+            _, pages = self.generator.fetch_site_pages(self.LANDING)
+        self.assertEqual([link for link, _ in pages], links)
+        return [page for _, page in pages]
+    
+    def test_results_keep_link_order(self):
+        """Test results are assembled in link order even if fetches finish out of order."""
+        def fetch(url, timeout=None):
+            if url == self.LANDING:
+                return "landing"
+            index = int(url.rsplit("/", 1)[1])
+            time.sleep(0.01 * (6 - index))  # earlier links finish last
+            return f"content {index}"
+        self.mock_scraper.fetch_website_contents.side_effect = fetch
+        
+        pages = self.fetch_pages(self.links)
+        
+        self.assertEqual(pages, [f"content {i}" for i in range(6)])
+    
+    def test_concurrency_limit_and_timeout(self):
+        """Test no more than fetch_concurrency pages are fetched at once."""
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+        
+        def fetch(url, timeout=None):
+            if url == self.LANDING:
+                return "landing"
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.02)
+            with lock:
+                state["active"] -= 1
+            return url
+        self.mock_scraper.fetch_website_contents.side_effect = fetch
+        
+        self.fetch_pages(self.links)
+        
+        self.assertEqual(state["peak"], 2)
+        for call in self.mock_scraper.fetch_website_contents.call_args_list:
+            self.assertEqual(call.kwargs["timeout"], 3.0)
+    
+    def test_errors_stay_inline(self):
+        """Test a failing link yields its error text in place."""
+        def fetch(url, timeout=None):
+            if url.endswith("/2"):
+                raise Exception("Read timed out")
+            return url
+        self.mock_scraper.fetch_website_contents.side_effect = fetch
+        
+        pages = self.fetch_pages(self.links)
+        
+        self.assertEqual(pages[2], "Error fetching content: Read timed out")
+        self.assertEqual(pages[3], "https://example.com/3")
+    
+    def test_no_links(self):
+        """Test an empty link selection fetches only the landing page."""
+        self.mock_scraper.fetch_website_contents.return_value = "landing"
+        
+        self.assertEqual(self.fetch_pages([]), [])
+        self.mock_scraper.fetch_website_contents.assert_called_once_with(
+            self.LANDING, timeout=3.0
+        )
+
+
+class TestOverlappedPipeline(unittest.TestCase):
+    """Tests for running pipeline stages concurrently and timing them."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.mock_client = Mock()
+        self.mock_scraper = Mock()
+        
+        with patch("brochure.OpenAI", return_value=self.mock_client):
+            with patch("brochure.Scraper", return_value=self.mock_scraper):
+                self.generator = BrochureGenerator(api_key="sk-test-key")
+    
+    def test_landing_page_overlaps_link_selection(self):
+        """Test the landing page is fetched while link selection is in flight."""
+        def fetch(url, timeout=None):
+            time.sleep(0.1)
+            return f"content of {url}"
+        self.mock_scraper.fetch_website_contents.side_effect = fetch
+        
+        def select(url):
+            time.sleep(0.1)
+            yield {"type": "about page", "url": "https://example.com/about"}
+        
+        with patch.object(self.generator, "iter_relevant_links", side_effect=select):
+            start = time.perf_counter()
+            result = self.generator.fetch_page_and_all_relevant_links("https://example.com")
+            elapsed = time.perf_counter() - start
+        
+        # Sequential would take ~0.3s: landing, then selection, then the page
+        self.assertLess(elapsed, 0.28)
+        self.assertIn("content of https://example.com/about", result)
+        
+        stages = self.generator.timings.stages
+        self.assertIn("landing_page", stages)
+        self.assertIn("page_fetch https://example.com/about", stages)
+    
+    def test_pages_fetch_while_selection_streams(self):
+        """Test a page starts fetching before link selection finishes streaming."""
+        self.mock_scraper.fetch_website_contents.side_effect = (
+            lambda url, timeout=None: f"content of {url}"
+        )
+        self.mock_scraper.fetch_website_links.return_value = ["/about", "/careers"]
+        text = json.dumps({
+            "links": [
+                {"type": "about page", "url": "https://example.com/about"},
+                {"type": "careers page", "url": "https://example.com/careers"}
+            ]
+        })
+        
+        def slow_stream():
+            for chunk in make_stream(text, chunk_size=10):
+                time.sleep(0.01)
+                yield chunk
+        self.mock_client.chat.completions.create.return_value = slow_stream()
+        
+        with patch("builtins.print"):
+            result = self.generator.fetch_page_and_all_relevant_links("https://example.com")
+        
+        self.assertIn("### Link: careers page\ncontent of https://example.com/careers", result)
+        stages = self.generator.timings.stages
+        about_start, _ = stages["page_fetch https://example.com/about"]
+        _, selection_end = stages["link_selection"]
+        self.assertLess(about_start, selection_end)
+    
+    def test_timings_cover_all_stages(self):
+        """Test link scrape, selection and generation are timed and reported."""
+        self.mock_scraper.fetch_website_contents.return_value = "content"
+        self.mock_scraper.fetch_website_links.return_value = ["/about"]
+        
+        selection = make_stream(json.dumps({
+            "links": [{"type": "about page", "url": "https://example.com/about"}]
+        }))
+        brochure = Mock()
+        brochure.choices = [Mock()]
+        brochure.choices[0].message.content = "# Brochure"
+        self.mock_client.chat.completions.create.side_effect = [selection, brochure]
+        
+        with patch("builtins.print"):
+            self.generator.create_brochure("TestCo", "https://example.com")
+        
+        durations = self.generator.timings.durations()
+        for stage in ["landing_page", "link_scrape", "link_selection",
+                      "page_fetch https://example.com/about", "brochure_generation"]:
+            self.assertIn(stage, durations)
+            self.assertGreaterEqual(durations[stage], 0.0)
+        report = self.generator.timings.format_report()
+        self.assertIn("link_selection", report)
+        self.assertIn("Total (critical path)", report)
+
+    
+    def test_spans_carry_sizes_tokens_and_first_token(self):
+        """Test spans record byte sizes, token usage and time to first token."""
+        self.mock_scraper.fetch_website_contents.side_effect = (
+            lambda url, timeout=None: f"content of {url}"
+        )
+        self.mock_scraper.fetch_website_links.return_value = ["/about"]
+        usage = Mock(choices=[], usage=Mock(prompt_tokens=900, completion_tokens=40,
+                                            total_tokens=940))
+        selection = make_stream(json.dumps({
+            "links": [{"type": "about page", "url": "https://example.com/about"}]
+        })) + [usage]
+        generation = make_stream("# TestCo\nGreat.") + [usage]
+        self.mock_client.chat.completions.create.side_effect = [iter(selection), iter(generation)]
+        
+        with patch("builtins.print"):
+            brochure = "".join(self.generator.stream_brochure("TestCo", "https://example.com"))
+        
+        self.assertEqual(brochure, "# TestCo\nGreat.")
+        spans = {span.name: span.attributes for span in self.generator.timings.spans}
+        self.assertEqual(spans["link_scrape"]["links"], 1)
+        self.assertEqual(spans["link_selection"]["prompt_tokens"], 900)
+        self.assertEqual(spans["link_selection"]["selected"], 1)
+        self.assertEqual(spans["landing_page"]["bytes"], len("content of https://example.com"))
+        self.assertEqual(spans["page_fetch https://example.com/about"]["type"], "about page")
+        self.assertGreater(spans["prompt_assembly"]["tokens"], 0)
+        generation_span = spans["brochure_generation"]
+        self.assertEqual(generation_span["completion_tokens"], 40)
+        self.assertEqual(generation_span["chars"], len(brochure))
+        self.assertGreaterEqual(generation_span["time_to_first_token"], 0.0)
+        self.assertIn("brochure_generation first_token", spans)
+        for call in self.mock_client.chat.completions.create.call_args_list:
+            self.assertEqual(call.kwargs["stream_options"], {"include_usage": True})
+        trace = self.generator.timings.chrome_trace()
+        self.assertTrue(all(json.dumps(event) for event in trace["traceEvents"]))
+
 class TestBrochureGeneration(unittest.TestCase):
     """Tests for brochure generation."""
     
@@ -217,9 +767,12 @@ class TestBrochureGeneration(unittest.TestCase):
         """Test brochure user prompt generation."""
         with patch.object(
             self.generator,
-            "fetch_page_and_all_relevant_links"
+            "fetch_site_pages"
         ) as mock_fetch:
-            mock_fetch.return_value = "Aggregated content"
+            mock_fetch.return_value = (
+                "Landing content",
+                [({"type": "about page", "url": "https://example.com/about"}, "About content")]
+            )
             
             prompt = self.generator._get_brochure_user_prompt(
                 "TestCo",
@@ -227,24 +780,98 @@ class TestBrochureGeneration(unittest.TestCase):
             )
         
         self.assertIn("TestCo", prompt)
-        self.assertIn("Aggregated content", prompt)
+        self.assertIn("## Landing Page:\n\nLanding content", prompt)
+        self.assertIn("### Link: about page\nAbout content", prompt)
         self.assertIn("landing page", prompt.lower())
     
-    def test_get_brochure_user_prompt_truncates(self):
-        """Test that brochure prompt is truncated at 5000 characters."""
+    def test_relevant_links_heading_precedes_sorted_pages(self):
+        """Test pages selected out of priority order stay under the group heading."""
+        with patch.object(self.generator, "fetch_site_pages") as mock_fetch:
+            mock_fetch.return_value = ("Landing content", [
+                ({"type": "news page", "url": "https://example.com/news"}, "News content"),
+                ({"type": "about page", "url": "https://example.com/about"}, "About content"),
+            ])
+            prompt = self.generator._get_brochure_user_prompt("TestCo", "https://example.com")
+        
+        self.assertEqual(prompt.count("## Relevant Links:"), 1)
+        self.assertLess(prompt.index("Landing content"), prompt.index("## Relevant Links:"))
+        self.assertLess(prompt.index("## Relevant Links:"), prompt.index("### Link: about page"))
+        self.assertLess(prompt.index("### Link: about page"), prompt.index("### Link: news page"))
+    
+    def test_get_brochure_user_prompt_keeps_every_page_within_budget(self):
+        """Test a long landing page no longer crowds out the linked pages."""
+        with patch("brochure.OpenAI", return_value=self.mock_client):
+            with patch("brochure.Scraper", return_value=self.mock_scraper):
+                self.generator = BrochureGenerator(
+                    api_key="sk-test-key", context_token_budget=1_000,
+                    token_counter=char_counter()
+                )
         with patch.object(
             self.generator,
-            "fetch_page_and_all_relevant_links"
+            "fetch_site_pages"
         ) as mock_fetch:
-            # Create content longer than 5000 characters
-            mock_fetch.return_value = "x" * 10_000
+            mock_fetch.return_value = ("x" * 10_000, [
+                ({"type": "news page", "url": "https://example.com/news"}, "n" * 10_000),
+                ({"type": "about page", "url": "https://example.com/about"}, "About us"),
+                ({"type": "careers page", "url": "https://example.com/careers"}, "c" * 10_000),
+            ])
             
             prompt = self.generator._get_brochure_user_prompt(
                 "TestCo",
                 "https://example.com"
             )
         
-        self.assertLessEqual(len(prompt), 5_000)
+        self.assertLessEqual(len(prompt), 1_000)
+        self.assertIn("### Link: about page\nAbout us", prompt)
+        self.assertIn("### Link: careers page\nccc", prompt)
+        self.assertIn("### Link: news page\nnnn", prompt)
+        self.assertLess(prompt.index("about page"), prompt.index("careers page"))
+        self.assertLess(prompt.index("careers page"), prompt.index("news page"))
+        self.assertEqual(prompt.count("[... truncated]"), 3)
+    
+    def test_get_brochure_user_prompt_ranks_paragraphs(self):
+        """Test relevance ranking keeps facet paragraphs and drops filler."""
+        self.generator.relevance_ranking = True
+        self.generator.context_token_budget = 400
+        self.generator._token_counter = char_counter()
+        with patch.object(
+            self.generator,
+            "fetch_site_pages"
+        ) as mock_fetch:
+            mock_fetch.return_value = (
+                "Welcome to TestCo\n\nTrusted by customers in every industry\n\n" + "lorem " * 60,
+                [({"type": "careers page", "url": "https://example.com/careers"},
+                  "Office lunch menu\n\nWe are hiring: open jobs and benefits")]
+            )
+            prompt = self.generator._get_brochure_user_prompt("TestCo", "https://example.com")
+        
+        self.assertIn("Trusted by customers in every industry", prompt)
+        self.assertIn("We are hiring: open jobs and benefits", prompt)
+        self.assertNotIn("lorem", prompt)
+        self.assertNotIn("lunch", prompt)
+        self.assertLessEqual(len(prompt), 400)
+        self.assertIn("relevance_ranking", self.generator.timings.stages)
+    
+    def test_get_brochure_user_prompt_strips_boilerplate(self):
+        """Test navigation repeated on every page is only sent once."""
+        nav = "Home\nProducts\nSign in"
+        with patch.object(
+            self.generator,
+            "fetch_site_pages"
+        ) as mock_fetch:
+            mock_fetch.return_value = (f"{nav}\nWelcome", [
+                ({"type": "about page", "url": "https://example.com/about"}, f"{nav}\nAbout us"),
+                ({"type": "careers page", "url": "https://example.com/careers"}, f"{nav}\nJobs"),
+            ])
+            
+            prompt = self.generator._get_brochure_user_prompt("TestCo", "https://example.com")
+            self.generator.strip_boilerplate = False
+            unstripped = self.generator._get_brochure_user_prompt("TestCo", "https://example.com")
+        
+        self.assertEqual(prompt.count("Sign in"), 1)
+        self.assertIn("### Link: about page\nAbout us", prompt)
+        self.assertIn("### Link: careers page\nJobs", prompt)
+        self.assertEqual(unstripped.count("Sign in"), 3)
     
     def test_create_brochure(self):
         """Test brochure generation with mocked dependencies."""
@@ -315,6 +942,45 @@ class TestBrochureGeneration(unittest.TestCase):
         # Verify OpenAI was called with stream=True
         call_args = self.mock_client.chat.completions.create.call_args
         self.assertTrue(call_args[1]["stream"])
+    
+    def test_stream_brochure_stops_when_cancelled(self):
+        """Test a cancelled run skips the crawl, or the model once the crawl is done."""
+        cancelled = threading.Event()
+        cancelled.set()
+        with patch.object(self.generator, "_get_brochure_messages") as mock_messages:
+            self.assertEqual(list(self.generator.stream_brochure(
+                "TestCo", "https://example.com", cancelled=cancelled)), [])
+        mock_messages.assert_not_called()
+        
+        cancelled.clear()
+        def crawl(company_name, url):
+            cancelled.set()  # the last subscriber leaves during the crawl
+            return [{"role": "user", "content": "Test prompt"}]
+        with patch.object(self.generator, "_get_brochure_messages", side_effect=crawl):
+            self.assertEqual(list(self.generator.stream_brochure(
+                "TestCo", "https://example.com", cancelled=cancelled)), [])
+        self.mock_client.chat.completions.create.assert_not_called()
+    
+    def test_stream_brochure_uses_brochure_backends(self):
+        """Test brochures go to the hedged backends with their own models."""
+        backend_client = Mock()
+        backend_client.chat.completions.create.return_value = iter(make_stream("# TestCo Brochure"))
+        with patch("brochure.OpenAI", return_value=self.mock_client):
+            with patch("brochure.Scraper", return_value=self.mock_scraper):
+                generator = BrochureGenerator(
+                    api_key="sk-test-key",
+                    brochure_backends=[Backend("openrouter", backend_client, "openai/gpt-4.1-mini")]
+                )
+        
+        with patch.object(generator, "_get_brochure_user_prompt", return_value="Test prompt"):
+            chunks = list(generator.stream_brochure("TestCo", "https://example.com"))
+        
+        self.assertEqual("".join(chunks), "# TestCo Brochure")
+        self.mock_client.chat.completions.create.assert_not_called()
+        call_args = backend_client.chat.completions.create.call_args
+        self.assertEqual(call_args[1]["model"], "openai/gpt-4.1-mini")
+        span = next(span for span in generator.timings.spans if span.name == "brochure_generation")
+        self.assertEqual(span.attributes["backend"], "openrouter")
 
 
 class TestPromptConstants(unittest.TestCase):
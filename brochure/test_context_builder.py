@@ -0,0 +1,109 @@
+"""test_context_builder.py
+
+Unit tests for the context_builder module.
+
+Tests cover:
+- Token counting and trimming, including the estimate used offline
+- Splitting a token budget between pages
+- Assembling the brochure context by link type priority
+
+Author: scotton
+Created: 2026-01-22
+"""
+
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent))
+from context_builder import (
+    TRUNCATION_MARKER, PageSection, TokenCounter, allocate_budget, assemble_context,
+    link_type_rank
+)
+
+
+class CharEncoding:
+    """Stand-in tokenizer with one token per character."""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+class TestTokenCounter(unittest.TestCase):
+    """Tests for counting and trimming tokens."""
+
+    def test_count_and_truncate(self):
+        """Test counts and prefixes come from the encoding."""
+        counter = TokenCounter(encoding=CharEncoding())
+        self.assertEqual(counter.count("hello"), 5)
+        self.assertEqual(counter.truncate("hello", 3), "hel")
+        self.assertEqual(counter.truncate("hello", 10), "hello")
+        self.assertEqual(counter.truncate("hello", 0), "")
+
+    def test_estimates_without_encoding(self):
+        """Test an unavailable encoding falls back to characters per token."""
+        with patch("context_builder._encoding_for_model", return_value=None):
+            counter = TokenCounter("gpt-4.1-mini")
+        self.assertIsNone(counter.encoding)
+        self.assertEqual(counter.count(""), 0)
+        self.assertEqual(counter.count("a" * 9), 3)
+        self.assertEqual(counter.truncate("a" * 100, 5), "a" * 20)
+
+
+class TestAllocateBudget(unittest.TestCase):
+    """Tests for sharing a token budget between pages."""
+
+    def test_everything_fits(self):
+        """Test pages keep their size when the budget allows."""
+        self.assertEqual(allocate_budget([100, 200], 1_000), [100, 200])
+
+    def test_short_pages_pass_on_their_share(self):
+        """Test budget a short page doesn't need goes to the longer ones."""
+        self.assertEqual(allocate_budget([50, 1_000, 1_000], 650), [50, 300, 300])
+
+    def test_every_page_gets_its_minimum(self):
+        """Test the minimum share is given in priority order."""
+        self.assertEqual(allocate_budget([500, 500, 500], 100, min_share=40), [40, 40, 20])
+        self.assertEqual(sum(allocate_budget([7, 9, 11], 10)), 10)
+        self.assertEqual(allocate_budget([10, 10], -5), [0, 0])
+
+
+class TestAssembleContext(unittest.TestCase):
+    """Tests for assembling the brochure context."""
+
+    def setUp(self):
+        self.counter = TokenCounter(encoding=CharEncoding())
+
+    def test_orders_by_link_type_after_landing_page(self):
+        """Test the landing page stays first and links follow by priority."""
+        sections = [
+            PageSection("[landing]", "L", "landing page"),
+            PageSection("[blog]", "B", "blog page"),
+            PageSection("[news]", "N", "news page"),
+            PageSection("[about]", "A", "about page"),
+        ]
+        context = assemble_context("H", sections, self.counter, budget=1_000)
+        self.assertEqual(context, "H[landing]L[about]A[news]N[blog]B")
+        self.assertLess(link_type_rank("about page"), link_type_rank("careers page"))
+        self.assertEqual(link_type_rank("blog page"), link_type_rank("other page"))
+
+    def test_trims_pages_to_budget(self):
+        """Test long pages are trimmed and marked, and the budget is kept."""
+        sections = [
+            PageSection("#L", "l" * 1_000, "landing page"),
+            PageSection("#A", "short", "about page"),
+            PageSection("#C", "c" * 1_000, "careers page"),
+        ]
+        context = assemble_context("header", sections, self.counter, budget=300)
+        self.assertLessEqual(len(context), 300)
+        self.assertIn("#Ashort#C", context)
+        self.assertEqual(context.count(TRUNCATION_MARKER), 2)
+        self.assertTrue(context.startswith("header#Llll"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+"""test_link_ranker.py
+
+Unit tests for the link_ranker module.
+
+Tests cover:
+- URL normalization and de-duplication
+- Deny patterns for privacy, terms, login, mailto: and file links
+- Keyword scoring and ranking of brochure-worthy pages
+- Confidence check used to skip the link selection model
+
+Author: scotton
+Created: 2026-01-21
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from link_ranker import (
+    confident_links, conventional_links, is_denied, normalize_url, rank_links, score_url
+)
+
+
+BASE_URL = "https://www.example.com/"
+
+
+class TestNormalizeUrl(unittest.TestCase):
+    """Tests for URL normalization."""
+
+    def test_resolves_relative_links(self):
+        """Test relative hrefs are resolved against the page URL."""
+        self.assertEqual(normalize_url(BASE_URL, "/about"), "https://www.example.com/about")
+        self.assertEqual(normalize_url("https://example.com/company/", "team"),
+                         "https://example.com/company/team")
+
+    def test_strips_fragments_tracking_and_trailing_slash(self):
+        """Test fragments, tracking parameters and trailing slashes are removed."""
+        self.assertEqual(
+            normalize_url(BASE_URL, "https://WWW.Example.com/careers/?utm_source=x&team=eng#open"),
+            "https://www.example.com/careers?team=eng"
+        )
+
+    def test_rejects_non_web_links(self):
+        """Test anchors and non-http schemes are not links to pages."""
+        for href in ["#top", "", "mailto:hi@example.com", "tel:+123", "javascript:void(0)"]:
+            self.assertIsNone(normalize_url(BASE_URL, href))
+
+
+class TestDenyAndScore(unittest.TestCase):
+    """Tests for deny patterns and keyword scoring."""
+
+    def test_denied_links(self):
+        """Test boilerplate and file links are denied."""
+        for url in ["https://example.com/privacy-policy", "https://example.com/terms",
+                    "https://example.com/login", "https://example.com/cookie-settings",
+                    "https://example.com/files/report.pdf", "https://example.com/search?q=x"]:
+            self.assertTrue(is_denied(url), url)
+
+    def test_allowed_links(self):
+        """Test words merely containing a deny term are not denied."""
+        for url in ["https://example.com/lessons", "https://example.com/photos",
+                    "https://example.com/catalog", "https://example.com/about"]:
+            self.assertFalse(is_denied(url), url)
+
+    def test_host_with_deny_word_keeps_its_links(self):
+        """Test deny patterns look at the path, not the host."""
+        ranked = rank_links("https://www.legalzoom.com", ["/about", "/careers", "/team", "/privacy"])
+        self.assertEqual([link.url for link in ranked][:3], ["https://www.legalzoom.com/about",
+                                                            "https://www.legalzoom.com/careers",
+                                                            "https://www.legalzoom.com/team"])
+        self.assertEqual(len(ranked), 3)
+        self.assertFalse(is_denied("https://www.cookieconsent.io/about"))
+        self.assertTrue(is_denied("https://www.cookieconsent.io/cookie-policy"))
+        self.assertTrue(is_denied("mailto:hi@example.com"))
+
+    def test_deny_patterns_match_whole_segments(self):
+        """Test /account denies account pages but not /accountants."""
+        self.assertFalse(is_denied("https://example.com/accountants"))
+        self.assertFalse(is_denied("https://example.com/cartography"))
+        for url in ["https://example.com/account", "https://example.com/account/settings",
+                    "https://example.com/cart", "https://example.com/blog?replytocom=12"]:
+            self.assertTrue(is_denied(url), url)
+
+    def test_scores_page_types(self):
+        """Test keyword matches produce page types and shallow pages win."""
+        self.assertEqual(score_url("https://example.com/about")[0], "about page")
+        self.assertEqual(score_url("https://example.com/careers")[0], "careers page")
+        self.assertEqual(score_url("https://jobs.example.com/")[0], "careers page")
+        self.assertEqual(score_url("https://example.com/our-team")[0], "team page")
+        self.assertEqual(score_url("https://example.com/case-studies")[0], "customers page")
+        self.assertEqual(score_url("https://example.com/lessons"), ("other page", 0.0))
+        self.assertGreater(score_url("https://example.com/news")[1],
+                           score_url("https://example.com/news/2024/05/launch")[1])
+
+
+class TestRankLinks(unittest.TestCase):
+    """Tests for ranking landing page links."""
+
+    def test_filters_dedups_and_ranks(self):
+        """Test the ranked list is clean, unique and best first."""
+        hrefs = [
+            "/", "#main", "/blog", "/about", "https://example.com/about/", "/privacy",
+            "mailto:hello@example.com", "https://twitter.com/example", "/careers",
+            "/careers?utm_campaign=x", "/lessons", "https://jobs.example.com/openings",
+        ]
+        ranked = rank_links(BASE_URL, hrefs)
+        urls = [link.url for link in ranked]
+
+        self.assertEqual(len(urls), len(set(urls)))
+        self.assertEqual(urls[:2], ["https://www.example.com/about", "https://www.example.com/careers"])
+        self.assertIn("https://jobs.example.com/openings", urls)
+        self.assertEqual(urls[-1], "https://www.example.com/lessons")
+        for excluded in ["privacy", "twitter", "mailto"]:
+            self.assertFalse(any(excluded in url for url in urls), excluded)
+        self.assertNotIn("https://www.example.com", urls)
+        self.assertEqual([link.score for link in ranked],
+                         sorted((link.score for link in ranked), reverse=True))
+
+    def test_job_board_links_are_careers_pages(self):
+        """Test off-site careers pages on job boards are kept; other sites are not."""
+        hrefs = ["https://jobs.lever.co/example", "https://boards.greenhouse.io/example",
+                 "https://apply.workable.com/example/", "https://github.com/example",
+                 "https://notlever.co/example"]
+        ranked = rank_links(BASE_URL, hrefs)
+
+        self.assertEqual([link.url for link in ranked], [
+            "https://jobs.lever.co/example", "https://boards.greenhouse.io/example",
+            "https://apply.workable.com/example",
+        ])
+        self.assertEqual({link.type for link in ranked}, {"careers page"})
+
+    def test_top_k(self):
+        """Test only the best top_k candidates are kept."""
+        hrefs = [f"/page-{i}" for i in range(50)] + ["/about"]
+        ranked = rank_links(BASE_URL, hrefs, top_k=5)
+        self.assertEqual(len(ranked), 5)
+        self.assertEqual(ranked[0].url, "https://www.example.com/about")
+
+
+class TestConfidentLinks(unittest.TestCase):
+    """Tests for deciding when the scorer alone is conclusive."""
+
+    def test_confident_when_enough_types(self):
+        """Test the best link per confident page type is selected."""
+        ranked = rank_links(BASE_URL, ["/about", "/company", "/careers", "/team", "/pricing"])
+        links = confident_links(ranked, min_score=2.5, min_links=3)
+        self.assertEqual(links, [
+            {"type": "about page", "url": "https://www.example.com/about"},
+            {"type": "careers page", "url": "https://www.example.com/careers"},
+            {"type": "team page", "url": "https://www.example.com/team"},
+        ])
+
+    def test_not_confident(self):
+        """Test too few confident page types defers to the model."""
+        ranked = rank_links(BASE_URL, ["/about", "/pricing", "/blog"])
+        self.assertEqual(confident_links(ranked, min_score=2.5, min_links=3), [])
+
+
+class TestConventionalLinks(unittest.TestCase):
+    """Tests for picking pages worth prefetching."""
+
+    def test_conventional_paths_only(self):
+        """Test only conventional first path segments are returned, up to the limit."""
+        ranked = rank_links(BASE_URL, ["/about", "/pricing", "/careers/engineering",
+                                       "/blog/team", "/team", "/customers"])
+        urls = [link.url for link in conventional_links(ranked, limit=3)]
+        self.assertEqual(urls, ["https://www.example.com/about",
+                                "https://www.example.com/careers/engineering",
+                                "https://www.example.com/team"])
+        self.assertNotIn("https://www.example.com/blog/team",
+                         [link.url for link in conventional_links(ranked, limit=10)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""test_relevance.py
+
+Unit tests for the relevance module.
+
+Tests cover:
+- Splitting page text into paragraphs
+- Vectorized BM25 scores against a reference implementation
+- Facet scoring and paragraph selection within a token budget
+
+Author: scotton
+Created: 2026-01-22
+"""
+
+import math
+import unittest
+import sys
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+from relevance import BM25Index, facet_scores, select_paragraphs, split_paragraphs, tokenize
+
+
+class WordCounter:
+    """Token counter with one token per word."""
+
+    def count(self, text):
+        return len(text.split())
+
+
+def reference_bm25(documents, query, k1=1.5, b=0.75):
+    """Plain-Python BM25, term by term."""
+    docs = [tokenize(document) for document in documents]
+    average = sum(len(doc) for doc in docs) / len(docs)
+    scores = []
+    for doc in docs:
+        tf = Counter(doc)
+        score = 0.0
+        for term in set(tokenize(" ".join(query))):
+            df = sum(term in other for other in docs)
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            score += idf * tf[term] * (k1 + 1) / (tf[term] + k1 * (1 - b + b * len(doc) / average))
+        scores.append(score)
+    return scores
+
+
+class TestSplitParagraphs(unittest.TestCase):
+    """Tests for splitting pages into paragraphs."""
+
+    def test_blank_lines_and_grouping(self):
+        """Test blank lines split paragraphs and short lines are grouped."""
+        text = "Acme\nTools for builders\n\nWe are hiring\nEngineers\n\n\n"
+        self.assertEqual(split_paragraphs(text), ["Acme\nTools for builders",
+                                                  "We are hiring\nEngineers"])
+        lines = "\n".join(f"line {i} " + "x" * 40 for i in range(20))
+        paragraphs = split_paragraphs(lines, max_chars=200)
+        self.assertGreater(len(paragraphs), 1)
+        self.assertTrue(all(len(paragraph) <= 200 for paragraph in paragraphs))
+        self.assertEqual("\n".join(paragraphs), lines)
+
+    def test_long_line_split_on_words(self):
+        """Test a line longer than the limit is split between words."""
+        paragraphs = split_paragraphs("word " * 100, max_chars=50)
+        self.assertTrue(all(len(paragraph) <= 50 for paragraph in paragraphs))
+        self.assertEqual(" ".join(paragraphs).split(), ["word"] * 100)
+
+
+class TestBM25Index(unittest.TestCase):
+    """Tests for the vectorized BM25 index."""
+
+    def test_matches_reference(self):
+        """Test matrix scoring equals term-by-term BM25."""
+        documents = ["Our customers include banks and hospitals",
+                     "Join our team: open jobs in engineering and sales jobs",
+                     "Customers love the platform",
+                     "Privacy policy"]
+        queries = [["customers"], ["jobs", "team"], ["unknown"]]
+        scores = BM25Index(documents).score(queries)
+        self.assertEqual(scores.shape, (4, 3))
+        for column, query in enumerate(queries):
+            np.testing.assert_allclose(scores[:, column], reference_bm25(documents, query),
+                                       rtol=1e-5)
+
+    def test_empty_documents(self):
+        """Test documents without words score zero."""
+        self.assertEqual(BM25Index(["", "!!"]).score([["job"]]).tolist(), [[0.0], [0.0]])
+
+
+class TestSelectParagraphs(unittest.TestCase):
+    """Tests for facet scoring and selection."""
+
+    def test_facet_scores(self):
+        """Test paragraphs score highest on their own facet."""
+        paragraphs = ["Our culture and values: a remote team with a mission",
+                      "Trusted by customers and partners in every industry",
+                      "Careers: we are hiring, see open jobs and benefits",
+                      "Cookie settings"]
+        scores = facet_scores(paragraphs)
+        self.assertEqual(scores.argmax(axis=0)[:3].tolist(), [0, 1, 2])
+        self.assertEqual(scores[3].tolist(), [0.0, 0.0, 0.0, 0.0])
+        self.assertAlmostEqual(float(scores.max()), 1.0, places=5)
+
+    def test_keeps_relevant_paragraphs_within_budget(self):
+        """Test irrelevant paragraphs go first and kept ones stay in order."""
+        landing = ("Welcome to Acme\n\nCookie banner text goes here\n\n"
+                   "Trusted by customers like Globex and Initech")
+        careers = ("Careers at Acme\n\nOffice photos and lunch menu\n\n"
+                   "We are hiring engineers: open jobs with great benefits")
+        pages = select_paragraphs([landing, careers], WordCounter(), budget=22)
+
+        self.assertEqual(pages[0], "Trusted by customers like Globex and Initech")
+        self.assertEqual(pages[1], "Careers at Acme\nWe are hiring engineers: open jobs "
+                                   "with great benefits")
+        self.assertNotIn("Cookie", "".join(pages))
+
+    def test_every_page_keeps_its_best_paragraph(self):
+        """Test a page with nothing relevant still keeps one paragraph."""
+        pages = select_paragraphs(["Customers love us", "Lorem ipsum\n\nDolor sit"],
+                                  WordCounter(), budget=1)
+        self.assertEqual(pages, ["Customers love us", "Lorem ipsum"])
+        self.assertEqual(select_paragraphs(["", ""], WordCounter(), budget=10), ["", ""])
+
+
+if __name__ == "__main__":
+    unittest.main()
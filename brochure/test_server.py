@@ -0,0 +1,237 @@
+"""test_server.py
+
+Unit tests for the server module.
+
+Tests cover:
+- Coalescing concurrent requests for the same company into one generation
+- Replaying earlier chunks to late subscribers and batching for slow readers
+- Cancelling generations nobody is listening to
+- Server-Sent Events over HTTP, errors and health checks
+
+Author: scotton
+Created: 2026-01-22
+"""
+
+import asyncio
+import json
+import threading
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from server import BrochureServer, BrochureService, BrochureStreamError, _Generation, sse_event
+
+
+class FakeGenerator:
+    """Streams a fixed brochure; each chunk waits until the test releases it."""
+
+    def __init__(self, calls, chunks=("# Acme\n", "Tools ", "for all."), gate=None, fail=False):
+        self.calls = calls
+        self.chunks = chunks
+        self.gate = gate
+        self.fail = fail
+        self.closed = threading.Event()
+
+    def stream_brochure(self, company_name, url, cancelled=None):
+        self.calls.append((company_name, url))
+        try:
+            for chunk in self.chunks:
+                if self.gate is not None:
+                    self.gate.acquire()
+                yield chunk
+            if self.fail:
+                raise RuntimeError("model unavailable")
+        finally:
+            self.closed.set()
+
+
+async def collect(stream):
+    return "".join([text async for text in stream])
+
+
+class TestBrochureService(unittest.IsolatedAsyncioTestCase):
+    """Tests for coalescing and fan-out."""
+
+    def make_service(self, **kwargs):
+        self.calls = []
+        self.generators = []
+
+        def factory():
+            generator = FakeGenerator(self.calls, **kwargs)
+            self.generators.append(generator)
+            return generator
+        self.service = BrochureService(max_generations=2, generator_factory=factory)
+        return self.service
+
+    def tearDown(self):
+        self.service.shutdown()
+
+    async def test_concurrent_requests_share_one_generation(self):
+        """Test subscribers to the same site get the full brochure from one run."""
+        gate = threading.Semaphore(0)
+        service = self.make_service(gate=gate)
+        tasks = [
+            asyncio.create_task(collect(service.stream("Acme", "https://acme.com"))),
+            asyncio.create_task(collect(service.stream(" acme ", "https://www.acme.com/"))),
+            asyncio.create_task(collect(service.stream("ACME", "https://acme.com#top"))),
+        ]
+        await asyncio.sleep(0.01)  # let every subscriber attach
+        for _ in range(3):
+            gate.release()
+        results = await asyncio.gather(*tasks)
+        self.assertEqual(results, ["# Acme\nTools for all."] * 3)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(service.stats["generations"], 1)
+        self.assertEqual(service.stats["coalesced"], 2)
+        self.assertEqual(service.in_flight, 0)
+
+    async def test_different_sites_run_separately(self):
+        """Test requests for different sites are not coalesced."""
+        service = self.make_service()
+        await asyncio.gather(collect(service.stream("Acme", "https://acme.com")),
+                             collect(service.stream("Globex", "https://globex.com")))
+        self.assertEqual(sorted(self.calls), [("Acme", "https://acme.com"),
+                                              ("Globex", "https://globex.com")])
+
+    async def test_late_subscriber_gets_earlier_chunks(self):
+        """Test a subscriber joining mid-generation receives the whole brochure."""
+        gate = threading.Semaphore(0)
+        service = self.make_service(gate=gate)
+        first = service.stream("Acme", "https://acme.com")
+        gate.release()
+        self.assertEqual(await anext(first), "# Acme\n")
+
+        late = asyncio.create_task(collect(service.stream("Acme", "https://acme.com")))
+        gate.release()
+        gate.release()
+        self.assertEqual(await collect(first), "Tools for all.")
+        self.assertEqual(await late, "# Acme\nTools for all.")
+        self.assertEqual(len(self.calls), 1)
+
+    async def test_slow_reader_receives_missed_chunks_together(self):
+        """Test chunks published while a reader was busy arrive as one item."""
+        gate = threading.Semaphore(0)
+        service = self.make_service(gate=gate)
+        fast = service.stream("Acme", "https://acme.com")
+        slow = service.stream("Acme", "https://acme.com")
+        gate.release()
+        self.assertEqual(await anext(fast), "# Acme\n")
+        self.assertEqual(await anext(slow), "# Acme\n")
+        gate.release()
+        gate.release()
+        self.assertEqual(await collect(fast), "Tools for all.")
+        self.assertEqual([text async for text in slow], ["Tools for all."])
+
+    async def test_generation_cancelled_when_everyone_leaves(self):
+        """Test the generation stops once its last subscriber disconnects."""
+        gate = threading.Semaphore(0)
+        service = self.make_service(gate=gate)
+        stream = service.stream("Acme", "https://acme.com")
+        gate.release()
+        await anext(stream)
+        await stream.aclose()
+        gate.release()
+        await asyncio.to_thread(self.generators[0].closed.wait, 2)
+
+        self.assertTrue(self.generators[0].closed.is_set())
+        self.assertEqual(service.stats["cancelled"], 1)
+        self.assertEqual(service.in_flight, 0)
+
+    async def test_generation_cancelled_while_queued_never_starts(self):
+        """Test a generation abandoned before a worker picked it up does no work."""
+        service = self.make_service()
+        generation = _Generation(service.key("Acme", "https://acme.com"))
+        generation.cancelled.set()
+        await asyncio.to_thread(service._produce, generation, "Acme", "https://acme.com",
+                                asyncio.get_running_loop())
+        await asyncio.sleep(0)
+
+        self.assertEqual(self.calls, [])
+        self.assertTrue(generation.done)
+
+    async def test_errors_reach_every_subscriber(self):
+        """Test a failed generation raises in all subscribers."""
+        gate = threading.Semaphore(0)
+        service = self.make_service(gate=gate, fail=True)
+        tasks = [asyncio.create_task(collect(service.stream("Acme", "https://acme.com")))
+                 for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for _ in range(3):
+            gate.release()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        for result in results:
+            self.assertIsInstance(result, BrochureStreamError)
+            self.assertEqual(str(result), "RuntimeError: model unavailable")
+        self.assertEqual(service.stats["failed"], 1)
+        self.assertEqual(len(self.calls), 1)
+
+
+class TestBrochureServer(unittest.IsolatedAsyncioTestCase):
+    """Tests for the HTTP layer."""
+
+    async def asyncSetUp(self):
+        self.calls = []
+        self.fail = False
+        self.service = BrochureService(
+            generator_factory=lambda: FakeGenerator(self.calls, fail=self.fail)
+        )
+        self.server = BrochureServer(self.service, port=0)
+        await self.server.start()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def get(self, target):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.server.port)
+        writer.write(f"GET {target} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        await writer.drain()
+        response = (await reader.read()).decode("utf-8")
+        writer.close()
+        head, _, body = response.partition("\r\n\r\n")
+        return head, body
+
+    @staticmethod
+    def parse_events(body):
+        events = []
+        for block in body.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((lines["event"], json.loads(lines["data"])))
+        return events
+
+    async def test_streams_server_sent_events(self):
+        """Test the brochure arrives as chunk events followed by done."""
+        head, body = await self.get("/brochure?company=Acme&url=https%3A%2F%2Facme.com")
+        self.assertIn("200 OK", head)
+        self.assertIn("Content-Type: text/event-stream", head)
+        events = self.parse_events(body)
+        self.assertEqual(events[-1], ("done", {}))
+        self.assertEqual("".join(data["text"] for event, data in events[:-1]),
+                         "# Acme\nTools for all.")
+        self.assertEqual(self.calls, [("Acme", "https://acme.com")])
+
+    async def test_error_event(self):
+        """Test a failed generation ends the stream with an error event."""
+        self.fail = True
+        _, body = await self.get("/brochure?company=Acme&url=https://acme.com")
+        self.assertEqual(self.parse_events(body)[-1],
+                         ("error", {"error": "RuntimeError: model unavailable"}))
+
+    async def test_bad_requests_and_health(self):
+        """Test missing parameters, unknown paths and the health check."""
+        head, body = await self.get("/brochure?company=Acme")
+        self.assertIn("400 Bad Request", head)
+        head, _ = await self.get("/nothing")
+        self.assertIn("404 Not Found", head)
+        head, body = await self.get("/health")
+        self.assertIn("200 OK", head)
+        self.assertEqual(json.loads(body)["in_flight"], 0)
+
+    def test_sse_event_encoding(self):
+        """Test newlines in the text stay inside the JSON payload."""
+        self.assertEqual(sse_event("chunk", {"text": "a\nb"}),
+                         b'event: chunk\ndata: {"text": "a\\nb"}\n\n')
+
+
+if __name__ == "__main__":
+    unittest.main()
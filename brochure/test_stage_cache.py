@@ -0,0 +1,147 @@
+"""test_stage_cache.py
+
+Unit tests for the stage_cache module.
+
+Author: scotton
+Created: 2026-01-21
+"""
+
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from stage_cache import DiskCache, StageCache, TTLCache, brochure_key
+
+
+class FakeClock:
+    """A manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    """Tests for the in-memory TTL cache."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = TTLCache(ttl=10, max_entries=2, clock=self.clock)
+
+    def test_get_and_expire(self):
+        """Test entries are returned until their TTL passes."""
+        self.cache.set("a", 1)
+        self.clock.now = 9.9
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIn("a", self.cache)
+        self.clock.now = 10.0
+        self.assertIsNone(self.cache.get("a"))
+        self.assertNotIn("a", self.cache)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry goes first when full."""
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.get("a")
+        self.cache.set("c", 3)
+        self.assertEqual(self.cache.get("a"), 1)
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("c"), 3)
+
+    def test_pop_and_clear(self):
+        """Test pop removes one entry and clear removes all."""
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.assertEqual(self.cache.pop("a"), 1)
+        self.assertEqual(self.cache.pop("a", "gone"), "gone")
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+
+class TestDiskCache(unittest.TestCase):
+    """Tests for the on-disk cache backend."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.clock = FakeClock()
+        self.cache = DiskCache(self.tmp.name, ttl=10, clock=self.clock)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_and_expiry(self):
+        """Test values survive a new instance and expire after the TTL."""
+        self.cache.set("https://example.com", {"links": ["/about"]})
+        reopened = DiskCache(self.tmp.name, ttl=10, clock=self.clock)
+        self.assertEqual(reopened.get("https://example.com"), {"links": ["/about"]})
+        self.clock.now = 10
+        self.assertIsNone(reopened.get("https://example.com"))
+        self.assertEqual(list(Path(self.tmp.name).glob("*.json")), [])
+
+    def test_pop_and_clear(self):
+        """Test pop removes one entry and clear removes all."""
+        self.cache.set("a", "1")
+        self.cache.set("b", "2")
+        self.assertEqual(self.cache.pop("a"), "1")
+        self.assertNotIn("a", self.cache)
+        self.cache.clear()
+        self.assertNotIn("b", self.cache)
+
+
+class TestStageCache(unittest.TestCase):
+    """Tests for the per-stage cache."""
+
+    def test_stages_are_independent(self):
+        """Test each stage has its own backend and counters."""
+        clock = FakeClock()
+        cache = StageCache({
+            "page_contents": TTLCache(ttl=5, clock=clock),
+            "brochure": TTLCache(ttl=50, clock=clock),
+        })
+        cache.set("page_contents", "https://example.com/about", "About")
+        cache.set("brochure", "key", "# Brochure")
+        cache.set("landing_page", "https://example.com", "ignored")
+
+        clock.now = 10
+        self.assertIsNone(cache.get("page_contents", "https://example.com/about"))
+        self.assertEqual(cache.get("brochure", "key"), "# Brochure")
+        self.assertIsNone(cache.get("landing_page", "https://example.com"))
+        self.assertEqual(cache.stats(), {
+            "page_contents": {"hits": 0, "misses": 1},
+            "brochure": {"hits": 1, "misses": 0},
+        })
+        cache.invalidate("brochure", "key")
+        self.assertIsNone(cache.get("brochure", "key"))
+
+    def test_factories_cover_all_stages(self):
+        """Test the in-memory and on-disk factories set per-stage TTLs."""
+        cache = StageCache.in_memory(ttls={"brochure": 1})
+        self.assertEqual(set(cache.backends),
+                         {"landing_page", "selected_links", "page_contents", "brochure"})
+        self.assertEqual(cache.backends["brochure"].ttl, 1)
+        with tempfile.TemporaryDirectory() as tmp:
+            disk = StageCache.on_disk(tmp)
+            disk.set("selected_links", "example.com", [{"type": "about page", "url": "/about"}])
+            self.assertEqual(disk.get("selected_links", "example.com"),
+                             [{"type": "about page", "url": "/about"}])
+            self.assertTrue((Path(tmp) / "selected_links").is_dir())
+
+    def test_brochure_key(self):
+        """Test the brochure key changes with the model and the prompt."""
+        messages = [{"role": "system", "content": "Be formal"}, {"role": "user", "content": "x"}]
+        key = brochure_key("gpt-4.1-mini", messages)
+        self.assertTrue(key.startswith("gpt-4.1-mini:"))
+        self.assertEqual(key, brochure_key("gpt-4.1-mini", [dict(m) for m in messages]))
+        self.assertNotEqual(key, brochure_key("gpt-5-nano", messages))
+        self.assertNotEqual(key, brochure_key(
+            "gpt-4.1-mini", [{"role": "system", "content": "Be funny"}, messages[1]]
+        ))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+"""test_tracing.py
+
+Unit tests for the tracing module.
+
+Tests cover:
+- Spans, attributes, errors and marks
+- The stage table kept from the original stage timer
+- JSONL and Chrome trace-event exports
+
+Author: scotton
+Created: 2026-01-22
+"""
+
+import json
+import tempfile
+import threading
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import Mock
+
+sys.path.insert(0, str(Path(__file__).parent))
+from tracing import Tracer, text_attributes, usage_attributes
+
+
+class FakeClock:
+    """Clock advanced by hand."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTracer(unittest.TestCase):
+    """Tests for recording spans."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.tracer = Tracer(clock=self.clock)
+
+    def test_span_records_offsets_and_attributes(self):
+        """Test spans are timed from the tracer's creation and carry attributes."""
+        self.clock.now = 101.0
+        with self.tracer.span("page_fetch", url="https://example.com") as span:
+            self.clock.now = 101.5
+            span.set(bytes=1_024, skipped=None)
+        recorded = self.tracer.spans[0]
+        self.assertEqual((recorded.start, recorded.end), (1.0, 1.5))
+        self.assertEqual(recorded.attributes, {"url": "https://example.com", "bytes": 1_024})
+        self.assertEqual(recorded.thread, threading.current_thread().name)
+
+    def test_failed_span_keeps_error(self):
+        """Test a span whose block raises is still recorded with the error."""
+        with self.assertRaises(ValueError):
+            with self.tracer.span("link_selection"):
+                raise ValueError("bad JSON")
+        self.assertEqual(self.tracer.spans[0].attributes["error"], "ValueError: bad JSON")
+
+    def test_stages_durations_and_report(self):
+        """Test the stage timer view of the spans."""
+        with self.tracer.span("landing_page"):
+            self.clock.now = 102.0
+        self.clock.now = 101.0
+        with self.tracer.span("link_scrape") as span:
+            span.set(links=12)
+            self.clock.now = 104.0
+        self.tracer.mark("first_token")
+
+        self.assertEqual(self.tracer.stages, {"landing_page": (0.0, 2.0),
+                                              "link_scrape": (1.0, 4.0),
+                                              "first_token": (4.0, 4.0)})
+        self.assertEqual(list(self.tracer.durations()), ["landing_page", "link_scrape",
+                                                         "first_token"])
+        self.assertEqual(self.tracer.elapsed, 4.0)
+        report = self.tracer.format_report()
+        self.assertIn("links=12", report)
+        self.assertIn("Total (critical path)", report)
+
+    def test_attribute_helpers(self):
+        """Test token counts and text sizes become plain attributes."""
+        usage = Mock(prompt_tokens=120, completion_tokens=30, total_tokens=150)
+        self.assertEqual(usage_attributes(usage),
+                         {"prompt_tokens": 120, "completion_tokens": 30, "total_tokens": 150})
+        self.assertEqual(usage_attributes(None), {})
+        self.assertEqual(usage_attributes(Mock()), {})
+        self.assertEqual(text_attributes("café"), {"chars": 4, "bytes": 5})
+
+
+class TestExports(unittest.TestCase):
+    """Tests for exporting spans."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.tracer = Tracer(clock=self.clock)
+        with self.tracer.span("brochure_generation", model="gpt-4.1-mini"):
+            self.clock.now = 100.25
+            self.tracer.mark("brochure_generation first_token")
+            self.clock.now = 101.0
+
+        def fetch():
+            with self.tracer.span("page_fetch https://example.com/about", bytes=10):
+                pass
+        worker = threading.Thread(target=fetch, name="fetch-worker")
+        worker.start()
+        worker.join()
+
+    def test_jsonl(self):
+        """Test one JSON object per span, with extra fields on every line."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "spans.jsonl"
+            self.tracer.write_jsonl(path, company="Acme")
+            self.tracer.write_jsonl(path, company="Globex")
+            lines = [json.loads(line) for line in path.read_text().splitlines()]
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(lines[0], {"company": "Acme", "name": "brochure_generation",
+                                    "start": 0.0, "end": 1.0, "duration": 1.0,
+                                    "thread": threading.current_thread().name,
+                                    "model": "gpt-4.1-mini"})
+        self.assertEqual(lines[-1]["company"], "Globex")
+
+    def test_chrome_trace(self):
+        """Test spans become complete events, marks instant events, threads lanes."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "trace.json"
+            self.tracer.write_chrome_trace(path)
+            trace = json.loads(path.read_text())
+        events = {event["name"]: event for event in trace["traceEvents"] if event["ph"] != "M"}
+        generation = events["brochure_generation"]
+        self.assertEqual((generation["ph"], generation["ts"], generation["dur"]),
+                         ("X", 0.0, 1_000_000.0))
+        self.assertEqual(generation["args"], {"model": "gpt-4.1-mini"})
+        first_token = events["brochure_generation first_token"]
+        self.assertEqual((first_token["ph"], first_token["ts"], first_token["s"]),
+                         ("i", 250_000.0, "t"))
+        fetch = events["page_fetch https://example.com/about"]
+        self.assertEqual(fetch["cat"], "page_fetch")
+        self.assertNotEqual(fetch["tid"], generation["tid"])
+        lanes = {event["args"]["name"] for event in trace["traceEvents"] if event["ph"] == "M"}
+        self.assertIn("fetch-worker", lanes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+"""tracing.py
+
+Structured latency tracing for the brochure pipeline.
+
+A ``Tracer`` records spans (named intervals with attributes such as
+token counts and byte sizes) and marks (instants, e.g. the first token
+of a generation) from any thread. A run can be printed as a table, or
+exported as:
+- JSONL, one span per line, for log pipelines and ad-hoc analysis
+- A Chrome trace-event file, which chrome://tracing, Perfetto
+  (https://ui.perfetto.dev) and speedscope show as a timeline with one
+  lane per thread
+
+Author: scotton
+Created: 2026-01-22
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+
+
+@dataclass
+class Span:
+    """A timed interval of the pipeline.
+
+    Attributes:
+        name: Span name (e.g. "link_selection")
+        start: Seconds from the tracer's creation to the span start
+        end: Seconds from the tracer's creation to the span end; equal to
+            start for marks
+        thread: Name of the thread the span ran on
+        attributes: Extra facts about the span (model, tokens, bytes, ...)
+        instant: Whether this is a mark rather than an interval
+    """
+    name: str
+    start: float
+    end: float = 0.0
+    thread: str = ""
+    attributes: dict = field(default_factory=dict)
+    instant: bool = False
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def set(self, **attributes) -> None:
+        """Add attributes to the span; None values are skipped."""
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "start": round(self.start, 6),
+            "end": round(self.end, 6),
+            "duration": round(self.duration, 6),
+            "thread": self.thread,
+            **self.attributes,
+        }
+
+
+def usage_attributes(usage) -> dict:
+    """Return the token counts of an OpenAI usage object as span attributes."""
+    attributes = {}
+    for name in ("prompt_tokens", "completion_tokens", "total_tokens"):
+        value = getattr(usage, name, None)
+        if isinstance(value, int):
+            attributes[name] = value
+    return attributes
+
+
+def text_attributes(text: str) -> dict:
+    """Return the size of a text as span attributes."""
+    return {"chars": len(text), "bytes": len(text.encode("utf-8"))}
+
+
+class Tracer:
+    """Thread-safe recorder of pipeline spans and marks.
+
+    Offsets are measured in seconds from the tracer's creation, so spans
+    that run concurrently show up as overlapping intervals and the
+    critical path is the latest end offset.
+
+    Attributes:
+        spans (list[Span]): Finished spans and marks, in the order they ended
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        """Start the tracer.
+
+        Args:
+            clock: Function returning the current time in seconds
+        """
+        self._clock = clock
+        self._origin = clock()
+        self._lock = threading.Lock()
+        self.spans: list[Span] = []
+
+    def _now(self) -> float:
+        return self._clock() - self._origin
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time the enclosed block as a span.
+
+        The span is yielded so attributes known only at the end (sizes,
+        token counts) can be added with ``span.set(...)``. A span whose
+        block raises gets an ``error`` attribute.
+
+        Args:
+            name: Span name (e.g. "link_selection")
+            **attributes: Initial attributes
+        """
+        span = Span(name, self._now(), thread=threading.current_thread().name)
+        span.set(**attributes)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.end = self._now()
+            with self._lock:
+                self.spans.append(span)
+
+    def mark(self, name: str, **attributes) -> Span:
+        """Record an instant (e.g. the first token of a stream)."""
+        now = self._now()
+        span = Span(name, now, now, threading.current_thread().name, instant=True)
+        span.set(**attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def _ordered(self) -> list[Span]:
+        with self._lock:
+            return sorted(self.spans, key=lambda span: span.start)
+
+    @property
+    def stages(self) -> dict[str, tuple[float, float]]:
+        """Span name mapped to its (start, end) offsets; the latest span wins."""
+        return {span.name: (span.start, span.end) for span in self._ordered()}
+
+    def durations(self) -> dict[str, float]:
+        """Return each span's duration in seconds, in start order."""
+        return {name: end - start for name, (start, end) in self.stages.items()}
+
+    @property
+    def elapsed(self) -> float:
+        """Wall-clock seconds from the first span start to the last span end."""
+        spans = self._ordered()
+        if not spans:
+            return 0.0
+        return max(span.end for span in spans) - spans[0].start
+
+    def format_report(self) -> str:
+        """Format the spans as a table of start, end, duration and attributes.
+
+        Returns:
+            Multi-line report ending with the total wall-clock time
+        """
+        lines = [f"{'Stage':<48} {'Start':>8} {'End':>8} {'Took':>8}  Details"]
+        for span in self._ordered():
+            details = " ".join(f"{key}={value}" for key, value in span.attributes.items()
+                               if key != "url")
+            lines.append(f"{span.name[:48]:<48} {span.start:>7.2f}s {span.end:>7.2f}s "
+                         f"{span.duration:>7.2f}s  {details}".rstrip())
+        lines.append(f"{'Total (critical path)':<48} {'':>8} {'':>8} {self.elapsed:>7.2f}s")
+        return "\n".join(lines)
+
+    def to_jsonl(self, **fields) -> str:
+        """Return the spans as JSON lines, in start order.
+
+        Args:
+            **fields: Added to every line (e.g. company="Acme" to tell runs apart)
+        """
+        return "".join(json.dumps({**fields, **span.as_dict()}, default=str) + "\n"
+                       for span in self._ordered())
+
+    def write_jsonl(self, path: str | Path, append: bool = True, **fields) -> None:
+        """Write the spans to a JSONL file, appending by default.
+
+        Args:
+            path: Output file
+            append: Append to the file instead of replacing it (default: True)
+            **fields: Added to every line
+        """
+        with open(path, "a" if append else "w", encoding="utf-8") as f:
+            f.write(self.to_jsonl(**fields))
+
+    def chrome_trace(self, pid: int = 1) -> dict:
+        """Return the spans in the Chrome trace-event format.
+
+        Spans become complete ("X") events and marks instant ("i")
+        events, with one lane (tid) per thread; timestamps are in
+        microseconds.
+        """
+        threads: dict[str, int] = {}
+        events = []
+        for span in self._ordered():
+            tid = threads.setdefault(span.thread, len(threads) + 1)
+            event = {
+                "name": span.name,
+                "cat": span.name.split()[0],
+                "ph": "i" if span.instant else "X",
+                "ts": round(span.start * 1e6, 3),
+                "pid": pid,
+                "tid": tid,
+                "args": span.attributes,
+            }
+            if event["ph"] == "X":
+                event["dur"] = round(span.duration * 1e6, 3)
+            else:
+                event["s"] = "t"
+            events.append(event)
+        for thread, tid in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                           "args": {"name": thread}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str | Path) -> None:
+        """Write the spans as a Chrome trace-event JSON file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, default=str)
@@ -13,6 +13,8 @@ class Scraper:
     Attributes:
         headers (dict): HTTP headers to use for requests, including a User-Agent
                        to simulate a browser request.
+        session (requests.Session): Session whose connection pool is reused
+                       across requests, so a shared Scraper keeps connections warm.
     """
     
     def __init__(self):
@@ -20,8 +22,9 @@ class Scraper:
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36"
         }
+        self.session = requests.Session()
     
-    def fetch_website_contents(self, url):
+    def fetch_website_contents(self, url, timeout=None):
         """
         Fetch and extract the textual content from a webpage.
         
@@ -31,6 +34,8 @@ class Scraper:
         
         Args:
             url (str): The URL of the webpage to fetch.
+            timeout (float | None): Seconds to wait for the server to connect
+                and to send data before giving up (default: wait indefinitely).
         
         Returns:
             str: The page title followed by the body text, truncated to 2,000
@@ -39,7 +44,7 @@ class Scraper:
         Raises:
             requests.exceptions.RequestException: If the HTTP request fails.
         """
-        response = requests.get(url, headers=self.headers)
+        response = self.session.get(url, headers=self.headers, timeout=timeout)
         soup = BeautifulSoup(response.content, "html.parser")
         title = soup.title.string if soup.title else "No title found"
         if soup.body:
@@ -50,7 +55,7 @@ class Scraper:
             text = ""
         return (title + "\n\n" + text)[:2_000]
     
-    def fetch_website_links(self, url):
+    def fetch_website_links(self, url, timeout=None):
         """
         Fetch and extract all hyperlinks from a webpage.
         
@@ -60,6 +65,8 @@ class Scraper:
         
         Args:
             url (str): The URL of the webpage to fetch.
+            timeout (float | None): Seconds to wait for the server to connect
+                and to send data before giving up (default: wait indefinitely).
         
         Returns:
             list[str]: A list of all valid hyperlinks found on the page.
@@ -67,7 +74,7 @@ class Scraper:
         Raises:
             requests.exceptions.RequestException: If the HTTP request fails.
         """
-        response = requests.get(url, headers=self.headers)
+        response = self.session.get(url, headers=self.headers, timeout=timeout)
         soup = BeautifulSoup(response.content, "html.parser")
         links = [link.get("href") for link in soup.find_all("a")]
         return [link for link in links if link]
@@ -0,0 +1,269 @@
+# Auto-Generated
+# File Name: benchmark_suite.py
+# Author: scotton
+# Creation Date: January-22-2026
+# Modified Date: January-22-2026
+
+"""Encode and decode throughput of the encodings our models use.
+
+For each encoding and each category of the fixture corpus (prose, code,
+CJK, scraped web text), measures MB/s of UTF-8 text and tokens/s in
+three modes:
+- single: one encode (or decode) call per document on this thread
+- batch: tiktoken's encode_batch / decode_batch with a thread pool
+- threads: one call per document spread over a ThreadPoolExecutor
+
+Each measurement is the best of several runs. Results can be saved as
+JSON and compared against a saved baseline; the comparison exits with
+status 1 if any throughput fell by more than the tolerance.
+
+Usage:
+    uv run python benchmark_suite.py
+    uv run python benchmark_suite.py --output baseline.json
+    uv run python benchmark_suite.py --compare baseline.json --tolerance 0.15
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Callable
+
+import tiktoken
+from tiktoken.model import encoding_name_for_model
+
+from corpus import load_fixture_corpus
+
+
+# Models the projects in this repository call
+BENCHMARK_MODELS = ("gpt-4.1-mini", "gpt-4.1-nano", "gpt-5-nano", "gpt-4o-mini", "gpt-4")
+
+MODES = ("single", "batch", "threads")
+
+
+@dataclass
+class Measurement:
+    """Throughput of one operation on one workload.
+
+    Attributes:
+        encoding: Encoding name
+        category: Corpus category
+        operation: "encode" or "decode"
+        mode: "single", "batch" or "threads"
+        threads: Threads used (1 for single)
+        bytes: UTF-8 bytes in the workload
+        tokens: Tokens in the workload
+        seconds: Best run time
+        mb_per_s: Megabytes (10^6 bytes) of text per second
+        tokens_per_s: Tokens per second
+    """
+    encoding: str
+    category: str
+    operation: str
+    mode: str
+    threads: int
+    bytes: int
+    tokens: int
+    seconds: float
+    mb_per_s: float
+    tokens_per_s: float
+
+    @property
+    def key(self) -> str:
+        """Identity of the measurement across runs."""
+        return f"{self.encoding}/{self.category}/{self.operation}/{self.mode}/{self.threads}"
+
+
+def benchmark_encodings(models: tuple[str, ...] = BENCHMARK_MODELS) -> list[str]:
+    """Return the distinct encoding names of some models, in first-seen order."""
+    return list(dict.fromkeys(encoding_name_for_model(model) for model in models))
+
+
+def build_workload(text: str, target_bytes: int) -> list[str]:
+    """Repeat a text's paragraphs until they hold at least target_bytes.
+
+    Args:
+        text: Source text
+        target_bytes: Minimum UTF-8 size of the workload
+
+    Returns:
+        The workload's documents, one paragraph each
+    """
+    paragraphs = [paragraph for paragraph in text.split("\n\n") if paragraph.strip()] or [text]
+    size = sum(len(paragraph.encode("utf-8")) for paragraph in paragraphs)
+    return paragraphs * max(1, -(-target_bytes // max(size, 1)))
+
+
+def best_time(func: Callable[[], object], repeats: int) -> float:
+    """Return the fastest of several timed calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_workload(encoding: tiktoken.Encoding, category: str, documents: list[str],
+                     threads: int = 4, repeats: int = 3) -> list[Measurement]:
+    """Measure encode and decode throughput of one workload in every mode.
+
+    Args:
+        encoding: The encoding to measure
+        category: Corpus category of the workload
+        documents: The workload
+        threads: Threads for the batch and threads modes (default: 4)
+        repeats: Runs per measurement; the fastest counts (default: 3)
+
+    Returns:
+        One Measurement per operation and mode
+    """
+    size = sum(len(document.encode("utf-8")) for document in documents)
+    tokens = encoding.encode_batch(documents, num_threads=threads, disallowed_special=())
+    token_count = sum(map(len, tokens))
+
+    def encode_one(document: str) -> list[int]:
+        return encoding.encode(document, disallowed_special=())
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        runs = {
+            ("encode", "single"): lambda: [encode_one(document) for document in documents],
+            ("encode", "batch"): lambda: encoding.encode_batch(
+                documents, num_threads=threads, disallowed_special=()),
+            ("encode", "threads"): lambda: list(pool.map(encode_one, documents)),
+            ("decode", "single"): lambda: [encoding.decode(ids) for ids in tokens],
+            ("decode", "batch"): lambda: encoding.decode_batch(tokens, num_threads=threads),
+            ("decode", "threads"): lambda: list(pool.map(encoding.decode, tokens)),
+        }
+        results = []
+        for (operation, mode), run in runs.items():
+            seconds = max(best_time(run, repeats), 1e-9)
+            results.append(Measurement(
+                encoding=encoding.name,
+                category=category,
+                operation=operation,
+                mode=mode,
+                threads=1 if mode == "single" else threads,
+                bytes=size,
+                tokens=token_count,
+                seconds=seconds,
+                mb_per_s=size / seconds / 1e6,
+                tokens_per_s=token_count / seconds,
+            ))
+    return results
+
+
+def run_suite(encodings: list[tiktoken.Encoding], corpus: dict[str, str] | None = None,
+              target_bytes: int = 1_000_000, threads: int = 4,
+              repeats: int = 3) -> list[Measurement]:
+    """Measure every encoding on every corpus category.
+
+    Args:
+        encodings: The encodings to measure
+        corpus: Category mapped to text (default: the fixture corpus)
+        target_bytes: Workload size per category (default: 1 MB)
+        threads: Threads for the batch and threads modes (default: 4)
+        repeats: Runs per measurement (default: 3)
+
+    Returns:
+        All measurements
+    """
+    corpus = corpus if corpus is not None else load_fixture_corpus()
+    results = []
+    for encoding in encodings:
+        for category, text in corpus.items():
+            results.extend(measure_workload(encoding, category,
+                                            build_workload(text, target_bytes), threads, repeats))
+    return results
+
+
+def suite_report(results: list[Measurement]) -> dict:
+    """Wrap results with the environment they were measured in, for JSON output."""
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "tiktoken": tiktoken.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": [asdict(result) for result in results],
+    }
+
+
+def compare_results(baseline: dict, results: list[Measurement],
+                    tolerance: float = 0.1) -> list[tuple[str, float, float]]:
+    """Find measurements slower than a baseline by more than a tolerance.
+
+    Args:
+        baseline: A report from suite_report (e.g. loaded from JSON)
+        results: The new measurements
+        tolerance: Allowed relative drop in MB/s (default: 0.1, i.e. 10%)
+
+    Returns:
+        (key, baseline MB/s, current MB/s) of each regression; measurements
+        missing from the baseline are ignored
+    """
+    previous = {Measurement(**entry).key: entry["mb_per_s"] for entry in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get(result.key)
+        if before is not None and result.mb_per_s < before * (1 - tolerance):
+            regressions.append((result.key, before, result.mb_per_s))
+    return regressions
+
+
+def format_results(results: list[Measurement]) -> str:
+    """Format measurements as a table."""
+    lines = [f"{'Encoding':<12} {'Category':<8} {'Operation':<9} {'Mode':<8} {'Threads':>7} "
+             f"{'MB/s':>9} {'Tokens/s':>13}"]
+    for result in results:
+        lines.append(f"{result.encoding:<12} {result.category:<8} {result.operation:<9} "
+                     f"{result.mode:<8} {result.threads:>7} {result.mb_per_s:>9.2f} "
+                     f"{result.tokens_per_s:>13,.0f}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the suite, print or save the results and compare with a baseline."""
+    parser = argparse.ArgumentParser(description="Benchmark encode and decode throughput.")
+    parser.add_argument("--encoding", action="append",
+                        help="Encoding to measure (repeatable, default: those of BENCHMARK_MODELS)")
+    parser.add_argument("--target-bytes", type=int, default=1_000_000,
+                        help="Workload size per corpus category (default: 1 MB)")
+    parser.add_argument("--threads", type=int, default=4, help="Threads for batch and thread modes")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per measurement")
+    parser.add_argument("--json", action="store_true", help="Print the JSON report instead of a table")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Allowed relative drop in MB/s before failing (default: 0.1)")
+    args = parser.parse_args(argv)
+
+    names = args.encoding or benchmark_encodings()
+    results = run_suite([tiktoken.get_encoding(name) for name in names],
+                        target_bytes=args.target_bytes, threads=args.threads, repeats=args.repeats)
+    report = suite_report(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_results(results))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare_results(json.load(f), results, args.tolerance)
+        for key, before, after in regressions:
+            print(f"REGRESSION {key}: {before:.2f} -> {after:.2f} MB/s", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
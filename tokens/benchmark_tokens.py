@@ -0,0 +1,102 @@
+# Auto-Generated
+# File Name: benchmark_tokens.py
+# Author: scotton
+# Creation Date: January-22-2026
+# Modified Date: January-22-2026
+
+"""Micro-benchmark of token encoding and counting calls.
+
+Measures calls per second of:
+- encoding with a tiktoken.encoding_for_model() lookup on every call
+  (how encode_text worked before the encoding registry)
+- encode_text() through the cached encoding registry
+- counting a batch of texts one at a time versus count_tokens_batch()
+
+Usage:
+    uv run python benchmark_tokens.py --model gpt-4.1-mini --calls 20000
+"""
+
+import argparse
+import time
+from typing import Callable
+
+import tiktoken
+
+from tokens import count_tokens_batch, encode_text, get_encoding_for_model
+
+
+SAMPLE_TEXTS = [
+    "Hi! My name is Steven and I love coffee!",
+    "You are a helpful assistant. Please summarize this article in three bullet points.",
+    "def add(a: int, b: int) -> int:\n    return a + b\n",
+    "Tokens determine both API costs and context limits; count them before every call.",
+    "La mémoire d'un LLM n'est qu'une illusion : tout l'historique est renvoyé.",
+]
+
+
+def calls_per_second(func: Callable[[], object], calls: int) -> float:
+    """Time a function over a number of calls.
+
+    Args:
+        func: The function to call
+        calls: How many times to call it
+
+    Returns:
+        Calls per second
+    """
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    elapsed = time.perf_counter() - start
+    return calls / elapsed if elapsed > 0 else float("inf")
+
+
+def run_benchmark(model: str = "gpt-4.1-mini", calls: int = 20_000,
+                  batch_size: int = 1_000) -> dict[str, float]:
+    """Run the micro-benchmark.
+
+    Args:
+        model: The model whose encoding is benchmarked (default: gpt-4.1-mini)
+        calls: Single-text calls per measurement (default: 20,000)
+        batch_size: Texts per batch in the counting measurements (default: 1,000)
+
+    Returns:
+        Measurement name mapped to calls (or texts) per second
+    """
+    text = SAMPLE_TEXTS[0]
+    texts = (SAMPLE_TEXTS * (batch_size // len(SAMPLE_TEXTS) + 1))[:batch_size]
+    encoding = get_encoding_for_model(model)  # load once so no run pays the download
+    rounds = max(1, calls // batch_size)
+
+    return {
+        "encode, lookup per call (calls/s)": calls_per_second(
+            lambda: tiktoken.encoding_for_model(model).encode(text), calls
+        ),
+        "encode_text, cached (calls/s)": calls_per_second(
+            lambda: encode_text(text, model), calls
+        ),
+        "count one by one (texts/s)": batch_size * calls_per_second(
+            lambda: [len(encoding.encode(item)) for item in texts], rounds
+        ),
+        "count_tokens_batch (texts/s)": batch_size * calls_per_second(
+            lambda: count_tokens_batch(texts, model), rounds
+        ),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the micro-benchmark and print a table of results."""
+    parser = argparse.ArgumentParser(description="Benchmark token encoding calls.")
+    parser.add_argument("--model", default="gpt-4.1-mini")
+    parser.add_argument("--calls", type=int, default=20_000, help="Single-text calls per run")
+    parser.add_argument("--batch-size", type=int, default=1_000, help="Texts per batch")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.model, args.calls, args.batch_size)
+    print(f"=== Token encoding benchmark ({args.model}) ===\n")
+    for name, rate in results.items():
+        print(f"{name:<40} {rate:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
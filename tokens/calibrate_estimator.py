@@ -0,0 +1,164 @@
+# Auto-Generated
+# File Name: calibrate_estimator.py
+# Author: scotton
+# Creation Date: January-22-2026
+# Modified Date: January-22-2026
+
+"""Fit token estimators against tiktoken and report their error.
+
+For each encoding, cuts the fixture corpus into samples, fits a
+TokenEstimator to the exact counts and prints the relative error of the
+current default and of the fitted estimator per corpus category, along
+with how often ``exact_if_near_limit`` would fall back to tiktoken and
+how much faster estimating is than encoding. Ends with the fitted
+estimators, ready to paste into DEFAULT_ESTIMATORS.
+
+Usage:
+    uv run python calibrate_estimator.py
+    uv run python calibrate_estimator.py --encoding o200k_base --json > calibration.json
+"""
+
+import argparse
+import json
+import math
+import time
+
+import numpy as np
+import tiktoken
+
+from corpus import corpus_samples
+from estimate_tokens import DEFAULT_ESTIMATORS, TokenEstimator
+
+
+def error_report(estimator: TokenEstimator, samples: list[tuple[str, str]],
+                 encoding: tiktoken.Encoding) -> dict[str, dict[str, float]]:
+    """Measure an estimator's relative error per sample category.
+
+    Relative error is (estimate - exact) / exact, so a positive bias means
+    the estimator over-counts.
+
+    Args:
+        estimator: The estimator to measure
+        samples: (category, text) pairs
+        encoding: The encoding giving exact counts
+
+    Returns:
+        Category (plus "all") mapped to samples, bias, p50, p90, p99 and
+        max of the absolute relative error, and the share of samples whose
+        exact count is outside the estimator's error band
+    """
+    by_category: dict[str, list[tuple[int, int]]] = {}
+    for category, text in samples:
+        pair = (estimator.estimate(text), len(encoding.encode(text, disallowed_special=())))
+        by_category.setdefault(category, []).append(pair)
+        by_category.setdefault("all", []).append(pair)
+
+    report = {}
+    for category, pairs in by_category.items():
+        estimates, exact = np.array(pairs, dtype=np.float64).T
+        relative = (estimates - exact) / np.maximum(exact, 1)
+        outside = np.abs(estimates - exact) > [estimator.margin(e) for e in estimates]
+        report[category] = {
+            "samples": len(pairs),
+            "bias": float(relative.mean()),
+            "p50": float(np.quantile(np.abs(relative), 0.5)),
+            "p90": float(np.quantile(np.abs(relative), 0.9)),
+            "p99": float(np.quantile(np.abs(relative), 0.99)),
+            "max": float(np.abs(relative).max()),
+            "outside_band": float(outside.mean()),
+        }
+    return report
+
+
+def speedup(estimator: TokenEstimator, texts: list[str], encoding: tiktoken.Encoding) -> float:
+    """Return how many times faster estimating the texts is than encoding them."""
+    start = time.perf_counter()
+    for text in texts:
+        encoding.encode(text, disallowed_special=())
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for text in texts:
+        estimator.estimate(text)
+    estimate_time = time.perf_counter() - start
+    return encode_time / estimate_time if estimate_time > 0 else float("inf")
+
+
+def calibrate(encoding: tiktoken.Encoding, samples: list[tuple[str, str]],
+              quantile: float = 1.0) -> dict:
+    """Fit an estimator for an encoding and measure it against the default.
+
+    Args:
+        encoding: The encoding to fit against
+        samples: (category, text) pairs
+        quantile: Share of samples the error band must cover (default: 1.0,
+            every sample, since fits_budget trusts the band)
+
+    Returns:
+        The fitted estimator's parameters, its error report and speedup,
+        and the default estimator's error report (if there is a default)
+    """
+    texts = [text for _, text in samples]
+    fitted = TokenEstimator.fit(texts, encoding, quantile)
+    result = {
+        "encoding": encoding.name,
+        "fitted": {"weights": list(fitted.weights), "intercept": fitted.intercept,
+                   "error": fitted.error, "slack": fitted.slack},
+        "fitted_report": error_report(fitted, samples, encoding),
+        "speedup": speedup(fitted, texts, encoding),
+    }
+    default = DEFAULT_ESTIMATORS.get(encoding.name)
+    if default is not None:
+        result["default_report"] = error_report(default, samples, encoding)
+    return result
+
+
+def format_report(name: str, report: dict[str, dict[str, float]]) -> str:
+    """Format an error report as a table."""
+    lines = [f"{name}",
+             f"  {'Category':<10} {'Samples':>8} {'Bias':>8} {'p50':>8} {'p90':>8} "
+             f"{'p99':>8} {'Max':>8} {'Outside':>8}"]
+    for category, stats in report.items():
+        lines.append(
+            f"  {category:<10} {stats['samples']:>8} {stats['bias']:>+8.1%} {stats['p50']:>8.1%} "
+            f"{stats['p90']:>8.1%} {stats['p99']:>8.1%} {stats['max']:>8.1%} "
+            f"{stats['outside_band']:>8.1%}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Calibrate estimators and print the reports."""
+    parser = argparse.ArgumentParser(description="Fit and measure token estimators.")
+    parser.add_argument("--encoding", action="append",
+                        help="Encoding to calibrate (repeatable, default: o200k_base and cl100k_base)")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of tables")
+    args = parser.parse_args(argv)
+
+    samples = corpus_samples()
+    results = [calibrate(tiktoken.get_encoding(name), samples)
+               for name in args.encoding or ["o200k_base", "cl100k_base"]]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for result in results:
+        print(f"=== {result['encoding']} ({len(samples)} samples) ===\n")
+        if "default_report" in result:
+            print(format_report("Default estimator", result["default_report"]) + "\n")
+        print(format_report("Fitted estimator", result["fitted_report"]) + "\n")
+        print(f"Estimating is {result['speedup']:.1f}x faster than encoding\n")
+
+    print("DEFAULT_ESTIMATORS = {")
+    for result in results:
+        fitted = result["fitted"]
+        weights = ", ".join(f"{w:.6f}" for w in fitted["weights"])
+        error = math.ceil(fitted["error"] * 10_000) / 10_000  # round the band up, never in
+        print(f'    "{result["encoding"]}": TokenEstimator(\n'
+              f'        weights=({weights}),\n'
+              f'        intercept={fitted["intercept"]:.6f}, error={error:.4f}, calibrated=True,\n'
+              f'    ),')
+    print("}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# Auto-Generated
+# File Name: corpus.py
+# Author: scotton
+# Creation Date: January-22-2026
+# Modified Date: January-22-2026
+
+"""Fixture corpus for calibrating estimators and benchmarking encodings.
+
+The files in fixtures/ cover the kinds of text the other projects send
+to models: English prose, Python code, CJK text (Chinese, Japanese and
+Korean) and text scraped from a web page.
+
+Based on week1/day4.ipynb
+"""
+
+from pathlib import Path
+
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+
+# Category -> fixture file
+CORPUS_FILES = {
+    "prose": "prose.txt",
+    "code": "code.txt",
+    "cjk": "cjk.txt",
+    "html": "html.txt",
+}
+
+
+def load_fixture_corpus() -> dict[str, str]:
+    """Return each corpus category mapped to its text."""
+    return {category: (FIXTURE_DIR / name).read_text(encoding="utf-8")
+            for category, name in CORPUS_FILES.items()}
+
+
+def corpus_samples(corpus: dict[str, str] | None = None,
+                   window_sizes: tuple[int, ...] = (64, 256, 1024)) -> list[tuple[str, str]]:
+    """Cut a corpus into samples of varied length.
+
+    Each category yields its paragraphs, half-overlapping windows of each
+    window size (in characters) and the whole text.
+
+    Args:
+        corpus: Category mapped to text (default: the fixture corpus)
+        window_sizes: Window lengths in characters (default: 64, 256, 1024)
+
+    Returns:
+        (category, text) pairs
+    """
+    corpus = corpus if corpus is not None else load_fixture_corpus()
+    samples = []
+    for category, text in corpus.items():
+        samples.extend((category, paragraph) for paragraph in text.split("\n\n") if paragraph.strip())
+        for size in window_sizes:
+            for start in range(0, max(1, len(text) - size + 1), size // 2):
+                samples.append((category, text[start:start + size]))
+        samples.append((category, text))
+    return samples
@@ -0,0 +1,235 @@
+# Auto-Generated
+# File Name: estimate_tokens.py
+# Author: scotton
+# Creation Date: January-22-2026
+# Modified Date: January-22-2026
+
+"""Fast approximate token counts for admission control and routing.
+
+Exact counts run the BPE tokenizer. When the only question is whether a
+text fits a budget, a linear model over a few character-class counts is
+usually enough:
+
+    tokens ~ intercept + sum(weight * feature)
+
+The features (see FEATURES) are each computed by a single C-level pass
+over the text's bytes, so an estimate costs a fraction of an encode and no
+token list is built. Every estimator carries its error band; with
+``exact_if_near_limit`` the exact tokenizer runs only when a budget falls
+inside that band, so results near the boundary are still exact.
+
+Weights are fitted per encoding against tiktoken with
+calibrate_estimator.py, which also reports the error distribution on
+the fixture corpus.
+
+Based on week1/day4.ipynb
+"""
+
+import string
+import threading
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+import tiktoken
+from tiktoken.model import encoding_name_for_model
+
+from tokens import get_encoding_for_model
+
+
+FEATURES = ("words", "letters", "digits", "punctuation", "non_ascii", "newlines")
+
+_DIGITS = string.digits.encode()
+_PUNCTUATION = string.punctuation.encode()
+_WHITESPACE = string.whitespace.encode()
+_NON_ASCII = bytes(range(0x80, 0x100))
+
+
+def text_features(text: str) -> tuple[int, ...]:
+    """Count the character classes of a text, in the order of FEATURES.
+
+    Works on the UTF-8 bytes, where deleting a class with bytes.translate
+    is a table lookup per byte.
+
+    Args:
+        text: The text to measure
+
+    Returns:
+        Whitespace-separated words, ASCII letters, ASCII digits, ASCII
+        punctuation, non-ASCII characters and newlines
+    """
+    data = text.encode("utf-8")
+    size = len(data)
+    ascii_chars = len(data.translate(None, _NON_ASCII))
+    digits = size - len(data.translate(None, _DIGITS))
+    punctuation = size - len(data.translate(None, _PUNCTUATION))
+    whitespace = size - len(data.translate(None, _WHITESPACE))
+    letters = ascii_chars - digits - punctuation - whitespace
+    return (len(data.split()), letters, digits, punctuation, len(text) - ascii_chars,
+            data.count(b"\n"))
+
+
+@dataclass(frozen=True)
+class TokenEstimator:
+    """Linear token-count model for one encoding.
+
+    An estimate ``e`` is trusted to be within ``error * e + slack`` of the
+    exact count, but only if the estimator is calibrated: fitted against
+    the encoding, with the band measured on the fitted samples.
+
+    Attributes:
+        weights: Tokens per unit of each feature, in the order of FEATURES
+        intercept: Tokens added to every non-empty text
+        error: Relative half-width of the error band
+        slack: Absolute half-width of the error band, in tokens
+        calibrated: Whether the band was measured against the encoding
+    """
+    weights: tuple[float, ...]
+    intercept: float = 0.0
+    error: float = 0.25
+    slack: float = 2.0
+    calibrated: bool = False
+
+    def estimate(self, text: str) -> int:
+        """Estimate the token count of a text."""
+        if not text:
+            return 0
+        value = self.intercept
+        for weight, feature in zip(self.weights, text_features(text)):
+            value += weight * feature
+        return max(1, round(value))
+
+    def margin(self, estimate: int) -> float:
+        """Return the half-width of the error band around an estimate."""
+        return self.error * estimate + self.slack
+
+    def near_limit(self, estimate: int, budget: int) -> bool:
+        """Return True if a budget falls inside an estimate's error band.
+
+        Always True for an uncalibrated estimator, whose band is a guess.
+        """
+        return not self.calibrated or abs(estimate - budget) <= self.margin(estimate)
+
+    @classmethod
+    def fit(cls, texts: Iterable[str], encoding: tiktoken.Encoding,
+            quantile: float = 0.99, slack: float = 2.0) -> "TokenEstimator":
+        """Fit an estimator against an encoding's exact counts.
+
+        Rows are scaled by the exact count, so the fit minimizes relative
+        rather than absolute error and short texts weigh as much as long
+        ones. The error band covers ``quantile`` of the texts.
+
+        Args:
+            texts: Sample texts (empty ones are ignored)
+            encoding: The encoding to fit against
+            quantile: Share of samples the error band must cover (default:
+                0.99; use 1.0 for estimators fits_budget will trust)
+            slack: Absolute half-width of the error band (default: 2 tokens)
+
+        Returns:
+            The fitted TokenEstimator
+
+        Raises:
+            ValueError: If there are fewer samples than parameters
+        """
+        texts = [text for text in texts if text]
+        if len(texts) <= len(FEATURES):
+            raise ValueError(f"Need more than {len(FEATURES)} non-empty samples, got {len(texts)}")
+        features = np.array([(1, *text_features(text)) for text in texts], dtype=np.float64)
+        exact = np.array([len(encoding.encode(text, disallowed_special=())) for text in texts],
+                         dtype=np.float64)
+        scale = 1 / np.maximum(exact, 1)
+        solution, *_ = np.linalg.lstsq(features * scale[:, None], exact * scale, rcond=None)
+
+        fitted = cls(tuple(float(w) for w in solution[1:]), float(solution[0]), 0.0, slack)
+        estimates = np.array([fitted.estimate(text) for text in texts], dtype=np.float64)
+        excess = np.maximum(np.abs(estimates - exact) - slack, 0) / np.maximum(estimates, 1)
+        return cls(fitted.weights, fitted.intercept, float(np.quantile(excess, quantile)), slack,
+                   calibrated=True)
+
+
+# Fitted with calibrate_estimator.py on the fixture corpus (308 samples);
+# the error bands cover every sample
+DEFAULT_ESTIMATORS = {
+    "o200k_base": TokenEstimator(
+        weights=(0.582436, 0.105523, 0.624147, 0.638003, 0.670867, 0.621298),
+        intercept=0.498853, error=0.2942, calibrated=True,
+    ),
+    "cl100k_base": TokenEstimator(
+        weights=(0.731092, 0.073222, 0.547737, 0.648918, 0.975358, 0.746008),
+        intercept=0.428059, error=0.2223, calibrated=True,
+    ),
+}
+
+# Model name -> estimator registered for it
+_estimators: dict[str, TokenEstimator] = {}
+_estimators_lock = threading.Lock()
+
+
+def register_estimator(model: str, estimator: TokenEstimator) -> None:
+    """Use a specific (e.g. freshly fitted) estimator for a model name."""
+    with _estimators_lock:
+        _estimators[model] = estimator
+
+
+def clear_estimators() -> None:
+    """Forget all registered estimators."""
+    with _estimators_lock:
+        _estimators.clear()
+
+
+def get_estimator(model: str = "gpt-4.1-mini") -> TokenEstimator:
+    """Return the estimator for a model.
+
+    Registered estimators come first, then the default for the model's
+    encoding; models tiktoken doesn't know use the o200k_base default.
+    Nothing is downloaded.
+    """
+    estimator = _estimators.get(model)
+    if estimator is not None:
+        return estimator
+    try:
+        encoding_name = encoding_name_for_model(model)
+    except KeyError:
+        encoding_name = "o200k_base"
+    return DEFAULT_ESTIMATORS.get(encoding_name, DEFAULT_ESTIMATORS["o200k_base"])
+
+
+def estimate_tokens(text: str, model: str = "gpt-4.1-mini", budget: int | None = None,
+                    exact_if_near_limit: bool = False) -> int:
+    """Estimate the token count of a text without encoding it.
+
+    Args:
+        text: The text to measure
+        model: The model name (default: gpt-4.1-mini)
+        budget: Token budget the caller will compare the count against
+        exact_if_near_limit: Count exactly when the budget falls inside the
+            estimate's error band (default: False)
+
+    Returns:
+        The estimated token count, or the exact count near the budget
+    """
+    estimator = get_estimator(model)
+    estimate = estimator.estimate(text)
+    if exact_if_near_limit and budget is not None and estimator.near_limit(estimate, budget):
+        return len(get_encoding_for_model(model).encode(text, disallowed_special=()))
+    return estimate
+
+
+def fits_budget(text: str, budget: int, model: str = "gpt-4.1-mini",
+                exact_if_near_limit: bool = True) -> bool:
+    """Return True if a text fits a token budget.
+
+    Far from the budget the estimate decides; near it, the exact count
+    does (unless exact_if_near_limit is False).
+
+    Args:
+        text: The text to measure
+        budget: Maximum number of tokens
+        model: The model name (default: gpt-4.1-mini)
+        exact_if_near_limit: Count exactly near the budget (default: True)
+
+    Returns:
+        True if the text's token count is at most the budget
+    """
+    return estimate_tokens(text, model, budget, exact_if_near_limit) <= budget
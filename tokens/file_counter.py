@@ -0,0 +1,270 @@
+# Auto-Generated
+# File Name: file_counter.py
+# Author: scotton
+# Creation Date: January-22-2026
+# Modified Date: January-22-2026
+
+"""Streaming token counts for very large files and directories.
+
+Files are memory-mapped and encoded in chunks of about ``chunk_size``
+bytes, so memory stays bounded whatever the file size. Chunks are split
+only where tiktoken's pre-tokenizer always breaks: after a newline or
+at a single space, between a non-whitespace character and a letter or
+digit. Tokens never span such a point, so the sum of the chunk counts
+equals the count of the whole file. A line with no such point longer
+than ``max_chunk`` bytes is cut anyway, and the file's count is marked
+approximate.
+
+Directories are walked recursively (hidden directories are skipped), and
+a process pool counts several files at once; results stream out as each
+file finishes.
+
+Based on week1/day4.ipynb
+"""
+
+import mmap
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from tokens import get_encoding_for_model
+
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # 1 MiB
+BINARY_SNIFF_BYTES = 8192
+
+
+@dataclass
+class FileCount:
+    """Token count of one file.
+
+    Attributes:
+        path: The file path
+        tokens: Number of tokens
+        bytes: File size in bytes
+        exact: False if a chunk had to be cut at an unsafe point
+        error: Why the file was skipped (unreadable or binary), if it was
+    """
+    path: str
+    tokens: int = 0
+    bytes: int = 0
+    exact: bool = True
+    error: str | None = None
+
+    @property
+    def extension(self) -> str:
+        """Lower-cased file extension, or "(none)"."""
+        return Path(self.path).suffix.lower() or "(none)"
+
+
+@dataclass
+class CountSummary:
+    """Running totals over many FileCounts.
+
+    Attributes:
+        files: Files counted
+        tokens: Total tokens
+        bytes: Total bytes of the counted files
+        skipped: Files skipped (unreadable or binary)
+        by_extension: Extension mapped to [files, tokens, bytes]
+    """
+    files: int = 0
+    tokens: int = 0
+    bytes: int = 0
+    skipped: int = 0
+    by_extension: dict[str, list[int]] = field(default_factory=dict)
+
+    def add(self, result: FileCount) -> None:
+        """Add one file's count to the totals."""
+        if result.error is not None:
+            self.skipped += 1
+            return
+        self.files += 1
+        self.tokens += result.tokens
+        self.bytes += result.bytes
+        totals = self.by_extension.setdefault(result.extension, [0, 0, 0])
+        totals[0] += 1
+        totals[1] += result.tokens
+        totals[2] += result.bytes
+
+    def format_report(self) -> str:
+        """Format per-extension and total counts as a table, most tokens first."""
+        lines = [f"{'Extension':<12} {'Files':>8} {'Tokens':>16} {'Bytes':>16}"]
+        for extension, (files, tokens, size) in sorted(
+            self.by_extension.items(), key=lambda item: -item[1][1]
+        ):
+            lines.append(f"{extension:<12} {files:>8,} {tokens:>16,} {size:>16,}")
+        lines.append(f"{'Total':<12} {self.files:>8,} {self.tokens:>16,} {self.bytes:>16,}")
+        if self.skipped:
+            lines.append(f"Skipped {self.skipped:,} unreadable or binary files")
+        return "\n".join(lines)
+
+
+def _char_before(data, index: int) -> str:
+    """Return the character ending just before a byte index."""
+    start = index - 1
+    while start > 0 and index - start < 4 and 0x80 <= data[start] < 0xC0:
+        start -= 1
+    return data[start:index].decode("utf-8", errors="replace")
+
+
+def _char_at(data, index: int) -> str:
+    """Return the character starting at a byte index."""
+    lead = data[index]
+    length = 1 if lead < 0xC0 else 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+    return data[index:index + length].decode("utf-8", errors="replace")
+
+
+def _last_safe_split(data, separator: bytes, low: int, high: int) -> int | None:
+    """Return the last safe split at a separator in data[low:high], if any."""
+    position = high
+    while True:
+        position = data.rfind(separator, low, position)
+        if position < 0:
+            return None
+        split = position + 1 if separator == b"\n" else position
+        if position + 1 < len(data) and not _char_before(data, position).isspace() \
+                and _char_at(data, position + 1).isalnum():
+            return split
+
+
+def _char_boundary(data, index: int) -> int:
+    """Move a byte index back to the start of the UTF-8 character containing it."""
+    while index > 0 and 0x80 <= data[index] < 0xC0:
+        index -= 1
+    return index
+
+
+def iter_chunk_bounds(data, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      max_chunk: int | None = None) -> Iterator[tuple[int, int, bool]]:
+    """Split a buffer into chunks whose token counts add up to the whole.
+
+    Args:
+        data: Bytes-like buffer supporting rfind (bytes or mmap)
+        chunk_size: Target chunk size in bytes (default: 1 MiB)
+        max_chunk: Largest chunk before an unsafe cut (default: 4 x chunk_size)
+
+    Yields:
+        (start, end, exact) byte ranges covering the buffer; exact is False
+        when the range had to end at an unsafe point
+    """
+    max_chunk = max_chunk or 4 * chunk_size
+    size = len(data)
+    start = 0
+    while start < size:
+        if size - start <= chunk_size:
+            yield start, size, True
+            return
+        target = start + chunk_size
+        limit = min(size, start + max_chunk)
+        split = None
+        for low, high in ((start + 1, target), (target, limit)):
+            for separator in (b"\n", b" "):
+                split = _last_safe_split(data, separator, low, high)
+                if split is not None:
+                    break
+            if split is not None:
+                break
+        exact = split is not None
+        if split is None:
+            split = limit if limit == size else max(start + 1, _char_boundary(data, limit))
+            exact = limit == size
+        yield start, split, exact
+        start = split
+
+
+def count_file_tokens(path: str | Path, model: str = "gpt-4.1-mini",
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> FileCount:
+    """Count the tokens of a file without loading it whole.
+
+    The file is decoded as UTF-8 (invalid bytes are replaced) and encoded
+    without special tokens, as ordinary text.
+
+    Args:
+        path: The file to count
+        model: The model name to use for encoding (default: gpt-4.1-mini)
+        chunk_size: Bytes encoded at a time (default: 1 MiB)
+
+    Returns:
+        The file's FileCount; unreadable and binary files get an error
+    """
+    path = Path(path)
+    try:
+        size = path.stat().st_size
+        if size == 0:
+            return FileCount(str(path))
+        encoding = get_encoding_for_model(model)
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if b"\0" in data[:BINARY_SNIFF_BYTES]:
+                return FileCount(str(path), bytes=size, error="binary file")
+            result = FileCount(str(path), bytes=size)
+            for start, end, exact in iter_chunk_bounds(data, chunk_size):
+                text = data[start:end].decode("utf-8", errors="replace")
+                result.tokens += len(encoding.encode_ordinary(text))
+                result.exact = result.exact and exact
+            return result
+    except OSError as e:
+        return FileCount(str(path), error=f"{type(e).__name__}: {e}")
+
+
+def iter_files(paths: Iterable[str | Path], extensions: Iterable[str] | None = None) -> Iterator[Path]:
+    """Yield the files under the given files and directories.
+
+    Args:
+        paths: Files and directories; directories are walked recursively,
+            skipping hidden directories (.git, .venv, ...)
+        extensions: Only yield files with these extensions (e.g. [".py", ".md"])
+    """
+    wanted = {ext.lower() if ext.startswith(".") else f".{ext.lower()}"
+              for ext in extensions} if extensions else None
+    for path in map(Path, paths):
+        if path.is_dir():
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(name for name in dirs if not name.startswith("."))
+                for name in sorted(files):
+                    file = Path(root, name)
+                    if wanted is None or file.suffix.lower() in wanted:
+                        yield file
+        elif wanted is None or path.suffix.lower() in wanted:
+            yield path
+
+
+def count_paths(
+    paths: Iterable[str | Path],
+    model: str = "gpt-4.1-mini",
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    extensions: Iterable[str] | None = None
+) -> Iterator[FileCount]:
+    """Count the tokens of every file under the given paths.
+
+    Args:
+        paths: Files and directories to count
+        model: The model name to use for encoding (default: gpt-4.1-mini)
+        workers: Processes counting files at once; 1 counts in this
+            process (default: CPU count)
+        chunk_size: Bytes encoded at a time per file (default: 1 MiB)
+        extensions: Only count files with these extensions
+
+    Yields:
+        FileCount: One per file, in completion order
+    """
+    files = iter_files(paths, extensions)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for file in files:
+            yield count_file_tokens(file, model, chunk_size)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for file in files:
+            pending.add(pool.submit(count_file_tokens, file, model, chunk_size))
+            if len(pending) >= 2 * workers:  # bounded queue, even for millions of files
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in as_completed(pending):
+            yield future.result()
@@ -1,6 +1,86 @@
-def main():
-    print("Hello from tokens!")
+"""Command line interface for the tokens package.
+
+Usage:
+    uv run python main.py count corpus/ notes.md --ext .md --ext .txt
+    uv run python main.py count corpus/ --json > counts.jsonl
+    uv run python main.py breakdown "Hi! My name is Steven" --format table
+"""
+
+import argparse
+import json
+import sys
+
+from file_counter import DEFAULT_CHUNK_SIZE, CountSummary, count_paths
+from tokens import print_tokens_breakdown
+
+
+def count_command(args: argparse.Namespace) -> int:
+    """Stream per-file counts with running per-extension totals, then the totals.
+
+    Each counted file is followed by its extension's totals so far; with
+    --json these are "extension" lines, and the last one for an extension
+    holds its final totals.
+    """
+    summary = CountSummary()
+    for result in count_paths(args.paths, args.model, args.workers, args.chunk_size, args.ext):
+        summary.add(result)
+        if result.error is not None:
+            if args.json:
+                print(json.dumps({"type": "file", **vars(result)}), flush=True)
+            else:
+                print(f"{'skipped':>14}  {result.path} ({result.error})", flush=True)
+            continue
+        files, tokens, size = summary.by_extension[result.extension]
+        if args.json:
+            print(json.dumps({"type": "file", **vars(result)}))
+            print(json.dumps({"type": "extension", "extension": result.extension, "files": files,
+                              "tokens": tokens, "bytes": size}), flush=True)
+        else:
+            marker = "" if result.exact else " (approximate)"
+            noun = "file" if files == 1 else "files"
+            print(f"{result.tokens:>14,}  {result.path}{marker}  "
+                  f"[{result.extension}: {tokens:,} tokens in {files:,} {noun}]", flush=True)
+
+    if args.json:
+        print(json.dumps({"type": "total", "files": summary.files, "tokens": summary.tokens,
+                          "bytes": summary.bytes, "skipped": summary.skipped}))
+    else:
+        print()
+        print(summary.format_report())
+    return 0
+
+
+def breakdown_command(args: argparse.Namespace) -> int:
+    """Print how a text is tokenized."""
+    print_tokens_breakdown(args.text, args.model, args.format)
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Parse the command line and run a subcommand."""
+    parser = argparse.ArgumentParser(prog="tokens", description="Token counting tools.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    count = subcommands.add_parser("count", help="Count tokens in files and directories")
+    count.add_argument("paths", nargs="+", help="Files and directories to count")
+    count.add_argument("--model", default="gpt-4.1-mini")
+    count.add_argument("--workers", type=int, default=None,
+                       help="Processes counting files at once (default: CPU count)")
+    count.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                       help="Bytes encoded at a time per file (default: 1 MiB)")
+    count.add_argument("--ext", action="append", help="Only count this extension (repeatable)")
+    count.add_argument("--json", action="store_true", help="Print JSON lines instead of a table")
+    count.set_defaults(handler=count_command)
+
+    breakdown = subcommands.add_parser("breakdown", help="Show how a text is tokenized")
+    breakdown.add_argument("text")
+    breakdown.add_argument("--model", default="gpt-4.1-mini")
+    breakdown.add_argument("--format", choices=["text", "table", "json", "csv"], default="text")
+    breakdown.set_defaults(handler=breakdown_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,340 @@
+# Auto-Generated
+# File Name: message_tokens.py
+# Author: scotton
+# Creation Date: January-22-2026
+# Modified Date: January-22-2026
+
+"""Chat-message token accounting and pre-flight cost estimates.
+
+Counts the prompt tokens of a ``messages`` list before it is sent, as
+built by ``Agent.messages_for``, ``prompt_generator.build_messages`` or
+the conversations in memory_illusion.py. Besides the text of every
+field, each chat format adds a fixed overhead per message, per ``name``
+field and for priming the reply; see CHAT_FORMATS.
+
+Token counts of message fields are cached by a hash of their text, so a
+system prompt repeated across thousands of requests is encoded once.
+ConversationTokenCounter keeps a running count for a conversation that
+grows turn by turn, so the history is never recounted.
+
+Based on week1/day4.ipynb
+"""
+
+import hashlib
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from tokens import get_encoding_for_model
+
+
+@dataclass(frozen=True)
+class ChatFormat:
+    """Tokens a chat format adds around message text.
+
+    Attributes:
+        tokens_per_message: Added for every message (role markers, separators)
+        tokens_per_name: Added when a message has a ``name`` field
+        reply_priming: Added once, for the start of the assistant's reply
+    """
+    tokens_per_message: int = 3
+    tokens_per_name: int = 1
+    reply_priming: int = 3
+
+
+# Model (or model prefix) mapped to its chat format; others use ChatFormat()
+CHAT_FORMATS = {
+    "gpt-3.5-turbo-0301": ChatFormat(tokens_per_message=4, tokens_per_name=-1),
+}
+
+# Model (or model prefix) mapped to (input, output) USD per 1M tokens
+MODEL_PRICES = {
+    "gpt-5-nano": (0.05, 0.40),
+    "gpt-5-mini": (0.25, 2.00),
+    "gpt-5": (1.25, 10.00),
+    "gpt-4.1-nano": (0.10, 0.40),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+
+
+def _lookup(table: dict, model: str):
+    """Return the entry for a model, or for the longest prefix of it (dated snapshots)."""
+    if model in table:
+        return table[model]
+    prefixes = [name for name in table if model.startswith(name + "-")]
+    return table[max(prefixes, key=len)] if prefixes else None
+
+
+def chat_format(model: str) -> ChatFormat:
+    """Return the chat format of a model."""
+    return _lookup(CHAT_FORMATS, model) or ChatFormat()
+
+
+class TokenCountCache:
+    """Thread-safe LRU cache of token counts, keyed by encoding and text hash.
+
+    Attributes:
+        max_entries (int): Counts kept before the least recently used are dropped
+        hits (int): Lookups answered from the cache
+        misses (int): Lookups that had to encode
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._counts: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count(self, text: str, model: str = "gpt-4.1-mini") -> int:
+        """Return the token count of a text, encoding it only on a cache miss."""
+        encoding = get_encoding_for_model(model)
+        key = (encoding.name, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+                self.hits += 1
+                return count
+            self.misses += 1
+        count = len(encoding.encode(text, disallowed_special=()))
+        with self._lock:
+            self._counts[key] = count
+            if len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+        return count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+            self.hits = self.misses = 0
+
+
+_default_cache = TokenCountCache()
+
+
+def _content_text(content) -> str:
+    """Return the text of a message's content: a string or a list of parts."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        # Only text parts are counted; images and audio are priced separately
+        return "".join(part.get("text", "") for part in content
+                       if isinstance(part, dict) and part.get("type") == "text")
+    return ""
+
+
+def _message_tokens(message: dict, model: str, form: ChatFormat, cache: TokenCountCache) -> int:
+    """Count one message's tokens, including its per-message overhead."""
+    total = form.tokens_per_message
+    for key, value in message.items():
+        if key == "content":
+            value = _content_text(value)
+        if not isinstance(value, str):
+            continue
+        total += cache.count(value, model)
+        if key == "name":
+            total += form.tokens_per_name
+    return total
+
+
+def count_message_tokens(messages: list[dict], model: str = "gpt-4.1-mini",
+                         cache: TokenCountCache | None = None) -> int:
+    """Count the prompt tokens of a chat messages list.
+
+    Args:
+        messages: Message dicts with "role", "content" and optionally "name"
+            (content may be a string or a list of content parts)
+        model: The model name to use for encoding (default: gpt-4.1-mini)
+        cache: Token count cache (default: a shared module-level cache)
+
+    Returns:
+        The number of prompt tokens, including chat format overhead
+    """
+    cache = cache or _default_cache
+    form = chat_format(model)
+    return form.reply_priming + sum(_message_tokens(message, model, form, cache)
+                                    for message in messages)
+
+
+class ConversationTokenCounter:
+    """Running prompt token count of a growing conversation.
+
+    Each message is counted once, when it is appended, and prefix sums
+    of the counts are kept, so that after every turn the size of the
+    whole history, and of the history without its oldest messages, is
+    known without recounting anything. Leading system (or developer)
+    messages are pinned: they are never dropped.
+
+    Costs, for a conversation of n messages:
+    - append: O(length of the message)
+    - total, tokens_without_oldest: O(1)
+    - drop_oldest: amortized O(1); oldest_to_drop: O(log n)
+
+    Attributes:
+        model (str): The model whose encoding and chat format are used
+    """
+
+    PINNED_ROLES = ("system", "developer")
+
+    def __init__(self, model: str = "gpt-4.1-mini", messages: list[dict] | None = None,
+                 cache: TokenCountCache | None = None, pin_system: bool = True):
+        """Initialize the counter.
+
+        Args:
+            model: The model name to use for encoding (default: gpt-4.1-mini)
+            messages: Messages already in the conversation
+            cache: Token count cache (default: a shared module-level cache)
+            pin_system: Keep leading system/developer messages when dropping
+                (default: True)
+        """
+        self.model = model
+        self._form = chat_format(model)
+        self._cache = cache or _default_cache
+        self._pin_system = pin_system
+        self._pinned: list[dict] = []
+        self._pinned_tokens = 0
+        self._seen_unpinned = False  # Nothing after the first unpinned message is pinned
+        self._messages: list[dict] = []
+        self._prefix = [0]  # _prefix[i]: tokens of _messages[:i]
+        self._start = 0     # _messages[:_start] have been dropped
+        self.extend(messages or [])
+
+    def __len__(self) -> int:
+        """Number of messages, pinned ones included."""
+        return len(self._pinned) + len(self._messages) - self._start
+
+    @property
+    def messages(self) -> list[dict]:
+        """The conversation to send: pinned messages, then the rest."""
+        return self._pinned + self._messages[self._start:]
+
+    @property
+    def droppable(self) -> int:
+        """Number of messages that can be dropped (the unpinned ones)."""
+        return len(self._messages) - self._start
+
+    def append(self, message: dict) -> int:
+        """Add a message and return its tokens (with per-message overhead)."""
+        tokens = _message_tokens(message, self.model, self._form, self._cache)
+        if (self._pin_system and not self._seen_unpinned
+                and message.get("role") in self.PINNED_ROLES):
+            self._pinned.append(message)
+            self._pinned_tokens += tokens
+        else:
+            self._seen_unpinned = True
+            self._messages.append(message)
+            self._prefix.append(self._prefix[-1] + tokens)
+        return tokens
+
+    def extend(self, messages: list[dict]) -> None:
+        """Add several messages, in order."""
+        for message in messages:
+            self.append(message)
+
+    @property
+    def total(self) -> int:
+        """Prompt tokens of the whole conversation, as count_message_tokens counts them."""
+        return (self._form.reply_priming + self._pinned_tokens
+                + self._prefix[-1] - self._prefix[self._start])
+
+    def _check(self, k: int) -> None:
+        if not 0 <= k <= self.droppable:
+            raise ValueError(f"k must be in [0, {self.droppable}], got {k}")
+
+    def tokens_without_oldest(self, k: int) -> int:
+        """Prompt tokens if the oldest k unpinned messages were dropped.
+
+        Raises:
+            ValueError: If k is negative or more than the droppable messages
+        """
+        self._check(k)
+        return self.total - (self._prefix[self._start + k] - self._prefix[self._start])
+
+    def oldest_to_drop(self, budget: int) -> int:
+        """Return the fewest oldest messages to drop to fit a token budget.
+
+        Raises:
+            ValueError: If the budget can't be met even by dropping every
+                unpinned message
+        """
+        excess = self.total - budget
+        if excess <= 0:
+            return 0
+        if excess > self._prefix[-1] - self._prefix[self._start]:
+            raise ValueError(f"Pinned messages alone exceed the budget of {budget} tokens")
+        target = self._prefix[self._start] + excess
+        return bisect_left(self._prefix, target, lo=self._start) - self._start
+
+    def drop_oldest(self, k: int) -> list[dict]:
+        """Drop the oldest k unpinned messages and return them.
+
+        Raises:
+            ValueError: If k is negative or more than the droppable messages
+        """
+        self._check(k)
+        dropped = self._messages[self._start:self._start + k]
+        self._start += k
+        if self._start > len(self._messages) // 2:
+            # Compact once half the list is dropped, keeping drops amortized O(1)
+            base = self._prefix[self._start]
+            self._messages = self._messages[self._start:]
+            self._prefix = [tokens - base for tokens in self._prefix[self._start:]]
+            self._start = 0
+        return dropped
+
+
+@dataclass
+class CostEstimate:
+    """Estimated cost of one request.
+
+    Attributes:
+        model: The model priced
+        prompt_tokens: Tokens sent
+        output_tokens: Tokens expected back
+        input_cost: USD for the prompt tokens
+        output_cost: USD for the output tokens
+    """
+    model: str
+    prompt_tokens: int
+    output_tokens: int
+    input_cost: float
+    output_cost: float
+
+    @property
+    def total_cost(self) -> float:
+        return self.input_cost + self.output_cost
+
+
+def estimate_cost(messages: list[dict], model: str = "gpt-4.1-mini",
+                  max_output_tokens: int = 0, cache: TokenCountCache | None = None) -> CostEstimate:
+    """Estimate the cost of sending a messages list, before calling the API.
+
+    Args:
+        messages: The messages to send
+        model: The model to price (default: gpt-4.1-mini)
+        max_output_tokens: Output tokens to budget for (default: 0)
+        cache: Token count cache (default: a shared module-level cache)
+
+    Returns:
+        The CostEstimate
+
+    Raises:
+        ValueError: If the model has no price in MODEL_PRICES
+    """
+    prices = _lookup(MODEL_PRICES, model)
+    if prices is None:
+        raise ValueError(f"No price known for model {model!r}")
+    prompt_tokens = count_message_tokens(messages, model, cache)
+    input_price, output_price = prices
+    return CostEstimate(
+        model=model,
+        prompt_tokens=prompt_tokens,
+        output_tokens=max_output_tokens,
+        input_cost=prompt_tokens * input_price / 1_000_000,
+        output_cost=max_output_tokens * output_price / 1_000_000,
+    )
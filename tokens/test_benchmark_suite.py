@@ -0,0 +1,85 @@
+"""Unit tests for benchmark_suite.py module.
+
+Tests workloads, measurements and baseline comparison on a tiny corpus,
+with a local encoding (no downloads required).
+"""
+
+import io
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import replace
+from pathlib import Path
+from unittest.mock import patch
+
+from benchmark_suite import (
+    MODES, benchmark_encodings, build_workload, compare_results, main, run_suite, suite_report,
+)
+from test_tokens import make_test_encoding
+
+
+CORPUS = {"prose": "Hello world.\n\nTokens are not words.", "cjk": "你好，世界。"}
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Test the throughput suite."""
+
+    def setUp(self):
+        self.encoding = make_test_encoding()
+
+    def run_small_suite(self):
+        return run_suite([self.encoding], CORPUS, target_bytes=2_000, threads=2, repeats=1)
+
+    def test_workload_reaches_target_size(self):
+        """Test paragraphs are repeated until the workload holds target_bytes."""
+        documents = build_workload(CORPUS["prose"], 1_000)
+        self.assertGreaterEqual(sum(len(d.encode("utf-8")) for d in documents), 1_000)
+        self.assertEqual(documents[:2], ["Hello world.", "Tokens are not words."])
+
+    def test_every_category_operation_and_mode_is_measured(self):
+        """Test one measurement per category, operation and mode with consistent rates."""
+        results = self.run_small_suite()
+        self.assertEqual(len(results), len(CORPUS) * 2 * len(MODES))
+        for result in results:
+            self.assertEqual(result.encoding, "test_bytes")
+            self.assertAlmostEqual(result.mb_per_s, result.bytes / result.seconds / 1e6)
+            self.assertAlmostEqual(result.tokens_per_s, result.tokens / result.seconds)
+            self.assertEqual(result.threads, 1 if result.mode == "single" else 2)
+        self.assertEqual(len({result.key for result in results}), len(results))
+
+    def test_compare_flags_only_drops_beyond_tolerance(self):
+        """Test regressions are slower than the baseline by more than the tolerance."""
+        results = self.run_small_suite()
+        baseline = json.loads(json.dumps(suite_report(results)))
+        self.assertEqual(compare_results(baseline, results), [])
+        slower = [replace(results[0], mb_per_s=results[0].mb_per_s * 0.95),
+                  replace(results[1], mb_per_s=results[1].mb_per_s * 0.5)]
+        regressions = compare_results(baseline, slower, tolerance=0.1)
+        self.assertEqual([key for key, _, _ in regressions], [results[1].key])
+
+    def test_cli_writes_report_and_fails_on_regression(self):
+        """Test --output saves a JSON report and --compare exits 1 on a regression."""
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch("benchmark_suite.tiktoken.get_encoding", return_value=self.encoding), \
+                patch("benchmark_suite.load_fixture_corpus", return_value=CORPUS):
+            path = Path(tmp, "baseline.json")
+            args = ["--encoding", "test_bytes", "--target-bytes", "500", "--repeats", "1"]
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(main(args + ["--output", str(path)]), 0)
+            report = json.loads(path.read_text(encoding="utf-8"))
+            self.assertIn("tiktoken", report)
+            for entry in report["results"]:
+                entry["mb_per_s"] *= 1000
+            path.write_text(json.dumps(report), encoding="utf-8")
+            with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()) as errors:
+                self.assertEqual(main(args + ["--compare", str(path)]), 1)
+            self.assertIn("REGRESSION", errors.getvalue())
+
+    def test_benchmark_encodings_are_distinct(self):
+        """Test the default models map to each encoding once."""
+        self.assertEqual(benchmark_encodings(), ["o200k_base", "cl100k_base"])
+
+
+if __name__ == "__main__":
+    unittest.main()
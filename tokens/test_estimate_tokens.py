@@ -0,0 +1,115 @@
+"""Unit tests for estimate_tokens.py and calibrate_estimator.py modules.
+
+Tests character-class features, fitting, budget checks with exact
+fallback and the calibration report, with a local encoding (no downloads
+required).
+"""
+
+import unittest
+from unittest.mock import patch
+
+from calibrate_estimator import calibrate, error_report
+from corpus import corpus_samples, load_fixture_corpus
+from estimate_tokens import (
+    DEFAULT_ESTIMATORS, TokenEstimator, clear_estimators, estimate_tokens, fits_budget,
+    get_estimator, register_estimator, text_features,
+)
+from test_tokens import make_test_encoding
+from tokens import clear_encoding_cache, register_encoding
+
+
+class TestTextFeatures(unittest.TestCase):
+    """Test character-class counts."""
+
+    def test_counts_each_class(self):
+        """Test words, letters, digits, punctuation, non-ASCII and newlines."""
+        self.assertEqual(text_features("Hi, it's 2026!\nCafé 世界"), (5, 8, 4, 3, 3, 1))
+
+    def test_empty_text(self):
+        """Test empty text has no features and estimates to zero."""
+        self.assertEqual(text_features(""), (0, 0, 0, 0, 0, 0))
+        self.assertEqual(DEFAULT_ESTIMATORS["o200k_base"].estimate(""), 0)
+
+
+class TestEstimator(unittest.TestCase):
+    """Test fitting estimators and budget checks."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.encoding = make_test_encoding()
+        cls.samples = corpus_samples()
+        cls.estimator = TokenEstimator.fit([text for _, text in cls.samples], cls.encoding)
+
+    def setUp(self):
+        clear_encoding_cache()
+        clear_estimators()
+        register_encoding("gpt-4.1-mini", self.encoding)
+        register_estimator("gpt-4.1-mini", self.estimator)
+
+    def tearDown(self):
+        clear_encoding_cache()
+        clear_estimators()
+
+    def exact(self, text):
+        return len(self.encoding.encode(text))
+
+    def test_fit_tracks_exact_counts(self):
+        """Test the fitted estimator is close on whole texts and covers its error band."""
+        for text in load_fixture_corpus().values():
+            self.assertLess(abs(self.estimator.estimate(text) - self.exact(text)),
+                            0.1 * self.exact(text))
+        report = error_report(self.estimator, self.samples, self.encoding)
+        self.assertLessEqual(report["all"]["outside_band"], 0.02)
+
+    def test_fit_needs_enough_samples(self):
+        """Test fitting with fewer samples than parameters is rejected."""
+        with self.assertRaises(ValueError):
+            TokenEstimator.fit(["a", "b", ""], self.encoding)
+
+    def test_exact_count_only_near_limit(self):
+        """Test tiktoken runs only when the budget is inside the error band."""
+        text = load_fixture_corpus()["prose"]
+        estimate = self.estimator.estimate(text)
+        exact = self.exact(text)
+        with patch.object(self.encoding, "encode", wraps=self.encoding.encode) as encode:
+            self.assertEqual(estimate_tokens(text, budget=10 * estimate, exact_if_near_limit=True),
+                             estimate)
+            encode.assert_not_called()
+            self.assertEqual(estimate_tokens(text, budget=estimate, exact_if_near_limit=True), exact)
+            encode.assert_called_once()
+
+    def test_uncalibrated_estimator_always_counts_exactly(self):
+        """Test a hand-made estimator's band is not trusted, even far from the budget."""
+        guess = TokenEstimator(weights=self.estimator.weights, intercept=self.estimator.intercept)
+        self.assertFalse(guess.calibrated)
+        self.assertTrue(self.estimator.calibrated)
+        register_estimator("gpt-4.1-mini", guess)
+        text = load_fixture_corpus()["prose"]
+        with patch.object(self.encoding, "encode", wraps=self.encoding.encode) as encode:
+            self.assertTrue(fits_budget(text, 10 * guess.estimate(text)))
+            encode.assert_called_once()
+
+    def test_fits_budget_is_exact_at_the_boundary(self):
+        """Test budget checks agree with exact counts right at the limit."""
+        for _, text in self.samples[::7]:
+            exact = self.exact(text)
+            self.assertTrue(fits_budget(text, exact))
+            self.assertFalse(fits_budget(text, exact - 1))
+
+    def test_estimator_lookup(self):
+        """Test registered estimators win, then defaults by encoding."""
+        self.assertIs(get_estimator("gpt-4.1-mini"), self.estimator)
+        self.assertIs(get_estimator("gpt-4o-2024-08-06"), DEFAULT_ESTIMATORS["o200k_base"])
+        self.assertIs(get_estimator("gpt-3.5-turbo"), DEFAULT_ESTIMATORS["cl100k_base"])
+        self.assertIs(get_estimator("unknown-model"), DEFAULT_ESTIMATORS["o200k_base"])
+
+    def test_calibrate_reports_default_and_fitted(self):
+        """Test calibration returns fitted parameters and per-category reports."""
+        result = calibrate(self.encoding, self.samples)
+        self.assertEqual(len(result["fitted"]["weights"]), 6)
+        self.assertEqual(set(result["fitted_report"]), {"prose", "code", "cjk", "html", "all"})
+        self.assertNotIn("default_report", result)  # no default for the test encoding
+
+
+if __name__ == "__main__":
+    unittest.main()
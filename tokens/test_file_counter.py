@@ -0,0 +1,170 @@
+"""Unit tests for file_counter.py module.
+
+Tests chunked file counting, directory walking and the count CLI,
+with a local encoding (no downloads required).
+"""
+
+import io
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from file_counter import CountSummary, count_file_tokens, count_paths, iter_chunk_bounds, iter_files
+from main import main
+from test_tokens import make_test_encoding
+from tokens import clear_encoding_cache, register_encoding
+
+
+SAMPLE = (
+    "Hello world, this is a line.\n"
+    "  Indented code(x) = 42; // comment\r\n"
+    "Ünïcödé and 世界 text\n\n\n"
+    "trailing spaces   \n"
+    "numbers 1234567 and it's done.\n"
+)
+
+
+class TestChunking(unittest.TestCase):
+    """Test chunk boundaries keep counts exact."""
+
+    def setUp(self):
+        self.encoding = make_test_encoding()
+
+    def count_chunked(self, data, chunk_size, max_chunk=None):
+        bounds = list(iter_chunk_bounds(data, chunk_size, max_chunk))
+        total = sum(len(self.encoding.encode_ordinary(data[start:end].decode("utf-8")))
+                    for start, end, _ in bounds)
+        return bounds, total
+
+    def test_chunks_cover_buffer_and_match_whole_count(self):
+        """Test chunked counts equal the whole-text count at any chunk size."""
+        data = (SAMPLE * 20).encode("utf-8")
+        whole = len(self.encoding.encode_ordinary(data.decode("utf-8")))
+        for chunk_size in (16, 40, 100, 1000):
+            bounds, total = self.count_chunked(data, chunk_size)
+            self.assertEqual(bounds[0][0], 0)
+            self.assertEqual(bounds[-1][1], len(data))
+            for (_, end, _), (start, _, _) in zip(bounds, bounds[1:]):
+                self.assertEqual(end, start)
+            self.assertTrue(all(exact for _, _, exact in bounds))
+            self.assertEqual(total, whole, chunk_size)
+
+    def test_line_without_safe_split_is_cut_and_flagged(self):
+        """Test a long unbroken line is cut at max_chunk on a character boundary."""
+        data = ("世" * 100).encode("utf-8")
+        bounds, _ = self.count_chunked(data, 20, 40)
+        self.assertFalse(all(exact for _, _, exact in bounds))
+        self.assertTrue(all(end - start <= 40 for start, end, _ in bounds))
+
+
+class TestFileCounting(unittest.TestCase):
+    """Test counting files and directories."""
+
+    def setUp(self):
+        clear_encoding_cache()
+        register_encoding("gpt-4.1-mini", make_test_encoding())
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        clear_encoding_cache()
+
+    def write(self, name, content):
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            path.write_text(content, encoding="utf-8")
+        return path
+
+    def test_file_count_matches_whole_file(self):
+        """Test a file counted in small chunks matches encoding it whole."""
+        text = SAMPLE * 50
+        path = self.write("big.txt", text)
+        result = count_file_tokens(path, chunk_size=64)
+        self.assertTrue(result.exact)
+        self.assertEqual(result.bytes, len(text.encode("utf-8")))
+        self.assertEqual(result.tokens, len(make_test_encoding().encode_ordinary(text)))
+
+    def test_special_tokens_count_as_text(self):
+        """Test files containing special-token text are counted, not rejected."""
+        path = self.write("eot.txt", "before <|endoftext|> after")
+        self.assertGreater(count_file_tokens(path).tokens, 1)
+
+    def test_empty_binary_and_missing_files(self):
+        """Test empty files count zero and unreadable or binary files are skipped."""
+        self.assertEqual(count_file_tokens(self.write("empty.txt", "")).tokens, 0)
+        self.assertEqual(count_file_tokens(self.write("image.png", b"\x89PNG\0\0data")).error,
+                         "binary file")
+        self.assertIsNotNone(count_file_tokens(self.root / "missing.txt").error)
+
+    def test_iter_files_filters_extensions_and_hidden_directories(self):
+        """Test directory walks skip hidden directories and honor extensions."""
+        self.write("a.md", "a")
+        self.write("sub/b.py", "b")
+        self.write("sub/c.txt", "c")
+        self.write(".git/config", "x")
+        names = sorted(path.name for path in iter_files([self.root]))
+        self.assertEqual(names, ["a.md", "b.py", "c.txt"])
+        names = sorted(path.name for path in iter_files([self.root], extensions=["py", ".MD"]))
+        self.assertEqual(names, ["a.md", "b.py"])
+
+    def test_process_pool_matches_single_process(self):
+        """Test counting with worker processes gives the same results."""
+        for index in range(6):
+            self.write(f"doc{index}.txt", SAMPLE * (index + 1))
+        single = {result.path: result.tokens for result in count_paths([self.root], workers=1)}
+        pooled = {result.path: result.tokens for result in count_paths([self.root], workers=2)}
+        self.assertEqual(single, pooled)
+        self.assertEqual(len(single), 6)
+
+    def test_summary_by_extension(self):
+        """Test totals are kept per extension and skipped files are counted apart."""
+        self.write("a.md", "hello world")
+        self.write("b.md", "hello")
+        self.write("c.py", "x = 1")
+        self.write("d.bin", b"\0\0")
+        summary = CountSummary()
+        for result in count_paths([self.root], workers=1):
+            summary.add(result)
+        self.assertEqual(summary.files, 3)
+        self.assertEqual(summary.skipped, 1)
+        self.assertEqual(summary.by_extension[".md"][0], 2)
+        self.assertEqual(summary.tokens, sum(tokens for _, tokens, _ in summary.by_extension.values()))
+        self.assertIn("Total", summary.format_report())
+
+    def test_count_cli_streams_json_lines(self):
+        """Test the count subcommand prints file, extension and total lines."""
+        self.write("a.md", "hello world")
+        self.write("b.txt", "hello")
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main(["count", str(self.root), "--workers", "1", "--json"])
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([line["type"] for line in lines].count("file"), 2)
+        self.assertEqual(lines[-1]["type"], "total")
+        self.assertEqual(lines[-1]["files"], 2)
+
+    def test_count_cli_streams_running_extension_totals(self):
+        """Test each counted file is followed by its extension's totals so far."""
+        for name in ("a.md", "b.md", "c.txt"):
+            self.write(name, "hello world")
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main(["count", str(self.root), "--workers", "1", "--json"])
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        for file_line, extension_line in zip(lines[:-1:2], lines[1::2]):
+            self.assertEqual(file_line["type"], "file")
+            self.assertEqual(extension_line["type"], "extension")
+            self.assertEqual(extension_line["extension"], Path(file_line["path"]).suffix)
+        md_totals = [line for line in lines if line.get("extension") == ".md"]
+        self.assertEqual([line["files"] for line in md_totals], [1, 2])
+        self.assertEqual(md_totals[-1]["tokens"], 2 * md_totals[0]["tokens"])
+
+
+if __name__ == "__main__":
+    unittest.main()
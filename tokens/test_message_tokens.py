@@ -0,0 +1,211 @@
+"""Unit tests for message_tokens.py module.
+
+Tests chat-message token counts, the count cache, cost estimates and
+incremental conversation counts, with a local encoding (no downloads required).
+"""
+
+import unittest
+from unittest.mock import patch
+
+from message_tokens import (
+    MODEL_PRICES, ChatFormat, ConversationTokenCounter, TokenCountCache, chat_format,
+    count_message_tokens, estimate_cost,
+)
+from test_tokens import make_test_encoding
+from tokens import clear_encoding_cache, register_encoding
+
+
+MESSAGES = [
+    {"role": "system", "content": "You are a helpful assistant."},
+    {"role": "user", "content": "Hi! My name is Steven"},
+    {"role": "assistant", "content": "Hello Steven!"},
+    {"role": "user", "content": "What is my name?"},
+]
+
+
+class TestCountMessageTokens(unittest.TestCase):
+    """Test prompt token counts of messages lists."""
+
+    def setUp(self):
+        clear_encoding_cache()
+        self.encoding = make_test_encoding()
+        for model in ("gpt-4.1-mini", "gpt-3.5-turbo-0301"):
+            register_encoding(model, self.encoding)
+        self.cache = TokenCountCache()
+
+    def tearDown(self):
+        clear_encoding_cache()
+
+    def text_tokens(self, text):
+        return len(self.encoding.encode(text))
+
+    def test_count_includes_per_message_overhead(self):
+        """Test the count is the field tokens plus 3 per message plus 3 for the reply."""
+        expected = 3 + sum(3 + self.text_tokens(m["role"]) + self.text_tokens(m["content"])
+                           for m in MESSAGES)
+        self.assertEqual(count_message_tokens(MESSAGES, cache=self.cache), expected)
+        self.assertEqual(count_message_tokens([], cache=self.cache), 3)
+
+    def test_name_field_and_legacy_format(self):
+        """Test names add tokens_per_name, which differs for gpt-3.5-turbo-0301."""
+        messages = [{"role": "user", "name": "steven", "content": "hello"}]
+        fields = sum(self.text_tokens(value) for value in messages[0].values())
+        self.assertEqual(count_message_tokens(messages, cache=self.cache), 3 + 3 + fields + 1)
+        self.assertEqual(count_message_tokens(messages, "gpt-3.5-turbo-0301", self.cache),
+                         3 + 4 + fields - 1)
+
+    def test_content_parts_count_text_only(self):
+        """Test list content counts its text parts and ignores images."""
+        parts = [{"type": "text", "text": "hello "},
+                 {"type": "image_url", "image_url": {"url": "https://example.com/a.png"}},
+                 {"type": "text", "text": "world"}]
+        as_parts = count_message_tokens([{"role": "user", "content": parts}], cache=self.cache)
+        as_text = count_message_tokens([{"role": "user", "content": "hello world"}],
+                                       cache=self.cache)
+        self.assertEqual(as_parts, as_text)
+
+    def test_repeated_content_is_encoded_once(self):
+        """Test a repeated system prompt hits the cache instead of being re-encoded."""
+        count_message_tokens(MESSAGES, cache=self.cache)
+        misses = self.cache.misses
+        count_message_tokens(MESSAGES, cache=self.cache)
+        self.assertEqual(self.cache.misses, misses)
+        self.assertGreater(self.cache.hits, 0)
+
+    def test_cache_evicts_least_recently_used(self):
+        """Test the cache keeps at most max_entries counts."""
+        cache = TokenCountCache(max_entries=2)
+        for text in ("a", "b", "a", "c"):
+            cache.count(text)
+        cache.count("a")
+        self.assertEqual(cache.hits, 2)
+        cache.count("b")
+        self.assertEqual(cache.misses, 4)
+
+    def test_chat_format_matches_dated_snapshots(self):
+        """Test formats are looked up by exact name, then by prefix."""
+        self.assertEqual(chat_format("gpt-4.1-mini"), ChatFormat())
+        self.assertEqual(chat_format("gpt-3.5-turbo-0301").tokens_per_message, 4)
+
+
+class TestEstimateCost(unittest.TestCase):
+    """Test pre-flight cost estimates."""
+
+    def setUp(self):
+        clear_encoding_cache()
+        for model in ("gpt-4.1-mini", "gpt-4.1-mini-2025-04-14", "gpt-4.1"):
+            register_encoding(model, make_test_encoding())
+
+    def tearDown(self):
+        clear_encoding_cache()
+
+    def test_cost_uses_model_prices(self):
+        """Test input and output costs are priced per million tokens."""
+        estimate = estimate_cost(MESSAGES, "gpt-4.1-mini", max_output_tokens=1000)
+        input_price, output_price = MODEL_PRICES["gpt-4.1-mini"]
+        self.assertEqual(estimate.prompt_tokens, count_message_tokens(MESSAGES))
+        self.assertAlmostEqual(estimate.input_cost, estimate.prompt_tokens * input_price / 1e6)
+        self.assertAlmostEqual(estimate.output_cost, 1000 * output_price / 1e6)
+        self.assertAlmostEqual(estimate.total_cost, estimate.input_cost + estimate.output_cost)
+
+    def test_dated_snapshot_uses_longest_prefix_price(self):
+        """Test a dated snapshot is priced as its base model, not a shorter prefix."""
+        dated = estimate_cost(MESSAGES, "gpt-4.1-mini-2025-04-14")
+        self.assertAlmostEqual(dated.input_cost, estimate_cost(MESSAGES, "gpt-4.1-mini").input_cost)
+        self.assertNotAlmostEqual(dated.input_cost, estimate_cost(MESSAGES, "gpt-4.1").input_cost)
+
+    def test_unknown_model_raises(self):
+        """Test models without a price are rejected."""
+        with self.assertRaises(ValueError):
+            estimate_cost(MESSAGES, "unknown-model")
+
+
+class TestConversationTokenCounter(unittest.TestCase):
+    """Test incremental counts of a growing conversation."""
+
+    def setUp(self):
+        clear_encoding_cache()
+        register_encoding("gpt-4.1-mini", make_test_encoding())
+        self.cache = TokenCountCache()
+        self.conversation = MESSAGES + [
+            {"role": "assistant", "content": "Your name is Steven."},
+            {"role": "user", "name": "steven", "content": "And what did I say first?"},
+            {"role": "assistant", "content": "You said: Hi! My name is Steven"},
+        ]
+
+    def tearDown(self):
+        clear_encoding_cache()
+
+    def count(self, messages):
+        return count_message_tokens(messages, cache=self.cache)
+
+    def test_total_matches_full_recount_after_every_turn(self):
+        """Test the running total equals count_message_tokens of the history."""
+        counter = ConversationTokenCounter(cache=self.cache)
+        self.assertEqual(counter.total, self.count([]))
+        for index, message in enumerate(self.conversation, 1):
+            counter.append(message)
+            self.assertEqual(counter.total, self.count(self.conversation[:index]))
+        self.assertEqual(counter.messages, self.conversation)
+        self.assertEqual(len(counter), len(self.conversation))
+
+    def test_append_counts_only_the_new_message(self):
+        """Test appending encodes the new turn's fields and nothing else."""
+        counter = ConversationTokenCounter(messages=self.conversation[:-1], cache=self.cache)
+        with patch.object(self.cache, "count", wraps=self.cache.count) as count:
+            counter.append(self.conversation[-1])
+            _ = counter.total, counter.tokens_without_oldest(2)
+        self.assertEqual(count.call_count, len(self.conversation[-1]))
+
+    def test_tokens_without_oldest_keeps_system_prompt(self):
+        """Test dropping k turns removes the oldest non-system messages."""
+        counter = ConversationTokenCounter(messages=self.conversation, cache=self.cache)
+        system, rest = self.conversation[:1], self.conversation[1:]
+        self.assertEqual(counter.droppable, len(rest))
+        for k in range(len(rest) + 1):
+            self.assertEqual(counter.tokens_without_oldest(k), self.count(system + rest[k:]))
+        with self.assertRaises(ValueError):
+            counter.tokens_without_oldest(len(rest) + 1)
+        unpinned = ConversationTokenCounter(messages=self.conversation, cache=self.cache,
+                                            pin_system=False)
+        self.assertEqual(unpinned.tokens_without_oldest(1), self.count(rest))
+
+    def test_drop_oldest_and_keep_counting(self):
+        """Test dropped messages leave the count and later turns still add up."""
+        counter = ConversationTokenCounter(messages=self.conversation, cache=self.cache)
+        self.assertEqual(counter.drop_oldest(2), self.conversation[1:3])
+        self.assertEqual(counter.messages, self.conversation[:1] + self.conversation[3:])
+        for turn in range(4):
+            counter.append({"role": "user", "content": f"turn {turn}"})
+            counter.drop_oldest(1)
+            self.assertEqual(counter.total, self.count(counter.messages))
+            self.assertEqual(counter.tokens_without_oldest(1),
+                             self.count(counter.messages[:1] + counter.messages[2:]))
+
+    def test_system_message_after_dropping_everything_is_not_pinned(self):
+        """Test a later system message stays in turn order once history was dropped."""
+        counter = ConversationTokenCounter(messages=self.conversation, cache=self.cache)
+        counter.drop_oldest(counter.droppable)
+        reminder = {"role": "system", "content": "Be brief."}
+        counter.append(reminder)
+        counter.append({"role": "user", "content": "Hi again"})
+        self.assertEqual(counter.messages, self.conversation[:1] + [reminder,
+                         {"role": "user", "content": "Hi again"}])
+        self.assertEqual(counter.droppable, 2)
+        self.assertEqual(counter.drop_oldest(1), [reminder])
+        self.assertEqual(counter.total, self.count(counter.messages))
+
+    def test_oldest_to_drop_fits_budget(self):
+        """Test the fewest drops that fit a budget, and budgets pinned messages exceed."""
+        counter = ConversationTokenCounter(messages=self.conversation, cache=self.cache)
+        self.assertEqual(counter.oldest_to_drop(counter.total), 0)
+        for budget in range(counter.tokens_without_oldest(counter.droppable), counter.total):
+            k = counter.oldest_to_drop(budget)
+            self.assertLessEqual(counter.tokens_without_oldest(k), budget)
+            self.assertGreater(counter.tokens_without_oldest(k - 1), budget)
+        with self.assertRaises(ValueError):
+            counter.oldest_to_drop(counter.tokens_without_oldest(counter.droppable) - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""Unit tests for token_arrays.py module.
+
+Tests NumPy token encoding and the memory-mapped token dataset,
+with a local encoding (no downloads required).
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from test_tokens import make_test_encoding
+from token_arrays import TokenDataset, TokenDatasetWriter, decode_array, encode_array, token_dtype
+from tokens import clear_encoding_cache, encode_text, register_encoding
+
+
+class TestTokenArrays(unittest.TestCase):
+    """Test encoding into NumPy arrays."""
+
+    def setUp(self):
+        clear_encoding_cache()
+        self.encoding = make_test_encoding()
+        register_encoding("gpt-4.1-mini", self.encoding)
+
+    def tearDown(self):
+        clear_encoding_cache()
+
+    def test_small_vocabulary_uses_uint16(self):
+        """Test the dtype narrows to uint16 when every token ID fits."""
+        self.assertEqual(token_dtype(self.encoding), np.uint16)
+        tokens = encode_array("hello world")
+        self.assertEqual(tokens.dtype, np.uint16)
+        self.assertEqual(tokens.tolist(), encode_text("hello world"))
+
+    def test_explicit_dtype_and_roundtrip(self):
+        """Test an explicit dtype is kept and arrays decode back to the text."""
+        text = "héllo 世界, hello world"
+        tokens = encode_array(text, dtype=np.uint32)
+        self.assertEqual(tokens.dtype, np.uint32)
+        self.assertEqual(decode_array(tokens), text)
+
+    def test_special_token_text_is_ordinary(self):
+        """Test special-token text is encoded instead of rejected."""
+        self.assertEqual(decode_array(encode_array("a <|endoftext|> b")), "a <|endoftext|> b")
+
+
+class TestTokenDataset(unittest.TestCase):
+    """Test the memory-mapped token dataset."""
+
+    def setUp(self):
+        clear_encoding_cache()
+        register_encoding("gpt-4.1-mini", make_test_encoding())
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "corpus.bin"
+        self.texts = ["hello world", "", "héllo 世界", "second hello"]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+        clear_encoding_cache()
+
+    def test_write_and_read_documents(self):
+        """Test documents come back as zero-copy slices of the token file."""
+        with TokenDatasetWriter(self.path) as writer:
+            writer.extend(self.texts)
+            self.assertEqual(writer.documents, 4)
+
+        dataset = TokenDataset(self.path)
+        self.assertEqual(len(dataset), 4)
+        self.assertEqual([dataset.decode(index) for index in range(4)], self.texts)
+        self.assertEqual(dataset.lengths().tolist(), [len(encode_text(text)) for text in self.texts])
+        self.assertEqual(dataset.num_tokens, self.path.stat().st_size // 2)
+        self.assertIsInstance(dataset[0].base, np.memmap)
+        self.assertEqual(dataset.decode(-1), "second hello")
+        with self.assertRaises(IndexError):
+            dataset[4]
+
+    def test_reopening_appends(self):
+        """Test a reopened dataset continues after its last document."""
+        with TokenDatasetWriter(self.path) as writer:
+            writer.add("hello world")
+        with TokenDatasetWriter(self.path) as writer:
+            self.assertEqual(writer.add("second hello"), 1)
+        dataset = TokenDataset(self.path)
+        self.assertEqual([dataset.decode(0), dataset.decode(1)], ["hello world", "second hello"])
+
+    def test_interrupted_append_is_dropped(self):
+        """Test tokens written without an index entry are discarded on reopen."""
+        with TokenDatasetWriter(self.path) as writer:
+            writer.add("hello world")
+        with open(self.path, "ab") as tokens:
+            tokens.write(b"\x01\x00\x02\x00")  # half-written document
+        with TokenDatasetWriter(self.path) as writer:
+            writer.add("again")
+        dataset = TokenDataset(self.path)
+        self.assertEqual([dataset.decode(0), dataset.decode(1)], ["hello world", "again"])
+
+    def test_index_ahead_of_tokens_is_dropped(self):
+        """Test index entries for tokens that never reached the file are discarded on reopen."""
+        with TokenDatasetWriter(self.path) as writer:
+            writer.extend(["hello world", "second hello"])
+        size = self.path.stat().st_size
+        with open(self.path, "r+b") as tokens:
+            tokens.truncate(size - 2)  # the last document lost a token
+        with TokenDatasetWriter(self.path) as writer:
+            self.assertEqual(writer.documents, 1)
+            writer.add("again")
+        dataset = TokenDataset(self.path)
+        self.assertEqual([dataset.decode(index) for index in range(len(dataset))],
+                         ["hello world", "again"])
+        self.assertEqual(dataset.num_tokens, self.path.stat().st_size // 2)
+
+    def test_mismatched_dtype_is_rejected(self):
+        """Test a dataset can't be continued with another dtype."""
+        TokenDatasetWriter(self.path).close()
+        with self.assertRaises(ValueError):
+            TokenDatasetWriter(self.path, dtype=np.uint32)
+
+    def test_token_too_large_for_dtype(self):
+        """Test token IDs that don't fit the dtype are rejected."""
+        with TokenDatasetWriter(self.path) as writer:
+            with self.assertRaises(ValueError):
+                writer.add_tokens(np.array([70_000]))
+
+    def test_empty_dataset(self):
+        """Test a dataset with no documents opens."""
+        TokenDatasetWriter(self.path).close()
+        dataset = TokenDataset(self.path)
+        self.assertEqual(len(dataset), 0)
+        self.assertEqual(dataset.num_tokens, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+"""Unit tests for token_chunks.py module.
+
+Tests truncating text to a token budget and splitting it into chunks,
+with a local encoding (no downloads required).
+"""
+
+import unittest
+from unittest.mock import patch
+
+from corpus import load_fixture_corpus
+from test_tokens import make_test_encoding
+from token_chunks import chunk_by_tokens, truncate_to_tokens
+from tokens import clear_encoding_cache, register_encoding
+
+
+class TokenChunksTestCase(unittest.TestCase):
+    """Registers the local encoding for gpt-4.1-mini."""
+
+    def setUp(self):
+        clear_encoding_cache()
+        self.encoding = make_test_encoding()
+        register_encoding("gpt-4.1-mini", self.encoding)
+        self.corpus = load_fixture_corpus()
+
+    def tearDown(self):
+        clear_encoding_cache()
+
+    def count(self, text):
+        return len(self.encoding.encode(text))
+
+
+class TestTruncateToTokens(TokenChunksTestCase):
+    """Test cutting text to a token budget."""
+
+    def test_text_that_fits_is_unchanged(self):
+        """Test text within the budget is returned as is."""
+        text = "hello world"
+        self.assertEqual(truncate_to_tokens(text, self.count(text)), text)
+
+    def test_strategies_keep_head_tail_or_both(self):
+        """Test each strategy keeps the right part and stays within the budget."""
+        text = self.corpus["prose"]
+        head = truncate_to_tokens(text, 40)
+        tail = truncate_to_tokens(text, 40, "tail")
+        middle = truncate_to_tokens(text, 40, "middle", marker="\n[...]\n")
+        self.assertTrue(text.startswith(head))
+        self.assertTrue(text.endswith(tail))
+        first, last = middle.split("\n[...]\n")
+        self.assertTrue(text.startswith(first))
+        self.assertTrue(text.endswith(last))
+        for result in (head, tail, middle):
+            self.assertLessEqual(self.count(result), 40)
+            self.assertGreaterEqual(self.count(result), 35)
+
+    def test_never_cuts_inside_a_character(self):
+        """Test characters split across byte-level tokens are kept or dropped whole."""
+        text = self.corpus["cjk"]
+        for n in range(0, 40):
+            for strategy in ("head", "tail", "middle"):
+                result = truncate_to_tokens(text, n, strategy)
+                self.assertLessEqual(self.count(result), n)
+                self.assertNotIn("�", result)
+                if strategy == "head":
+                    self.assertTrue(text.startswith(result))
+                elif strategy == "tail":
+                    self.assertTrue(text.endswith(result))
+
+    def test_marker_counts_toward_budget(self):
+        """Test the marker is included in the budget and a budget below it gives ''."""
+        marker = " [truncated]"
+        result = truncate_to_tokens(self.corpus["code"], 30, marker=marker)
+        self.assertTrue(result.endswith(marker))
+        self.assertLessEqual(self.count(result), 30)
+        self.assertEqual(truncate_to_tokens(self.corpus["code"], 2, marker=marker), "")
+
+    def test_invalid_arguments(self):
+        """Test negative budgets and unknown strategies are rejected."""
+        with self.assertRaises(ValueError):
+            truncate_to_tokens("text", -1)
+        with self.assertRaises(ValueError):
+            truncate_to_tokens("text", 1, "start")
+
+
+class TestChunkByTokens(TokenChunksTestCase):
+    """Test splitting text into token chunks."""
+
+    def test_chunks_cover_text_within_size(self):
+        """Test chunks without overlap rebuild the text and respect the size."""
+        for text in self.corpus.values():
+            chunks = chunk_by_tokens(text, 100)
+            self.assertEqual("".join(chunk.text for chunk in chunks), text)
+            self.assertTrue(all(0 < chunk.tokens <= 100 for chunk in chunks))
+            self.assertTrue(all(text[chunk.char_start:chunk.char_end] == chunk.text
+                                for chunk in chunks))
+
+    def test_chunks_end_at_paragraphs_and_sentences(self):
+        """Test chunks prefer paragraph breaks, then sentence ends, then lines."""
+        paragraph = "First sentence here. Second sentence here. Third one here.\n\n"
+        size = self.count(paragraph) * 3 // 2
+        for chunk in chunk_by_tokens(paragraph * 10, size):
+            self.assertTrue(chunk.text.endswith("\n\n"), repr(chunk.text[-20:]))
+        sentences = paragraph.replace("\n\n", " ") * 10
+        for chunk in chunk_by_tokens(sentences, size)[:-1]:
+            self.assertTrue(chunk.text.endswith("."), repr(chunk.text[-20:]))
+        for chunk in chunk_by_tokens(self.corpus["prose"], 200)[:-1]:
+            self.assertTrue(chunk.text.endswith((".", "?", "!", "\n")), repr(chunk.text[-20:]))
+        for chunk in chunk_by_tokens(self.corpus["cjk"], 150)[:-1]:
+            self.assertTrue(chunk.text.endswith(("。", "？", "！", "\n")), repr(chunk.text[-20:]))
+
+    def test_overlap_repeats_tokens(self):
+        """Test consecutive chunks share about `overlap` tokens."""
+        chunks = chunk_by_tokens(self.corpus["html"], 120, overlap=20)
+        for previous, chunk in zip(chunks, chunks[1:]):
+            self.assertLess(chunk.char_start, previous.char_end)
+            self.assertGreaterEqual(previous.token_end - chunk.token_start, 20)
+        self.assertEqual(chunks[-1].char_end, len(self.corpus["html"]))
+
+    def test_text_is_encoded_once(self):
+        """Test chunking runs a single encode over the whole text."""
+        with patch.object(self.encoding, "encode", wraps=self.encoding.encode) as encode:
+            chunk_by_tokens(self.corpus["prose"], 50, overlap=10)
+        encode.assert_called_once()
+
+    def test_empty_text_and_invalid_arguments(self):
+        """Test empty text gives no chunks and bad sizes are rejected."""
+        self.assertEqual(chunk_by_tokens("", 10), [])
+        with self.assertRaises(ValueError):
+            chunk_by_tokens("text", 0)
+        with self.assertRaises(ValueError):
+            chunk_by_tokens("text", 10, overlap=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,19 +3,43 @@
 Tests tokenization functions (no API calls required).
 """
 
+import csv
+import io
+import json
+import threading
+import time
 import unittest
 from unittest.mock import patch
 
 import tiktoken
 
 from tokens import (
+    clear_encoding_cache,
+    count_tokens_batch,
     decode_tokens,
+    encode_batch,
     encode_text,
     get_encoding_for_model,
     print_tokens_breakdown,
+    register_encoding,
+    token_breakdown,
+    warm_up,
 )
 
 
+def make_test_encoding() -> tiktoken.Encoding:
+    """Build a small byte-level BPE encoding that needs no download."""
+    ranks = {bytes([i]): i for i in range(256)}
+    for pair in (b"he", b"ll", b"lo", b" w", b"or"):
+        ranks[pair] = len(ranks)
+    return tiktoken.Encoding(
+        name="test_bytes",
+        pat_str=r"""'s|'t|'re|'ve|'m|'ll|'d| ?\p{L}+| ?\p{N}+| ?[^\s\p{L}\p{N}]+|\s+(?!\S)|\s+""",
+        mergeable_ranks=ranks,
+        special_tokens={"<|endoftext|>": len(ranks)},
+    )
+
+
 class TestTokenization(unittest.TestCase):
     """Test tokenization functions."""
     
@@ -64,6 +88,131 @@ class TestTokenization(unittest.TestCase):
         self.assertTrue(any("Hi there" in str(call) for call in calls))
 
 
+class TestEncodingRegistry(unittest.TestCase):
+    """Test the cached encoding registry (offline, with a local encoding)."""
+    
+    def setUp(self):
+        clear_encoding_cache()
+        self.encoding = make_test_encoding()
+    
+    def tearDown(self):
+        clear_encoding_cache()
+    
+    def test_encoding_is_loaded_once(self):
+        """Test repeated lookups reuse the cached encoding."""
+        with patch("tokens.tiktoken.encoding_for_model", return_value=self.encoding) as load:
+            first = get_encoding_for_model("gpt-4.1-mini")
+            second = get_encoding_for_model("gpt-4.1-mini")
+        self.assertIs(first, second)
+        load.assert_called_once_with("gpt-4.1-mini")
+    
+    def test_concurrent_first_lookups_load_once(self):
+        """Test threads racing on a cold model load it only once."""
+        def slow_load(model):
+            time.sleep(0.05)
+            return self.encoding
+        
+        results = []
+        with patch("tokens.tiktoken.encoding_for_model", side_effect=slow_load) as load:
+            threads = [threading.Thread(target=lambda: results.append(get_encoding_for_model()))
+                       for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(load.call_count, 1)
+        self.assertTrue(all(result is self.encoding for result in results))
+    
+    def test_warm_up_loads_models(self):
+        """Test warm-up loads every listed model ahead of time."""
+        with patch("tokens.tiktoken.encoding_for_model", return_value=self.encoding) as load:
+            warm_up(["gpt-4.1-mini", "gpt-4o"])
+            get_encoding_for_model("gpt-4o")
+        self.assertEqual(load.call_count, 2)
+    
+    def test_registered_encoding_is_used(self):
+        """Test a registered encoding serves a model tiktoken doesn't know."""
+        register_encoding("my-finetune", self.encoding)
+        tokens = encode_text("hello world", model="my-finetune")
+        self.assertEqual(tokens, self.encoding.encode("hello world"))
+        self.assertEqual(decode_tokens(tokens, model="my-finetune"), "hello world")
+    
+    def test_encode_batch_matches_single_encodes(self):
+        """Test batch encoding returns the same tokens, in order."""
+        register_encoding("my-finetune", self.encoding)
+        texts = ["hello world", "", "héllo 世界", "hello " * 50]
+        self.assertEqual(encode_batch(texts, model="my-finetune"),
+                         [self.encoding.encode(text) for text in texts])
+    
+    def test_count_tokens_batch(self):
+        """Test batch counts equal the length of each encoding."""
+        register_encoding("my-finetune", self.encoding)
+        texts = ["hello world", "", "héllo 世界"]
+        self.assertEqual(count_tokens_batch(texts, model="my-finetune", num_threads=2),
+                         [len(self.encoding.encode(text)) for text in texts])
+        self.assertEqual(count_tokens_batch(texts, model="my-finetune", num_threads=1),
+                         [len(self.encoding.encode(text)) for text in texts])
+
+
+class TestTokenBreakdown(unittest.TestCase):
+    """Test token breakdowns with byte and character offsets."""
+    
+    def setUp(self):
+        clear_encoding_cache()
+        register_encoding("gpt-4.1-mini", make_test_encoding())
+    
+    def tearDown(self):
+        clear_encoding_cache()
+    
+    def test_offsets_cover_the_text(self):
+        """Test byte and character spans line up with the text."""
+        text = "hello world"
+        breakdown = token_breakdown(text)
+        self.assertEqual(breakdown.byte_offsets[0], 0)
+        self.assertEqual(breakdown.byte_offsets[-1], len(text.encode("utf-8")))
+        for row in breakdown.rows():
+            self.assertEqual(text[row["char_start"]:row["char_end"]], row["text"])
+    
+    def test_multibyte_characters_split_across_tokens(self):
+        """Test tokens holding part of a character share its character span."""
+        text = "h\u00e9 \u4e16"  # "hé 世"
+        breakdown = token_breakdown(text)
+        raw = text.encode("utf-8")
+        for index, piece in enumerate(breakdown.token_bytes):
+            start, end = breakdown.byte_offsets[index], breakdown.byte_offsets[index + 1]
+            self.assertEqual(raw[start:end], piece)
+        e_tokens = [index for index, (start, end) in
+                    enumerate(zip(breakdown.char_starts, breakdown.char_ends)) if (start, end) == (1, 2)]
+        self.assertEqual(len(e_tokens), 2)  # é is two bytes, one token each here
+        self.assertEqual(breakdown.char_ends[-1], len(text))
+        self.assertEqual(breakdown.token_repr(e_tokens[0]), "b'\\xc3'")
+    
+    def test_json_and_csv_rendering(self):
+        """Test JSON and CSV carry the same rows."""
+        breakdown = token_breakdown("hello, world")
+        data = json.loads(breakdown.to_json())
+        self.assertEqual(data["total_tokens"], len(breakdown))
+        self.assertEqual(data["tokens"], list(breakdown.rows()))
+        rows = list(csv.DictReader(io.StringIO(breakdown.to_csv())))
+        self.assertEqual([int(row["token_id"]) for row in rows], breakdown.token_ids)
+        self.assertEqual([row["text"] for row in rows], [row["text"] for row in breakdown.rows()])
+    
+    def test_empty_text(self):
+        """Test an empty text has no tokens and zero-length offsets."""
+        breakdown = token_breakdown("")
+        self.assertEqual(len(breakdown), 0)
+        self.assertEqual(breakdown.byte_offsets, [0])
+    
+    @patch('builtins.print')
+    def test_print_formats(self, mock_print):
+        """Test the printer renders tables and rejects unknown formats."""
+        print_tokens_breakdown("hello", format="table")
+        printed = "\n".join(str(call.args[0]) for call in mock_print.call_args_list)
+        self.assertIn("Bytes", printed)
+        self.assertIn("'ll'", printed)
+        with self.assertRaises(ValueError):
+            print_tokens_breakdown("hello", format="xml")
+
 
 if __name__ == "__main__":
     unittest.main()
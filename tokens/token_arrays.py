@@ -0,0 +1,252 @@
+# Auto-Generated
+# File Name: token_arrays.py
+# Author: scotton
+# Creation Date: January-22-2026
+# Modified Date: January-22-2026
+
+"""Compact NumPy token arrays and a memory-mapped token dataset.
+
+A Python ``list[int]`` of tokens costs about 36 bytes per token (an
+8-byte pointer plus a 28-byte int object); a NumPy array costs 2 or 4.
+Texts are encoded straight into a ``uint32`` buffer by tiktoken, then
+narrowed to ``uint16`` when the encoding's vocabulary fits.
+
+``TokenDatasetWriter`` appends encoded documents to a flat token file
+with an offsets index next to it; ``TokenDataset`` memory-maps both, so
+any document is a zero-copy slice of the file and corpora larger than
+memory can be sampled randomly.
+
+Files of a dataset at ``corpus.bin``:
+- ``corpus.bin``: all tokens, back to back, in the dataset's dtype
+- ``corpus.bin.idx``: uint64 end offset (in tokens) of each document
+- ``corpus.bin.json``: dtype, model and encoding name
+
+Based on week1/day4.ipynb
+"""
+
+import json
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import tiktoken
+
+from tokens import get_encoding_for_model
+
+
+def token_dtype(encoding: tiktoken.Encoding) -> np.dtype:
+    """Return the smallest unsigned dtype holding every token ID of an encoding."""
+    return np.dtype(np.uint16) if encoding.n_vocab <= 1 << 16 else np.dtype(np.uint32)
+
+
+def encode_array(text: str, model: str = "gpt-4.1-mini", dtype=None) -> np.ndarray:
+    """Encode text into a NumPy array of token IDs.
+
+    Special-token text (e.g. "<|endoftext|>") is encoded as ordinary text.
+
+    Args:
+        text: The text to encode
+        model: The model name to use for encoding (default: gpt-4.1-mini)
+        dtype: Token dtype (default: uint16 if the vocabulary fits, else uint32)
+
+    Returns:
+        A 1-D array of token IDs
+    """
+    encoding = get_encoding_for_model(model)
+    tokens = encoding.encode_to_numpy(text, disallowed_special=())
+    dtype = np.dtype(dtype) if dtype is not None else token_dtype(encoding)
+    return tokens if tokens.dtype == dtype else tokens.astype(dtype)
+
+
+def decode_array(tokens: np.ndarray, model: str = "gpt-4.1-mini") -> str:
+    """Decode an array of token IDs back into text.
+
+    Args:
+        tokens: Array of token IDs
+        model: The model name used for encoding (default: gpt-4.1-mini)
+
+    Returns:
+        The decoded text string
+    """
+    return get_encoding_for_model(model).decode(np.asarray(tokens).tolist())
+
+
+def _index_path(path: Path) -> Path:
+    return path.with_name(path.name + ".idx")
+
+
+def _meta_path(path: Path) -> Path:
+    return path.with_name(path.name + ".json")
+
+
+class TokenDatasetWriter:
+    """Appends encoded documents to a token file and its offsets index.
+
+    Opening an existing dataset continues it. Use as a context manager,
+    or call ``close()``; data is flushed on close.
+
+    Attributes:
+        path (Path): The token file
+        model (str): The model whose encoding is used
+        dtype (np.dtype): Token dtype of the file
+        documents (int): Documents in the dataset so far
+        num_tokens (int): Tokens in the dataset so far
+    """
+
+    def __init__(self, path: str | Path, model: str = "gpt-4.1-mini", dtype=None):
+        """Open a dataset for appending.
+
+        Args:
+            path: The token file (e.g. "corpus.bin")
+            model: The model name to use for encoding (default: gpt-4.1-mini)
+            dtype: Token dtype (default: uint16 if the vocabulary fits, else uint32)
+
+        Raises:
+            ValueError: If the existing dataset uses another dtype or encoding
+        """
+        self.path = Path(path)
+        self.model = model
+        encoding = get_encoding_for_model(model)
+        self.dtype = np.dtype(dtype) if dtype is not None else token_dtype(encoding)
+        meta = {"dtype": self.dtype.name, "model": model, "encoding": encoding.name}
+
+        meta_path = _meta_path(self.path)
+        if meta_path.exists():
+            existing = json.loads(meta_path.read_text(encoding="utf-8"))
+            if (existing["dtype"], existing["encoding"]) != (meta["dtype"], meta["encoding"]):
+                raise ValueError(
+                    f"{self.path} holds {existing['encoding']} tokens as {existing['dtype']}, "
+                    f"not {meta['encoding']} as {meta['dtype']}"
+                )
+        else:
+            meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+        self._tokens = open(self.path, "ab")
+        self._index = open(_index_path(self.path), "ab")
+        self._recover()
+
+    def _recover(self) -> None:
+        """Drop tokens and index entries left by an interrupted append.
+
+        Only documents whose tokens are all in the token file are kept:
+        index entries past its end are dropped (the files are flushed
+        independently, so the index can be ahead), then tokens past the
+        last kept entry.
+        """
+        self._index.truncate(self._index.tell() // 8 * 8)
+        ends = np.fromfile(_index_path(self.path), dtype=np.uint64)
+        available = self._tokens.tell() // self.dtype.itemsize
+        self.documents = int(np.searchsorted(ends, available, side="right"))
+        self.num_tokens = int(ends[self.documents - 1]) if self.documents else 0
+        self._index.truncate(self.documents * 8)
+        self._tokens.truncate(self.num_tokens * self.dtype.itemsize)
+
+    def add_tokens(self, tokens: np.ndarray) -> int:
+        """Append one already-encoded document.
+
+        Args:
+            tokens: The document's token IDs
+
+        Returns:
+            The document's index in the dataset
+
+        Raises:
+            ValueError: If a token ID doesn't fit in the dataset's dtype
+        """
+        tokens = np.asarray(tokens)
+        if tokens.size and tokens.max() > np.iinfo(self.dtype).max:
+            raise ValueError(f"Token ID {tokens.max()} does not fit in {self.dtype.name}")
+        self._tokens.write(tokens.astype(self.dtype, copy=False).tobytes())
+        self.num_tokens += tokens.size
+        self._index.write(np.uint64(self.num_tokens).tobytes())
+        self.documents += 1
+        return self.documents - 1
+
+    def add(self, text: str) -> int:
+        """Encode and append one document.
+
+        Args:
+            text: The document text
+
+        Returns:
+            The document's index in the dataset
+        """
+        return self.add_tokens(encode_array(text, self.model, self.dtype))
+
+    def extend(self, texts: Iterable[str]) -> None:
+        """Encode and append many documents, in order."""
+        for text in texts:
+            self.add(text)
+
+    def close(self) -> None:
+        self._tokens.close()
+        self._index.close()
+
+    def __enter__(self) -> "TokenDatasetWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class TokenDataset:
+    """Read-only, memory-mapped view of a token dataset.
+
+    Documents are zero-copy slices of the mapped token file.
+
+    Attributes:
+        path (Path): The token file
+        dtype (np.dtype): Token dtype
+        model (str): Model the dataset was encoded for
+        tokens (np.ndarray): All tokens, memory-mapped
+        ends (np.ndarray): End offset of each document, memory-mapped
+    """
+
+    def __init__(self, path: str | Path):
+        """Open a dataset.
+
+        Args:
+            path: The token file written by TokenDatasetWriter
+        """
+        self.path = Path(path)
+        meta = json.loads(_meta_path(self.path).read_text(encoding="utf-8"))
+        self.dtype = np.dtype(meta["dtype"])
+        self.model = meta["model"]
+        self.tokens = self._map(self.path, self.dtype)
+        self.ends = self._map(_index_path(self.path), np.dtype(np.uint64))
+
+    @staticmethod
+    def _map(path: Path, dtype: np.dtype) -> np.ndarray:
+        # np.memmap can't map an empty file
+        if path.stat().st_size == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+    @property
+    def num_tokens(self) -> int:
+        return len(self.tokens)
+
+    def bounds(self, index: int) -> tuple[int, int]:
+        """Return the (start, end) token offsets of a document."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Document {index} out of range")
+        start = int(self.ends[index - 1]) if index else 0
+        return start, int(self.ends[index])
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        """Return a document's tokens as a zero-copy view."""
+        start, end = self.bounds(index)
+        return self.tokens[start:end]
+
+    def lengths(self) -> np.ndarray:
+        """Return the token count of every document."""
+        return np.diff(np.asarray(self.ends, dtype=np.int64), prepend=0)
+
+    def decode(self, index: int) -> str:
+        """Decode one document back into text."""
+        return decode_array(self[index], self.model)
@@ -0,0 +1,205 @@
+# Auto-Generated
+# File Name: token_chunks.py
+# Author: scotton
+# Creation Date: January-22-2026
+# Modified Date: January-22-2026
+
+"""Cut text by tokens: truncate to a budget or split into chunks.
+
+Both functions encode the text once and map every token boundary to a
+character offset, then slice the original string; no piece is encoded
+again to find where to cut. Cuts never fall inside a character, even
+when a multi-byte character spans two tokens.
+
+Special-token text (e.g. "<|endoftext|>") is treated as ordinary text.
+
+Based on week1/day4.ipynb
+"""
+
+from dataclasses import dataclass
+from itertools import accumulate
+
+import tiktoken
+
+from tokens import get_encoding_for_model
+
+
+STRATEGIES = ("head", "tail", "middle")
+
+_CONTINUATION = bytes(range(0x80, 0xC0))
+_SENTENCE_ENDS = ".!?"
+_CJK_SENTENCE_ENDS = "。！？"
+
+
+class _TokenOffsets:
+    """Token boundaries of a text as character offsets, from one encode."""
+
+    def __init__(self, text: str, encoding: tiktoken.Encoding):
+        self.text = text
+        self.pieces = encoding.decode_tokens_bytes(encoding.encode(text, disallowed_special=()))
+        if text.isascii():
+            lengths = map(len, self.pieces)
+        else:
+            # Characters starting in each token: its bytes minus continuation bytes
+            lengths = (len(piece.translate(None, _CONTINUATION)) for piece in self.pieces)
+        self.chars = list(accumulate(lengths, initial=0))
+
+    def __len__(self) -> int:
+        return len(self.pieces)
+
+    def splits_char(self, index: int) -> bool:
+        """Return True if boundary ``index`` falls inside a character."""
+        return 0 < index < len(self) and 0x80 <= self.pieces[index][0] < 0xC0
+
+    def snap(self, index: int, step: int) -> int:
+        """Move a boundary by ``step`` until it falls between characters."""
+        while self.splits_char(index):
+            index += step
+        return index
+
+    def rank(self, index: int) -> int:
+        """Rate a boundary: 4 paragraph, 3 sentence, 2 line, 1 word, 0 other."""
+        position = self.chars[index]
+        before = self.text[position - 1] if position else "\n"
+        after = self.text[position] if position < len(self.text) else "\n"
+        if before == "\n":
+            if position < 2 or self.text[position - 2] == "\n":
+                return 4
+            return 3 if self.text[position - 2] in _SENTENCE_ENDS + _CJK_SENTENCE_ENDS else 2
+        if before in _CJK_SENTENCE_ENDS or (before in _SENTENCE_ENDS and after.isspace()):
+            return 3
+        return 1 if before.isspace() or after.isspace() else 0
+
+
+def truncate_to_tokens(text: str, n: int, strategy: str = "head", model: str = "gpt-4.1-mini",
+                       marker: str = "") -> str:
+    """Cut text to at most n tokens.
+
+    Args:
+        text: The text to cut
+        n: Maximum number of tokens
+        strategy: What to keep: "head" (the start), "tail" (the end) or
+            "middle" (both ends, dropping the middle) (default: "head")
+        model: The model name to use for encoding (default: gpt-4.1-mini)
+        marker: Text put where text was removed, e.g. "\\n[... truncated]";
+            its tokens count toward n (default: none)
+
+    Returns:
+        The text unchanged if it fits, else the kept part(s) and the marker
+
+    Raises:
+        ValueError: If n is negative or the strategy is unknown
+    """
+    if n < 0:
+        raise ValueError(f"n must be at least 0, got {n}")
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy!r} (expected head, tail or middle)")
+    encoding = get_encoding_for_model(model)
+    offsets = _TokenOffsets(text, encoding)
+    if len(offsets) <= n:
+        return text
+
+    def count(piece: str) -> int:
+        return len(encoding.encode(piece, disallowed_special=()))
+
+    def cut(keep: int) -> str:
+        if strategy == "head":
+            end = offsets.snap(keep, -1)
+            return text[:offsets.chars[end]] + marker
+        if strategy == "tail":
+            start = offsets.snap(len(offsets) - keep, 1)
+            return marker + text[offsets.chars[start]:]
+        end = offsets.snap((keep + 1) // 2, -1)
+        start = offsets.snap(len(offsets) - keep // 2, 1)
+        return text[:offsets.chars[end]] + marker + text[offsets.chars[start]:]
+
+    keep = n - (count(marker) if marker else 0)
+    if keep <= 0:
+        return ""
+    result = cut(keep)
+    # Tokens can merge differently across a cut; only the result is re-encoded
+    excess = count(result) - n
+    while excess > 0 and keep > 0:
+        keep -= excess
+        result = cut(keep) if keep > 0 else ""
+        excess = count(result) - n
+    return result
+
+
+@dataclass
+class TokenChunk:
+    """One chunk of a text.
+
+    Attributes:
+        text: The chunk's text, a slice of the original
+        char_start: Index of the chunk's first character in the original
+        char_end: Index just past its last character
+        token_start: Index of its first token in the original's encoding
+        token_end: Index just past its last token
+    """
+    text: str
+    char_start: int
+    char_end: int
+    token_start: int
+    token_end: int
+
+    @property
+    def tokens(self) -> int:
+        """Number of tokens in the chunk."""
+        return self.token_end - self.token_start
+
+
+def chunk_by_tokens(text: str, size: int, overlap: int = 0,
+                    model: str = "gpt-4.1-mini") -> list[TokenChunk]:
+    """Split text into chunks of at most ``size`` tokens.
+
+    Each chunk ends at the best boundary in the second half of its token
+    window: a paragraph break, else a sentence end, else a line break,
+    else a space, else any token boundary. Consecutive chunks share about
+    ``overlap`` tokens.
+
+    Token counts come from encoding the whole text once; encoding a chunk
+    on its own can differ by a token at its edges, where the neighbouring
+    text no longer takes part in merges.
+
+    Args:
+        text: The text to split
+        size: Maximum tokens per chunk
+        overlap: Tokens repeated from the end of one chunk at the start
+            of the next (default: 0)
+        model: The model name to use for encoding (default: gpt-4.1-mini)
+
+    Returns:
+        The chunks, in order; none for an empty text
+
+    Raises:
+        ValueError: If size is not positive or overlap is not in [0, size)
+    """
+    if size <= 0:
+        raise ValueError(f"size must be positive, got {size}")
+    if not 0 <= overlap < size:
+        raise ValueError(f"overlap must be in [0, {size}), got {overlap}")
+    offsets = _TokenOffsets(text, get_encoding_for_model(model))
+    total = len(offsets)
+    chunks = []
+    start = 0
+    while start < total:
+        end = total
+        if start + size < total:
+            best_rank = -1
+            for boundary in range(start + size, start + max(1, size // 2) - 1, -1):
+                if offsets.splits_char(boundary):
+                    continue
+                rank = offsets.rank(boundary)
+                if rank > best_rank:
+                    end, best_rank = boundary, rank
+                    if rank == 4:
+                        break
+            if best_rank < 0:  # a window inside one character: cut after it
+                end = offsets.snap(start + size, 1)
+        chunks.append(TokenChunk(text[offsets.chars[start]:offsets.chars[end]],
+                                 offsets.chars[start], offsets.chars[end], start, end))
+        if end == total:
+            break
+        start = offsets.snap(max(start + 1, end - overlap), 1) if overlap else end
+    return chunks
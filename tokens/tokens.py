@@ -9,22 +9,84 @@
 This module provides functions for tokenizing text using tiktoken,
 which is essential for understanding API costs and context limits.
 
+Encodings are looked up once per model and kept in a thread-safe
+registry, so the hot path (encode, count) is a dictionary lookup plus
+the BPE itself. Set TOKENS_WARM_MODELS to a comma-separated list of
+models to load their encodings when the module is imported.
+
 Based on week1/day4.ipynb
 """
 
+import csv
+import io
+import json
+import os
+import threading
+from dataclasses import dataclass
+from itertools import accumulate
+
 import tiktoken
 
 
+# Model name -> loaded encoding; reads are lock-free, loads take the lock
+_encodings: dict[str, tiktoken.Encoding] = {}
+_encodings_lock = threading.Lock()
+
+
 def get_encoding_for_model(model: str = "gpt-4.1-mini") -> tiktoken.Encoding:
     """Get the tiktoken encoding for a specific model.
     
+    The encoding is loaded on first use and cached; concurrent first
+    calls for the same model load it only once.
+    
     Args:
         model: The model name to get encoding for (default: gpt-4.1-mini)
         
     Returns:
         A tiktoken Encoding object for the specified model
     """
-    return tiktoken.encoding_for_model(model)
+    encoding = _encodings.get(model)
+    if encoding is None:
+        with _encodings_lock:
+            encoding = _encodings.get(model)
+            if encoding is None:
+                encoding = tiktoken.encoding_for_model(model)
+                _encodings[model] = encoding
+    return encoding
+
+
+def register_encoding(model: str, encoding: tiktoken.Encoding) -> None:
+    """Use a specific encoding for a model name.
+    
+    Useful for fine-tuned or self-hosted models tiktoken doesn't know.
+    
+    Args:
+        model: The model name
+        encoding: The encoding to return for it
+    """
+    with _encodings_lock:
+        _encodings[model] = encoding
+
+
+def clear_encoding_cache() -> None:
+    """Forget all cached and registered encodings."""
+    with _encodings_lock:
+        _encodings.clear()
+
+
+def warm_up(models: list[str] | tuple[str, ...] = ("gpt-4.1-mini",)) -> None:
+    """Load the encodings of the given models ahead of time.
+    
+    Args:
+        models: Model names to load (default: gpt-4.1-mini)
+    """
+    for model in models:
+        get_encoding_for_model(model)
+
+
+_warm_models = os.getenv("TOKENS_WARM_MODELS")
+if _warm_models:
+    warm_up([model.strip() for model in _warm_models.split(",") if model.strip()])
 
 
 def encode_text(text: str, model: str = "gpt-4.1-mini") -> list[int]:
@@ -41,6 +103,41 @@ def encode_text(text: str, model: str = "gpt-4.1-mini") -> list[int]:
     return encoding.encode(text)
 
 
+def encode_batch(
+    texts: list[str], model: str = "gpt-4.1-mini", num_threads: int = 8
+) -> list[list[int]]:
+    """Encode many texts at once using tiktoken's multithreaded batch encoder.
+    
+    Args:
+        texts: The texts to encode
+        model: The model name to use for encoding (default: gpt-4.1-mini)
+        num_threads: Threads used by the batch encoder (default: 8)
+        
+    Returns:
+        A list of token ID lists, one per text, in the same order
+    """
+    encoding = get_encoding_for_model(model)
+    if num_threads <= 1 or len(texts) <= 1:
+        return [encoding.encode(text) for text in texts]  # no thread pool to start
+    return encoding.encode_batch(texts, num_threads=num_threads)
+
+
+def count_tokens_batch(
+    texts: list[str], model: str = "gpt-4.1-mini", num_threads: int = 8
+) -> list[int]:
+    """Count the tokens of many texts at once.
+    
+    Args:
+        texts: The texts to count
+        model: The model name to use for encoding (default: gpt-4.1-mini)
+        num_threads: Threads used by the batch encoder (default: 8)
+        
+    Returns:
+        The token count of each text, in the same order
+    """
+    return [len(tokens) for tokens in encode_batch(texts, model, num_threads)]
+
+
 def decode_tokens(tokens: list[int], model: str = "gpt-4.1-mini") -> str:
     """Decode a list of token IDs back into text.
     
@@ -55,25 +152,148 @@ def decode_tokens(tokens: list[int], model: str = "gpt-4.1-mini") -> str:
     return encoding.decode(tokens)
 
 
-def print_tokens_breakdown(text: str, model: str = "gpt-4.1-mini") -> None:
-    """Print a breakdown of how text is tokenized.
+@dataclass
+class TokenBreakdown:
+    """Tokens of a text with their byte and character positions.
     
-    Shows each token ID and its corresponding text.
+    Stored column-wise: entry i of each list describes token i.
+    
+    Attributes:
+        text: The tokenized text
+        model: The model whose encoding was used
+        token_ids: Token IDs, in order
+        token_bytes: Raw bytes of each token; a multi-byte UTF-8 character
+            may be split across tokens
+        byte_offsets: Byte offset where each token starts, plus the total
+            byte length as a final entry
+        char_starts: Index of the character each token starts in
+        char_ends: Index just past the last character each token touches;
+            tokens holding part of one character share its span
+    """
+    text: str
+    model: str
+    token_ids: list[int]
+    token_bytes: list[bytes]
+    byte_offsets: list[int]
+    char_starts: list[int]
+    char_ends: list[int]
+    
+    def __len__(self) -> int:
+        return len(self.token_ids)
+    
+    def token_text(self, index: int) -> str:
+        """Return a token's text, with bytes of partial characters escaped (e.g. '\\xe4')."""
+        return self.token_bytes[index].decode("utf-8", errors="backslashreplace")
+    
+    def token_repr(self, index: int) -> str:
+        """Return a token for display: repr of its text, or of its bytes if it
+        holds only part of a character (e.g. b'\\xe4')."""
+        piece = self.token_bytes[index]
+        try:
+            return repr(piece.decode("utf-8"))
+        except UnicodeDecodeError:
+            return repr(piece)
+    
+    def rows(self):
+        """Yield one dict per token: index, token_id, byte and char spans, text."""
+        for index, token_id in enumerate(self.token_ids):
+            yield {
+                "index": index,
+                "token_id": token_id,
+                "byte_start": self.byte_offsets[index],
+                "byte_end": self.byte_offsets[index + 1],
+                "char_start": self.char_starts[index],
+                "char_end": self.char_ends[index],
+                "text": self.token_text(index),
+            }
+    
+    def to_table(self) -> str:
+        """Render the breakdown as an aligned text table."""
+        lines = [f"{'#':>6} {'Token':>8} {'Bytes':>15} {'Chars':>15}  Text"]
+        for row in self.rows():
+            byte_span = f"{row['byte_start']}-{row['byte_end']}"
+            char_span = f"{row['char_start']}-{row['char_end']}"
+            lines.append(f"{row['index']:>6} {row['token_id']:>8} {byte_span:>15} "
+                         f"{char_span:>15}  {self.token_repr(row['index'])}")
+        return "\n".join(lines)
+    
+    def to_json(self) -> str:
+        """Render the breakdown as JSON: model, token count and one object per token."""
+        return json.dumps({"model": self.model, "total_tokens": len(self),
+                           "tokens": list(self.rows())}, ensure_ascii=False)
+    
+    def to_csv(self) -> str:
+        """Render the breakdown as CSV with a header row."""
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=["index", "token_id", "byte_start", "byte_end",
+                                                    "char_start", "char_end", "text"])
+        writer.writeheader()
+        writer.writerows(self.rows())
+        return output.getvalue()
+
+
+def token_breakdown(text: str, model: str = "gpt-4.1-mini") -> TokenBreakdown:
+    """Tokenize text and locate every token in its bytes and characters.
+    
+    Uses one encode call and one pass over the token bytes, so it scales
+    to documents with hundreds of thousands of tokens.
     
     Args:
-        text: The text to tokenize and display
+        text: The text to tokenize
         model: The model name to use for encoding (default: gpt-4.1-mini)
+        
+    Returns:
+        A TokenBreakdown of the text
     """
     encoding = get_encoding_for_model(model)
-    tokens = encoding.encode(text)
+    token_ids = encoding.encode(text)
+    token_bytes = encoding.decode_tokens_bytes(token_ids)
+    byte_offsets = list(accumulate((len(piece) for piece in token_bytes), initial=0))
     
-    print(f"Text: {text}")
-    print(f"Total tokens: {len(tokens)}\n")
+    char_starts = []
+    char_ends = []
+    chars = 0
+    for piece in token_bytes:
+        # A token starting with a continuation byte continues the previous character
+        char_starts.append(chars - 1 if chars and 0x80 <= piece[0] < 0xC0 else chars)
+        if piece.isascii():
+            chars += len(piece)
+        else:
+            chars += len(piece) - sum(0x80 <= byte < 0xC0 for byte in piece)
+        char_ends.append(chars)
     
-    for token_id in tokens:
-        token_text = encoding.decode([token_id])
-        print(f"{token_id} = {repr(token_text)}")
+    return TokenBreakdown(text, model, token_ids, token_bytes, byte_offsets, char_starts, char_ends)
+
 
+def print_tokens_breakdown(text: str, model: str = "gpt-4.1-mini", format: str = "text") -> None:
+    """Print a breakdown of how text is tokenized.
+    
+    Shows each token ID and its corresponding text.
+    
+    Args:
+        text: The text to tokenize and display
+        model: The model name to use for encoding (default: gpt-4.1-mini)
+        format: "text" (token = text lines), "table", "json" or "csv"
+            (default: "text")
+        
+    Raises:
+        ValueError: If the format is unknown
+    """
+    breakdown = token_breakdown(text, model)
+    if format == "json":
+        print(breakdown.to_json())
+    elif format == "csv":
+        print(breakdown.to_csv(), end="")
+    elif format in ("text", "table"):
+        print(f"Text: {text}")
+        print(f"Total tokens: {len(breakdown)}\n")
+        if format == "table":
+            print(breakdown.to_table())
+        elif breakdown.token_ids:
+            print("\n".join(f"{token_id} = {breakdown.token_repr(index)}"
+                            for index, token_id in enumerate(breakdown.token_ids)))
+    else:
+        raise ValueError(f"Unknown format: {format!r} (expected text, table, json or csv)")
 
 
 def main() -> None:
@@ -93,6 +313,3 @@ def main() -> None:
 
 if __name__ == "__main__":
     main()
-
-
-